@@ -0,0 +1,48 @@
+"""结果表添加(race_id, driver_id)唯一约束，支持批量UPSERT
+
+Revision ID: 5b2e7c91d4a3
+Revises: f17a20b245aa
+Create Date: 2025-07-18 10:12:45.218391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e7c91d4a3'
+down_revision: Union[str, Sequence[str], None] = 'f17a20b245aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (表名, 约束名)
+RESULT_TABLES = [
+    ('results', 'uq_results_race_driver'),
+    ('qualifying_results', 'uq_qualifying_results_race_driver'),
+    ('sprint_results', 'uq_sprint_results_race_driver'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, constraint_name in RESULT_TABLES:
+        # 先清理历史重复数据，保留每个 (race_id, driver_id) 最早的一条
+        op.execute(
+            f"""
+            DELETE FROM {table_name} a
+            USING {table_name} b
+            WHERE a.race_id = b.race_id
+              AND a.driver_id = b.driver_id
+              AND a.id > b.id
+            """
+        )
+        op.create_unique_constraint(constraint_name, table_name, ['race_id', 'driver_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, constraint_name in reversed(RESULT_TABLES):
+        op.drop_constraint(constraint_name, table_name, type_='unique')
@@ -0,0 +1,50 @@
+"""积分榜添加赛季内唯一约束，支持差异同步
+
+Revision ID: 8d41f6a2c7e9
+Revises: 5b2e7c91d4a3
+Create Date: 2025-07-19 09:26:13.504217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41f6a2c7e9'
+down_revision: Union[str, Sequence[str], None] = '5b2e7c91d4a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (表名, 键列, 唯一约束名, 被替代的普通索引名)
+STANDING_TABLES = [
+    ('driver_standings', 'driver_id', 'uq_driver_standings_season_driver', 'idx_driver_standing_season_driver'),
+    ('constructor_standings', 'constructor_id', 'uq_constructor_standings_season_constructor', 'idx_constructor_standing_season_constructor'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, key_column, constraint_name, index_name in STANDING_TABLES:
+        # 先清理历史重复数据，保留每个 (season_id, key) 最新的一条
+        op.execute(
+            f"""
+            DELETE FROM {table_name} a
+            USING {table_name} b
+            WHERE a.season_id = b.season_id
+              AND a.{key_column} = b.{key_column}
+              AND a.id < b.id
+            """
+        )
+        # 唯一约束自带同列索引，原普通索引不再需要
+        op.drop_index(index_name, table_name=table_name)
+        op.create_unique_constraint(constraint_name, table_name, ['season_id', key_column])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, key_column, constraint_name, index_name in reversed(STANDING_TABLES):
+        op.drop_constraint(constraint_name, table_name, type_='unique')
+        op.create_index(index_name, table_name, ['season_id', key_column], unique=False)
@@ -0,0 +1,32 @@
+"""添加列表游标分页索引
+
+Revision ID: a7c2e9f4b318
+Revises: e4b7a2d91c56
+Create Date: 2025-07-24 14:18:36.502147
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e9f4b318'
+down_revision: Union[str, Sequence[str], None] = 'e4b7a2d91c56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_race_event_date_id', 'races', ['event_date', 'id'], unique=False)
+    op.create_index('idx_driver_standing_driver_season', 'driver_standings', ['driver_id', 'season_id', 'id'], unique=False)
+    op.create_index('idx_constructor_standing_constructor_season', 'constructor_standings', ['constructor_id', 'season_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_constructor_standing_constructor_season', table_name='constructor_standings')
+    op.drop_index('idx_driver_standing_driver_season', table_name='driver_standings')
+    op.drop_index('idx_race_event_date_id', table_name='races')
@@ -0,0 +1,67 @@
+"""添加每轮积分榜快照表
+
+Revision ID: c3e95b0d7f12
+Revises: 8d41f6a2c7e9
+Create Date: 2025-07-20 15:02:47.913605
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e95b0d7f12'
+down_revision: Union[str, Sequence[str], None] = '8d41f6a2c7e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('driver_standing_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('round_number', sa.Integer(), nullable=False),
+    sa.Column('driver_id', sa.String(length=50), nullable=False),
+    sa.Column('constructor_id', sa.String(length=50), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.Column('position_text', sa.String(length=10), nullable=True),
+    sa.Column('points', sa.Float(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['constructor_id'], ['constructors.constructor_id'], ),
+    sa.ForeignKeyConstraint(['driver_id'], ['drivers.driver_id'], ),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('season_id', 'round_number', 'driver_id', name='uq_driver_standing_snapshots_season_round_driver')
+    )
+    op.create_index(op.f('ix_driver_standing_snapshots_id'), 'driver_standing_snapshots', ['id'], unique=False)
+    op.create_index('idx_driver_standing_snapshot_driver_season', 'driver_standing_snapshots', ['driver_id', 'season_id'], unique=False)
+
+    op.create_table('constructor_standing_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('round_number', sa.Integer(), nullable=False),
+    sa.Column('constructor_id', sa.String(length=50), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.Column('position_text', sa.String(length=10), nullable=True),
+    sa.Column('points', sa.Float(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['constructor_id'], ['constructors.constructor_id'], ),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('season_id', 'round_number', 'constructor_id', name='uq_constructor_standing_snapshots_season_round_constructor')
+    )
+    op.create_index(op.f('ix_constructor_standing_snapshots_id'), 'constructor_standing_snapshots', ['id'], unique=False)
+    op.create_index('idx_constructor_standing_snapshot_constructor_season', 'constructor_standing_snapshots', ['constructor_id', 'season_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_constructor_standing_snapshot_constructor_season', table_name='constructor_standing_snapshots')
+    op.drop_index(op.f('ix_constructor_standing_snapshots_id'), table_name='constructor_standing_snapshots')
+    op.drop_table('constructor_standing_snapshots')
+    op.drop_index('idx_driver_standing_snapshot_driver_season', table_name='driver_standing_snapshots')
+    op.drop_index(op.f('ix_driver_standing_snapshots_id'), table_name='driver_standing_snapshots')
+    op.drop_table('driver_standing_snapshots')
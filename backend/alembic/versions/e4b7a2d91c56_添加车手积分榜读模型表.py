@@ -0,0 +1,72 @@
+"""添加车手积分榜读模型表
+
+Revision ID: e4b7a2d91c56
+Revises: c3e95b0d7f12
+Create Date: 2025-07-22 10:41:09.215377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7a2d91c56'
+down_revision: Union[str, Sequence[str], None] = 'c3e95b0d7f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('driver_standings_read',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('season_year', sa.Integer(), nullable=False),
+    sa.Column('driver_id', sa.String(length=50), nullable=False),
+    sa.Column('constructor_id', sa.String(length=50), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.Column('points', sa.Float(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('driver_name', sa.String(length=201), nullable=False),
+    sa.Column('nationality', sa.String(length=100), nullable=True),
+    sa.Column('constructor_name', sa.String(length=200), nullable=False),
+    sa.ForeignKeyConstraint(['constructor_id'], ['constructors.constructor_id'], ),
+    sa.ForeignKeyConstraint(['driver_id'], ['drivers.driver_id'], ),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('season_id', 'driver_id', name='uq_driver_standings_read_season_driver')
+    )
+    op.create_index(op.f('ix_driver_standings_read_id'), 'driver_standings_read', ['id'], unique=False)
+    op.create_index('idx_driver_standings_read_year_position', 'driver_standings_read', ['season_year', 'position'], unique=False)
+    op.create_index('idx_driver_standings_read_season_position', 'driver_standings_read', ['season_id', 'position'], unique=False)
+
+    # 用现有积分榜填充读模型（官方指定车队优先，同一车手取最新一条）
+    op.execute("""
+        INSERT INTO driver_standings_read (
+            season_id, season_year, driver_id, constructor_id, position, points, wins,
+            driver_name, nationality, constructor_name
+        )
+        SELECT ds.season_id, s.year, ds.driver_id, c.constructor_id, ds.position, ds.points, ds.wins,
+               concat(d.given_name, ' ', d.family_name), d.driver_nationality, c.constructor_name
+        FROM driver_standings ds
+        JOIN seasons s ON s.id = ds.season_id
+        JOIN drivers d ON d.driver_id = ds.driver_id
+        LEFT JOIN (
+            SELECT dse.driver_id, dse.season_id, dse.constructor_id
+            FROM driver_seasons dse
+            JOIN (
+                SELECT max(id) AS id FROM driver_seasons GROUP BY driver_id, season_id
+            ) latest ON latest.id = dse.id
+        ) o ON o.driver_id = ds.driver_id AND o.season_id = ds.season_id
+        JOIN constructors c ON c.constructor_id = coalesce(o.constructor_id, ds.constructor_id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_driver_standings_read_season_position', table_name='driver_standings_read')
+    op.drop_index('idx_driver_standings_read_year_position', table_name='driver_standings_read')
+    op.drop_index(op.f('ix_driver_standings_read_id'), table_name='driver_standings_read')
+    op.drop_table('driver_standings_read')
@@ -2,10 +2,11 @@
 API 依赖注入
 包含数据库会话、Redis 连接等依赖
 """
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..core.database import SessionLocal
+from ..core.database import SessionLocal, AsyncSessionLocal
 from ..core.redis import get_redis
 
 
@@ -21,6 +22,15 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取异步数据库会话
+    用于 async def 端点，查询时不阻塞事件循环
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_redis_client():
     """
     获取 Redis 客户端
@@ -0,0 +1,136 @@
+"""
+列表和详情接口的字段选择（fields=）
+客户端用逗号分隔的字段名只请求页面需要的字段：查询通过 load_only 只读取对应的列，
+没有被选择的关联对象不加载，序列化也只输出选择的字段（主键总是返回）。
+不传 fields 时返回完整数据，与原来的响应一致
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import joinedload, load_only
+
+from ..schemas.base import sparse
+
+# 各接口 fields 参数的说明
+FIELDS_DESCRIPTION = "逗号分隔的返回字段，如 id,official_event_name,event_date；默认返回全部字段"
+
+
+@dataclass(frozen=True)
+class Related:
+    """
+    来自关联对象的字段
+    column 为关联对象的列；为空时加载整个关联对象，并用 serialize 序列化
+    """
+    relationship: Any
+    column: Any = None
+    serialize: Optional[Callable[[Any], Any]] = None
+
+    def value(self, obj: Any) -> Any:
+        target = getattr(obj, self.relationship.key)
+        if target is None:
+            return None
+        if self.column is None:
+            return self.serialize(target)
+        return getattr(target, self.column.key)
+
+
+class FieldSet:
+    """
+    一个接口可选择的响应字段
+    schema 中除 related 以外的字段与模型的列同名
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        schema: Type[BaseModel],
+        key: str,
+        exclude: Sequence[str] = (),
+        related: Optional[Dict[str, Related]] = None,
+        always: Sequence[Related] = (),
+    ):
+        """
+        Args:
+            model: ORM 模型
+            schema: 完整的响应模式
+            key: 总是返回的主键字段，客户端据此识别记录
+            exclude: 接口不返回的 schema 字段
+            related: 来自关联对象的字段
+            always: 序列化以外也需要读取的关联列（如缓存标签使用的赛季年份），选择字段时同样加载
+        """
+        self.model = model
+        self.key = key
+        self.related = related or {}
+        self.always = tuple(always)
+        self.names = tuple(name for name in schema.model_fields if name not in exclude)
+        # 响应数据类型，选择字段后的部分数据同样可以通过校验
+        self.item = sparse(schema, exclude)
+
+    def parse(self, fields: Optional[str]) -> Optional[FrozenSet[str]]:
+        """
+        解析 fields 参数，未传入或选择了全部字段时返回 None（完整数据）
+        包含未知字段时返回 400
+        """
+        if not fields:
+            return None
+        selected = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = selected - set(self.names)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"未知字段: {', '.join(sorted(unknown))}，可选字段: {', '.join(self.names)}",
+            )
+        selected.add(self.key)
+        if len(selected) == len(self.names):
+            return None
+        return frozenset(selected)
+
+    def options(self, selected: Optional[FrozenSet[str]], *columns) -> List[Any]:
+        """
+        查询的加载选项：只读取选择的列和 columns（如分页排序键），只连接需要的关联对象
+        """
+        # 关系名 -> (关系属性, 需要的关联列)，关联列为 None 表示加载整个关联对象
+        loads: Dict[str, Tuple[Any, Optional[List[Any]]]] = {}
+        for name, related in self.related.items():
+            if selected is None or name in selected:
+                self._add_load(loads, related)
+        if selected is None:
+            return [joinedload(relationship) for relationship, _ in loads.values()]
+        for related in self.always:
+            self._add_load(loads, related)
+
+        own = [getattr(self.model, name) for name in self.names if name in selected and name not in self.related]
+        options = [load_only(*own, *columns)]
+        for relationship, related_columns in loads.values():
+            option = joinedload(relationship)
+            options.append(option if related_columns is None else option.load_only(*related_columns))
+        return options
+
+    def serialize(self, obj: Any, selected: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        """按 schema 的字段顺序序列化，只读取选择的字段，不会触发未加载列的查询"""
+        data = {}
+        for name in self.names:
+            if selected is not None and name not in selected:
+                continue
+            related = self.related.get(name)
+            data[name] = related.value(obj) if related else getattr(obj, name)
+        return data
+
+    def project(self, data: Dict[str, Any], selected: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+        """从已序列化的完整数据（如搜索索引中的数据）中选择字段"""
+        if selected is None:
+            return data
+        return {name: value for name, value in data.items() if name in selected}
+
+    @staticmethod
+    def _add_load(loads: Dict[str, Tuple[Any, Optional[List[Any]]]], related: Related):
+        """合并同一关联对象需要的列"""
+        relationship = related.relationship
+        _, columns = loads.get(relationship.key, (relationship, []))
+        if related.column is None or columns is None:
+            columns = None
+        else:
+            columns = columns + [related.column]
+        loads[relationship.key] = (relationship, columns)
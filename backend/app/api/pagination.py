@@ -0,0 +1,150 @@
+"""
+列表接口的游标（keyset）分页
+按稳定的排序键分页：下一页的条件是“排序键大于上一页最后一行”，可以直接使用索引定位，
+任意深度的页面和第一页的代价相同。游标是排序键值的 base64 编码，对客户端不透明。
+
+总数是可选的，按数据版本缓存在 Redis 中：数据没有变化时不会重复执行 count 查询
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+import structlog
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+from ..core.config import settings
+from ..core.data_version import get_data_versions
+from ..core.redis import get_redis_client
+
+logger = structlog.get_logger()
+
+# 总数缓存的过期时间（秒），数据版本变化后旧的总数不会再被读取
+TOTAL_CACHE_TTL = 24 * 3600
+
+
+class Keyset:
+    """
+    一个列表接口的排序键
+    所有排序键方向相同；第一列允许为空（升序时 NULL 排在最后），其余列必须非空且组合唯一
+    """
+
+    def __init__(self, name: str, *columns, descending: bool = False):
+        self.name = name
+        self.columns = columns
+        self.descending = descending
+
+    def apply(self, query, cursor: Optional[str], size: int, offset: int = 0):
+        """
+        添加排序、游标条件和 limit（多取一行用于判断是否还有下一页）
+        传入游标时忽略 offset；query 可以是 Query 或 select()
+        """
+        query = query.order_by(*(column.desc() if self.descending else column.asc() for column in self.columns))
+        if cursor:
+            query = query.where(self._after(self.decode(cursor)))
+        elif offset:
+            query = query.offset(offset)
+        return query.limit(size + 1)
+
+    def page(self, rows: Sequence[Any], size: int) -> Tuple[List[Any], Optional[str]]:
+        """
+        截取当前页
+
+        Returns:
+            (当前页的行, 下一页游标)，没有下一页时游标为 None
+        """
+        items = list(rows[:size])
+        if len(rows) <= size or not items:
+            return items, None
+        return items, self.encode(items[-1])
+
+    def encode(self, row: Any) -> str:
+        values = [getattr(row, column.key) for column in self.columns]
+        payload = json.dumps({"k": self.name, "v": values}, default=_json_default, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        """解码游标，不是该接口生成的游标返回 400"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if payload.get("k") != self.name or len(payload["v"]) != len(self.columns):
+                raise ValueError("游标与接口不匹配")
+            return [_coerce(column, value) for column, value in zip(self.columns, payload["v"])]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+
+    def _after(self, values: List[Any]):
+        """排序在游标之后的行"""
+        first, rest = self.columns[0], self.columns[1:]
+        compare = (lambda a, b: a < b) if self.descending else (lambda a, b: a > b)
+        if values[0] is None:
+            # 游标已在第一列为空的末尾部分，只比较其余列
+            return and_(first.is_(None), compare(tuple_(*rest), tuple(values[1:])))
+        condition = compare(tuple_(*self.columns), tuple(values))
+        if getattr(first.expression, "nullable", False) and not self.descending:
+            condition = or_(condition, first.is_(None))
+        return condition
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"无法编码游标值: {value!r}")
+
+
+def _coerce(column, value: Any) -> Any:
+    """游标中的日期以字符串保存，按列类型还原"""
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+class CachedTotal:
+    """
+    按数据版本缓存的列表总数
+    缓存键包含接口名、过滤参数和数据版本，数据写入更新版本后自然失效
+    """
+
+    def __init__(self, name: str, scope: str, **params: Any):
+        self.name = name
+        self.scope = scope
+        self.params = params
+        self._key: Optional[str] = None
+
+    def get(self) -> Optional[int]:
+        """读取缓存的总数，未缓存或 Redis 不可用时返回 None"""
+        version = get_data_versions([self.scope]).get(self.scope)
+        if version is None:
+            return None
+        query = urlencode(sorted((k, "" if v is None else str(v)) for k, v in self.params.items()))
+        self._key = f"{settings.cache_prefix}:total:{self.name}:{self.scope}:{version}:{query}"
+        try:
+            value = get_redis_client().get(self._key)
+        except Exception as e:
+            logger.error("总数缓存读取失败", error=str(e), name=self.name)
+            return None
+        return int(value) if value is not None else None
+
+    def set(self, total: int):
+        if self._key is None:
+            return
+        try:
+            get_redis_client().set(self._key, total, ex=TOTAL_CACHE_TTL)
+        except Exception as e:
+            logger.error("总数缓存写入失败", error=str(e), name=self.name)
+
+    def resolve(self, count: Callable[[], int]) -> int:
+        """读取缓存的总数，未缓存时执行 count 并写入缓存"""
+        total = self.get()
+        if total is None:
+            total = count()
+            self.set(total)
+        return total
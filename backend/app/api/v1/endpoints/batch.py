@@ -0,0 +1,81 @@
+"""
+批量读接口
+前端一个页面需要的多个 GET 请求合并为一次往返：
+子请求在进程内并发地经过完整的中间件和路由（缓存、条件请求、异常处理都与单独请求一致），
+同步端点在线程池中并行执行，共用同一个数据库连接池和缓存
+"""
+import asyncio
+from typing import List
+
+import httpx
+import orjson
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.config import settings
+from app.schemas.base import ApiResponse
+from app.schemas.batch import BatchRequest, BatchRequestItem, BatchResponseItem
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _validate(item: BatchRequestItem):
+    """子请求只能是 v1 的读接口，不能嵌套批量请求"""
+    if (
+        not item.path.startswith(f"{settings.api_v1_str}/")
+        or any(part in item.path for part in ("?", "#", ".."))
+    ):
+        raise HTTPException(status_code=400, detail=f"子请求 {item.id} 的路径无效: {item.path}")
+    if item.path.rstrip("/") == f"{settings.api_v1_str}/batch":
+        raise HTTPException(status_code=400, detail=f"子请求 {item.id} 不能是批量请求")
+
+
+async def _dispatch(client: httpx.AsyncClient, item: BatchRequestItem) -> BatchResponseItem:
+    headers = {"If-None-Match": item.etag} if item.etag else None
+    try:
+        response = await client.get(item.path, params=item.params, headers=headers)
+    except Exception as e:
+        logger.error(f"❌ 批量子请求 {item.id} ({item.path}) 执行失败: {e}")
+        return BatchResponseItem(id=item.id, status=500, body={"success": False, "message": str(e)})
+
+    body = None
+    if response.content:
+        try:
+            body = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            body = response.text
+    return BatchResponseItem(id=item.id, status=response.status_code, etag=response.headers.get("etag"), body=body)
+
+
+@router.post("/", response_model=ApiResponse[List[BatchResponseItem]])
+async def batch(payload: BatchRequest, request: Request):
+    """
+    批量执行 GET 子请求
+    
+    每个子请求单独返回状态码，某一项失败不影响其他项；
+    传入 etag 且数据未变化的子请求返回 304，不执行查询
+    """
+    if len(payload.requests) > settings.batch_max_requests:
+        raise HTTPException(
+            status_code=400, detail=f"子请求数量超过上限 {settings.batch_max_requests}"
+        )
+    if len({item.id for item in payload.requests}) != len(payload.requests):
+        raise HTTPException(status_code=400, detail="子请求 id 不能重复")
+    for item in payload.requests:
+        _validate(item)
+
+    # 子请求使用原请求的 Host，通过同样的可信主机检查；端点未处理的异常按 500 响应返回，不中断其他子请求
+    transport = httpx.ASGITransport(app=request.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(
+        transport=transport, base_url=str(request.base_url), follow_redirects=True
+    ) as client:
+        results = await asyncio.gather(*(_dispatch(client, item) for item in payload.requests))
+
+    failed = sum(1 for result in results if result.status >= 400)
+    return ApiResponse(
+        success=failed == 0,
+        message=f"批量请求完成，{len(results)} 个子请求，{failed} 个失败",
+        data=results,
+    )
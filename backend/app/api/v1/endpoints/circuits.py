@@ -9,46 +9,66 @@ from app.api.deps import get_db
 from app.models.circuit import Circuit
 from app.schemas.circuit import CircuitResponse, CircuitListResponse
 from app.services.circuit_sync_service_v2 import sync_circuits_main
+from app.core.data_version import REFERENCE_SCOPE
+from app.api.pagination import Keyset, CachedTotal
+from app.api.fields import FIELDS_DESCRIPTION, FieldSet
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+CIRCUIT_KEYSET = Keyset("circuits", Circuit.circuit_id)
+
+CIRCUIT_FIELDS = FieldSet(Circuit, CircuitResponse, "circuit_id")
+
 
 @router.get("/", response_model=CircuitListResponse)
 def get_circuits(
-    skip: int = Query(0, ge=0, description="跳过记录数"),
+    skip: int = Query(0, ge=0, description="跳过记录数（传入 cursor 时忽略）"),
     limit: int = Query(100, ge=1, le=1000, description="限制记录数"),
     country: Optional[str] = Query(None, description="按国家过滤"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
-    """获取赛道列表"""
+    """获取赛道列表，支持 skip/limit 和游标分页"""
     
+    selected = CIRCUIT_FIELDS.parse(fields)
     query = db.query(Circuit)
     
     if country:
         query = query.filter(Circuit.country.ilike(f"%{country}%"))
     
-    total = query.count()
-    circuits = query.offset(skip).limit(limit).all()
+    # 总数按数据版本缓存
+    total = CachedTotal("circuits", REFERENCE_SCOPE, country=country).resolve(query.count)
+    rows = CIRCUIT_KEYSET.apply(query.options(*CIRCUIT_FIELDS.options(selected)), cursor, limit, offset=skip).all()
+    circuits, next_cursor = CIRCUIT_KEYSET.page(rows, limit)
     
     return CircuitListResponse(
-        circuits=circuits,
-        total=total
+        circuits=circuits if selected is None else [CIRCUIT_FIELDS.serialize(c, selected) for c in circuits],
+        total=total,
+        next_cursor=next_cursor
     )
 
 
-@router.get("/{circuit_id}", response_model=CircuitResponse)
-def get_circuit(circuit_id: str, db: Session = Depends(get_db)):
+@router.get("/{circuit_id}", response_model=CIRCUIT_FIELDS.item)
+def get_circuit(
+    circuit_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
     """根据ID获取赛道详情"""
     
-    circuit = db.query(Circuit).filter(Circuit.circuit_id == circuit_id).first()
+    selected = CIRCUIT_FIELDS.parse(fields)
+    circuit = db.query(Circuit).options(
+        *CIRCUIT_FIELDS.options(selected)
+    ).filter(Circuit.circuit_id == circuit_id).first()
     
     if not circuit:
         raise HTTPException(status_code=404, detail="赛道未找到")
     
-    return circuit
+    return circuit if selected is None else CIRCUIT_FIELDS.serialize(circuit, selected)
 
 
 @router.post("/sync")
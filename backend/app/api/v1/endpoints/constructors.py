@@ -1,133 +1,125 @@
 """
 车队相关 API 端点
 """
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.models.constructor import Constructor
 from app.schemas.constructor import ConstructorResponse
-from app.schemas.base import ApiResponse
+from app.schemas.base import ApiResponse, PageResponse
+from app.core.data_version import REFERENCE_SCOPE
+from app.api.pagination import Keyset, CachedTotal
+from app.api.fields import FIELDS_DESCRIPTION, FieldSet
+from app.services.search_index import SearchDocument, SearchIndex
 
 router = APIRouter()
 
+CONSTRUCTOR_KEYSET = Keyset("constructors", Constructor.constructor_id)
 
-@router.get("/", response_model=ApiResponse[List[ConstructorResponse]])
+CONSTRUCTOR_FIELDS = FieldSet(Constructor, ConstructorResponse, "constructor_id")
+
+
+def _load_constructor_documents(db: Session) -> List[SearchDocument]:
+    """车队搜索索引的数据：按车队名称和ID搜索"""
+    return [
+        SearchDocument(
+            constructor.constructor_id,
+            (constructor.name, constructor.constructor_id),
+            CONSTRUCTOR_FIELDS.serialize(constructor),
+        )
+        for constructor in db.query(Constructor).all()
+    ]
+
+
+CONSTRUCTOR_SEARCH = SearchIndex("constructors", _load_constructor_documents)
+
+
+@router.get("/", response_model=PageResponse[List[CONSTRUCTOR_FIELDS.item]])
 def get_constructors(
     db: Session = Depends(get_db),
-    page: int = Query(1, ge=1, description="页码"),
+    page: int = Query(1, ge=1, description="页码（传入 cursor 时忽略）"),
     size: int = Query(20, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    include_total: bool = Query(False, description="是否返回数据总数"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """
     获取所有车队
+    支持页码分页和游标分页，游标分页的任意页面代价相同
     """
     try:
-        offset = (page - 1) * size
-        constructors = db.query(Constructor).offset(offset).limit(size).all()
-        constructor_list = []
-        for constructor in constructors:
-            constructor_data = {
-                "constructor_id": constructor.constructor_id,
-                "constructor_url": constructor.constructor_url,
-                "name": constructor.name,
-                "nationality": constructor.nationality,
-                "season_id": constructor.season_id,
-                "base": constructor.base,
-                "team_chief": constructor.team_chief,
-                "technical_chief": constructor.technical_chief,
-                "power_unit": constructor.power_unit,
-                "is_active": constructor.is_active,
-                "championships": constructor.championships,
-                "wins": constructor.wins,
-                "podiums": constructor.podiums,
-                "poles": constructor.poles,
-                "fastest_laps": constructor.fastest_laps,
-            }
-            constructor_list.append(constructor_data)
-        return ApiResponse(
+        selected = CONSTRUCTOR_FIELDS.parse(fields)
+        query = db.query(Constructor).options(*CONSTRUCTOR_FIELDS.options(selected))
+        rows = CONSTRUCTOR_KEYSET.apply(query, cursor, size, offset=(page - 1) * size).all()
+        constructors, next_cursor = CONSTRUCTOR_KEYSET.page(rows, size)
+        total = None
+        if include_total:
+            total = CachedTotal("constructors", REFERENCE_SCOPE).resolve(db.query(Constructor).count)
+        constructor_list = [CONSTRUCTOR_FIELDS.serialize(constructor, selected) for constructor in constructors]
+        return PageResponse(
             success=True,
             message="获取车队列表成功",
-            data=constructor_list
+            data=constructor_list,
+            next_cursor=next_cursor,
+            total=total,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取车队列表失败: {str(e)}")
 
 
-@router.get("/{constructor_id}", response_model=ApiResponse[ConstructorResponse])
-def get_constructor(constructor_id: str, db: Session = Depends(get_db)):
+@router.get("/search", response_model=ApiResponse[List[CONSTRUCTOR_FIELDS.item]])
+def search_constructors(
+    q: str = Query(..., min_length=1, description="搜索关键词"),
+    limit: int = Query(10, ge=1, le=50, description="返回数量"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
     """
-    获取单个车队详情
+    搜索车队
+    按名称前缀匹配（不区分重音和大小写），容忍拼写错误，结果按匹配程度排序
     """
     try:
-        constructor = db.query(Constructor).filter(Constructor.constructor_id == constructor_id).first()
-        if not constructor:
-            raise HTTPException(status_code=404, detail="车队不存在")
-        constructor_data = {
-            "constructor_id": constructor.constructor_id,
-            "constructor_url": constructor.constructor_url,
-            "name": constructor.name,
-            "nationality": constructor.nationality,
-            "season_id": constructor.season_id,
-            "base": constructor.base,
-            "team_chief": constructor.team_chief,
-            "technical_chief": constructor.technical_chief,
-            "power_unit": constructor.power_unit,
-            "is_active": constructor.is_active,
-            "championships": constructor.championships,
-            "wins": constructor.wins,
-            "podiums": constructor.podiums,
-            "poles": constructor.poles,
-            "fastest_laps": constructor.fastest_laps,
-        }
+        selected = CONSTRUCTOR_FIELDS.parse(fields)
+        constructor_list = [
+            CONSTRUCTOR_FIELDS.project(constructor, selected) for constructor in CONSTRUCTOR_SEARCH.search(db, q, limit)
+        ]
         return ApiResponse(
             success=True,
-            message="获取车队详情成功",
-            data=constructor_data
+            message="搜索车队成功",
+            data=constructor_list
         )
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取车队详情失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"搜索车队失败: {str(e)}")
 
 
-@router.get("/search", response_model=ApiResponse[List[ConstructorResponse]])
-def search_constructors(
-    q: str = Query(..., description="搜索关键词"),
+@router.get("/{constructor_id}", response_model=ApiResponse[CONSTRUCTOR_FIELDS.item])
+def get_constructor(
+    constructor_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
-    """搜索车队"""
+    """
+    获取单个车队详情
+    """
     try:
-        # 简单的名称搜索
-        constructors = db.query(Constructor).filter(
-            Constructor.name.ilike(f"%{q}%")
-        ).limit(10).all()
-        
-        constructor_list = []
-        for constructor in constructors:
-            constructor_data = {
-                "constructor_id": constructor.constructor_id,
-                "constructor_url": constructor.constructor_url,
-                "name": constructor.name,
-                "nationality": constructor.nationality,
-                "season_id": constructor.season_id,
-                "base": constructor.base,
-                "team_chief": constructor.team_chief,
-                "technical_chief": constructor.technical_chief,
-                "power_unit": constructor.power_unit,
-                "is_active": constructor.is_active,
-                "championships": constructor.championships,
-                "wins": constructor.wins,
-                "podiums": constructor.podiums,
-                "poles": constructor.poles,
-                "fastest_laps": constructor.fastest_laps,
-            }
-            constructor_list.append(constructor_data)
-        
+        selected = CONSTRUCTOR_FIELDS.parse(fields)
+        constructor = db.query(Constructor).options(
+            *CONSTRUCTOR_FIELDS.options(selected)
+        ).filter(Constructor.constructor_id == constructor_id).first()
+        if not constructor:
+            raise HTTPException(status_code=404, detail="车队不存在")
         return ApiResponse(
             success=True,
-            message="搜索车队成功",
-            data=constructor_list
+            message="获取车队详情成功",
+            data=CONSTRUCTOR_FIELDS.serialize(constructor, selected)
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"搜索车队失败: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"获取车队详情失败: {str(e)}")
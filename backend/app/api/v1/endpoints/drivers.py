@@ -1,107 +1,123 @@
 """
 车手相关的 API 端点
 """
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.models.driver import Driver
 from app.schemas.driver import DriverResponse
-from app.schemas.base import ApiResponse
+from app.schemas.base import ApiResponse, PageResponse
+from app.core.data_version import REFERENCE_SCOPE
+from app.api.pagination import Keyset, CachedTotal
+from app.api.fields import FIELDS_DESCRIPTION, FieldSet
+from app.services.search_index import SearchDocument, SearchIndex
 
 router = APIRouter()
 
+DRIVER_KEYSET = Keyset("drivers", Driver.driver_id)
+
+DRIVER_FIELDS = FieldSet(Driver, DriverResponse, "driver_id")
+
+
+def _load_driver_documents(db: Session) -> List[SearchDocument]:
+    """车手搜索索引的数据：按名、姓、代码和车号搜索"""
+    return [
+        SearchDocument(
+            driver.driver_id,
+            (driver.forename, driver.surname, driver.code, str(driver.number) if driver.number else None),
+            DRIVER_FIELDS.serialize(driver),
+        )
+        for driver in db.query(Driver).all()
+    ]
 
-def _serialize_driver(driver: Driver) -> dict:
-    """
-    将Driver对象序列化为字典
-    统一的数据序列化逻辑，避免重复代码
-    """
-    return {
-        "driver_id": driver.driver_id,
-        "number": driver.number,
-        "code": driver.code,
-        "driver_url": driver.driver_url,
-        "forename": driver.forename,
-        "surname": driver.surname,
-        "date_of_birth": driver.date_of_birth,
-        "nationality": driver.nationality,
-    }
 
+DRIVER_SEARCH = SearchIndex("drivers", _load_driver_documents)
 
-@router.get("/", response_model=ApiResponse[List[DriverResponse]])
-async def get_drivers(
+
+@router.get("/", response_model=PageResponse[List[DRIVER_FIELDS.item]])
+def get_drivers(
     db: Session = Depends(get_db),
-    page: int = Query(1, ge=1, description="页码"),
+    page: int = Query(1, ge=1, description="页码（传入 cursor 时忽略）"),
     size: int = Query(20, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """
     获取车手列表
+    支持页码分页和游标分页，游标分页的任意页面代价相同
     """
     try:
-        # 计算偏移量
-        offset = (page - 1) * size
-        
-        # 查询总数
-        total = db.query(Driver).count()
-        # 查询车手数据
-        drivers = db.query(Driver).offset(offset).limit(size).all()
+        selected = DRIVER_FIELDS.parse(fields)
+        # 查询总数（按数据版本缓存）
+        total = CachedTotal("drivers", REFERENCE_SCOPE).resolve(db.query(Driver).count)
+        # 按车手ID排序查询车手数据
+        query = db.query(Driver).options(*DRIVER_FIELDS.options(selected))
+        rows = DRIVER_KEYSET.apply(query, cursor, size, offset=(page - 1) * size).all()
+        drivers, next_cursor = DRIVER_KEYSET.page(rows, size)
         
         # 使用统一的序列化函数
-        driver_list = [_serialize_driver(driver) for driver in drivers]
+        driver_list = [DRIVER_FIELDS.serialize(driver, selected) for driver in drivers]
         
-        return ApiResponse(
+        position = "下一页" if cursor else f"第{page}页"
+        return PageResponse(
             success=True,
-            message=f"获取车手列表成功，第{page}页，共{total}条记录",
-            data=driver_list
+            message=f"获取车手列表成功，{position}，共{total}条记录",
+            data=driver_list,
+            next_cursor=next_cursor,
+            total=total,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取车手列表失败: {str(e)}")
 
 
-@router.get("/search", response_model=ApiResponse[List[DriverResponse]])
-async def search_drivers(
-    q: str = Query(..., description="搜索关键词"),
+@router.get("/search", response_model=ApiResponse[List[DRIVER_FIELDS.item]])
+def search_drivers(
+    q: str = Query(..., min_length=1, description="搜索关键词"),
+    limit: int = Query(10, ge=1, le=50, description="返回数量"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
     搜索车手
+    按名、姓、代码前缀匹配（不区分重音和大小写），容忍拼写错误，结果按匹配程度排序
     """
     try:
-        # 简单的名称搜索
-        drivers = db.query(Driver).filter(
-            (Driver.forename.ilike(f"%{q}%")) | 
-            (Driver.surname.ilike(f"%{q}%")) |
-            (Driver.code.ilike(f"%{q}%"))
-        ).limit(10).all()
-
-        # 使用统一的序列化函数
-        driver_list = [_serialize_driver(driver) for driver in drivers]
+        selected = DRIVER_FIELDS.parse(fields)
+        driver_list = [DRIVER_FIELDS.project(driver, selected) for driver in DRIVER_SEARCH.search(db, q, limit)]
         
         return ApiResponse(
             success=True,
             message=f"搜索车手成功，找到{len(driver_list)}条记录",
             data=driver_list
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"搜索车手失败: {str(e)}")
 
 
-@router.get("/{driver_id}", response_model=ApiResponse[DriverResponse])
-async def get_driver(
+@router.get("/{driver_id}", response_model=ApiResponse[DRIVER_FIELDS.item])
+def get_driver(
     driver_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
     根据ID获取车手详情
     """
     try:
-        driver = db.query(Driver).filter(Driver.driver_id == driver_id).first()
+        selected = DRIVER_FIELDS.parse(fields)
+        driver = db.query(Driver).options(
+            *DRIVER_FIELDS.options(selected)
+        ).filter(Driver.driver_id == driver_id).first()
         if not driver:
             raise HTTPException(status_code=404, detail="车手不存在")
         
-        driver_data = _serialize_driver(driver)
+        driver_data = DRIVER_FIELDS.serialize(driver, selected)
         
         return ApiResponse(
             success=True,
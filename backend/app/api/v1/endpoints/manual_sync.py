@@ -1,29 +1,28 @@
 """
 手动数据更新API端点
 替代Celery定时任务的手动触发方案
+
+同步在后台任务中执行：同步服务的方法都是阻塞的普通函数，后台任务也定义为普通函数，
+由 FastAPI 放到线程池中运行；请求的数据库会话在响应后即关闭，后台任务使用自己的会话
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.core.database import get_db
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from app.core.database import SessionLocal
 from app.services.unified_sync_service import UnifiedSyncService
-from sqlalchemy.orm import Session
-from fastapi import Depends
-import asyncio
-from typing import Dict, Any
 
 router = APIRouter()
 
 @router.post("/sync/all")
-async def sync_all_data(
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
+async def sync_all_data(background_tasks: BackgroundTasks):
     """
     手动触发全量数据同步
     替代Celery定时任务
     """
     try:
         # 在后台任务中执行数据同步
-        background_tasks.add_task(run_full_sync, db)
+        background_tasks.add_task(run_full_sync)
         return {
             "message": "数据同步已开始",
             "status": "started",
@@ -39,13 +38,12 @@ async def sync_all_data(
 async def sync_season_data(
     year: int,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
 ):
     """
     手动触发特定年份数据同步
     """
     try:
-        background_tasks.add_task(run_season_sync, year, db)
+        background_tasks.add_task(run_season_sync, year)
         return {
             "message": f"开始同步{year}年数据",
             "status": "started",
@@ -60,16 +58,18 @@ async def sync_season_data(
 @router.post("/sync/standings")
 async def sync_standings_data(
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    year: Optional[int] = Query(None, description="赛季年份，默认当前年份"),
 ):
     """
     手动触发积分榜数据同步
     """
+    year = year or datetime.now().year
     try:
-        background_tasks.add_task(run_standings_sync, db)
+        background_tasks.add_task(run_standings_sync, year)
         return {
             "message": "积分榜数据同步已开始",
-            "status": "started"
+            "status": "started",
+            "year": year
         }
     except Exception as e:
         raise HTTPException(
@@ -87,46 +87,46 @@ async def get_sync_status():
         "endpoints": {
             "sync_all": "POST /api/v1/manual/sync/all - 全量数据同步",
             "sync_season": "POST /api/v1/manual/sync/season/{year} - 特定年份同步",
-            "sync_standings": "POST /api/v1/manual/sync/standings - 积分榜同步"
+            "sync_standings": "POST /api/v1/manual/sync/standings?year={year} - 积分榜同步"
         },
         "note": "这些端点替代了Celery定时任务，需要手动触发数据更新"
     }
 
-# 后台任务函数
-async def run_full_sync(db: Session):
+# 后台任务函数（普通函数，在线程池中执行）
+def run_full_sync():
     """执行全量数据同步"""
+    db = SessionLocal()
     try:
-        sync_service = UnifiedSyncService(db)
-        
-        # 同步基础数据
-        await sync_service.sync_drivers()
-        await sync_service.sync_constructors()
-        await sync_service.sync_circuits()
-        await sync_service.sync_races()
-        
-        # 同步积分榜
-        await sync_service.sync_driver_standings()
-        await sync_service.sync_constructor_standings()
-        
+        UnifiedSyncService(db).sync_all_data()
         print("✅ 全量数据同步完成")
     except Exception as e:
         print(f"❌ 全量数据同步失败: {str(e)}")
+    finally:
+        db.close()
 
-async def run_season_sync(year: int, db: Session):
+def run_season_sync(year: int):
     """执行特定年份数据同步"""
+    db = SessionLocal()
     try:
-        sync_service = UnifiedSyncService(db)
-        await sync_service.sync_season_data(year)
+        UnifiedSyncService(db).sync_all_data([year])
         print(f"✅ {year}年数据同步完成")
     except Exception as e:
         print(f"❌ {year}年数据同步失败: {str(e)}")
+    finally:
+        db.close()
 
-async def run_standings_sync(db: Session):
+def run_standings_sync(year: int):
     """执行积分榜数据同步"""
+    db = SessionLocal()
     try:
         sync_service = UnifiedSyncService(db)
-        await sync_service.sync_driver_standings()
-        await sync_service.sync_constructor_standings()
-        print("✅ 积分榜数据同步完成")
+        driver_success = sync_service.sync_driver_standings(year)
+        constructor_success = sync_service.sync_constructor_standings(year)
+        if driver_success and constructor_success:
+            print(f"✅ {year}年积分榜数据同步完成")
+        else:
+            print(f"⚠️ {year}年积分榜数据同步部分失败")
     except Exception as e:
-        print(f"❌ 积分榜数据同步失败: {str(e)}")
\ No newline at end of file
+        print(f"❌ 积分榜数据同步失败: {str(e)}")
+    finally:
+        db.close()
@@ -59,7 +59,7 @@ async def schedule_post_race_sync(
             )
         
         # 检查是否已有同步计划
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         existing_schedule = sync_service.get_schedule(season_year, race_round)
         
         if existing_schedule:
@@ -113,7 +113,7 @@ async def get_post_race_schedule(
     获取指定比赛的赛后同步计划
     """
     try:
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         schedule = sync_service.get_schedule(season_year, race_round)
         
         if not schedule:
@@ -144,7 +144,8 @@ async def get_post_race_schedule(
                         "executed_time": attempt.executed_time.isoformat() if attempt.executed_time else None,
                         "status": attempt.status.value,
                         "results": attempt.results,
-                        "error_message": attempt.error_message
+                        "error_message": attempt.error_message,
+                        "cache_warming": attempt.cache_warming
                     }
                     for attempt in schedule.attempts
                 ]
@@ -168,7 +169,7 @@ async def cancel_post_race_schedule(
     取消指定比赛的赛后同步计划
     """
     try:
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         success = sync_service.cancel_schedule(season_year, race_round)
         
         if not success:
@@ -203,7 +204,7 @@ async def execute_sync_immediately(
     """
     try:
         # 验证同步计划存在
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         schedule = sync_service.get_schedule(season_year, race_round)
         
         if not schedule:
@@ -261,7 +262,7 @@ async def get_all_schedules(
         status_filter: 按状态过滤 (pending/completed/failed)
     """
     try:
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         schedules = sync_service.get_all_schedules()
         
         # 应用过滤器
@@ -311,7 +312,7 @@ async def get_pending_syncs(db: Session = Depends(get_db)):
     获取所有待执行的同步任务
     """
     try:
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         pending_syncs = sync_service.get_pending_syncs()
         
         result_syncs = []
@@ -414,7 +415,7 @@ async def get_sync_stats(
     获取同步统计信息
     """
     try:
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         schedules = sync_service.get_all_schedules()
         
         # 应用季节过滤
@@ -3,7 +3,7 @@
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from datetime import datetime, date
 
 from app.api.deps import get_db
@@ -11,80 +11,101 @@ from app.models.race import Race
 from app.models.season import Season
 from app.models.circuit import Circuit
 from app.schemas.race import RaceResponse
-from app.schemas.base import ApiResponse
+from app.schemas.base import ApiResponse, PageResponse
 from app.models.result import Result
 from app.models.driver import Driver
+from app.core.cache import redis_cache, add_cache_tags, season_tag, circuit_tag
+from app.core.data_version import GLOBAL_SCOPE, season_scope
+from app.api.pagination import Keyset, CachedTotal
+from app.api.fields import FIELDS_DESCRIPTION, FieldSet, Related
+from app.api.v1.endpoints.circuits import CIRCUIT_FIELDS
 
 router = APIRouter()
 
+# 比赛列表按日期排序，ID 保证排序键唯一
+RACE_KEYSET = Keyset("races", Race.event_date, Race.id)
 
-@router.get("/", response_model=ApiResponse[List[RaceResponse]])
-async def get_races(
+_RACE_RELATED = {
+    "season_name": Related(Race.season, Season.name),
+    "circuit_name": Related(Race.circuit, Circuit.circuit_name),
+    "circuit_country": Related(Race.circuit, Circuit.country),
+}
+
+# 列表不包含完整的赛道信息；选择字段时仍加载赛季年份和赛道ID，用于缓存标签
+RACE_FIELDS = FieldSet(
+    Race, RaceResponse, "id",
+    exclude=("circuit",), related=_RACE_RELATED, always=(Related(Race.season, Season.year),),
+)
+
+# 详情包含完整的 circuit 对象，不需要时可以通过 fields 省略
+RACE_DETAIL_FIELDS = FieldSet(
+    Race, RaceResponse, "id",
+    related={**_RACE_RELATED, "circuit": Related(Race.circuit, serialize=CIRCUIT_FIELDS.serialize)},
+)
+
+
+@router.get("/", response_model=PageResponse[List[RACE_FIELDS.item]])
+@redis_cache(prefix="races", ttl=3600, tags=("season:{season}",), model=PageResponse[List[RACE_FIELDS.item]])  # 缓存1小时
+def get_races(
     season: Optional[int] = Query(None, description="赛季年份"),
-    page: int = Query(1, ge=1, description="页码"),
+    page: int = Query(1, ge=1, description="页码（传入 cursor 时忽略）"),
     size: int = Query(20, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    include_total: bool = Query(False, description="是否返回数据总数"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db),
 ):
     """
     获取比赛列表
+    支持页码分页和游标分页，游标分页的任意页面代价相同
     """
     try:
-        query = db.query(Race).options(
-            joinedload(Race.season),
-            joinedload(Race.circuit)
-        )
+        selected = RACE_FIELDS.parse(fields)
+        query = db.query(Race).options(*RACE_FIELDS.options(selected, *RACE_KEYSET.columns, Race.circuit_id))
         
         if season:
             query = query.join(Season).filter(Season.year == season)
         
-        # 按日期排序
-        query = query.order_by(Race.event_date.asc())
+        # 按日期排序并分页
+        rows = RACE_KEYSET.apply(query, cursor, size, offset=(page - 1) * size).all()
+        races, next_cursor = RACE_KEYSET.page(rows, size)
         
-        # 分页
-        races = query.offset((page - 1) * size).limit(size).all()
+        total = None
+        if include_total:
+            count_query = db.query(Race)
+            if season:
+                count_query = count_query.join(Season).filter(Season.year == season)
+            total = CachedTotal(
+                "races", season_scope(season) if season else GLOBAL_SCOPE, season=season
+            ).resolve(count_query.count)
         
         # 转换数据，添加关联字段
         race_responses = []
         for race in races:
-            race_dict = {
-                "id": race.id,
-                "season_id": race.season_id,
-                "circuit_id": race.circuit_id,
-                "round_number": race.round_number,
-                "country": race.country,
-                "location": race.location,
-                "official_event_name": race.official_event_name,
-                "event_date": race.event_date,
-                "event_format": race.event_format,
-                "is_sprint": race.is_sprint,
-                "session1": race.session1,
-                "session1_date": race.session1_date,
-                "session2": race.session2,
-                "session2_date": race.session2_date,
-                "session3": race.session3,
-                "session3_date": race.session3_date,
-                "session4": race.session4,
-                "session4_date": race.session4_date,
-                "session5": race.session5,
-                "session5_date": race.session5_date,
-                "season_name": race.season.name if race.season else None,
-                "circuit_name": race.circuit.circuit_name if race.circuit else None,
-                "circuit_country": race.circuit.country if race.circuit else None,
-            }
-            race_responses.append(race_dict)
+            if race.season:
+                add_cache_tags(season_tag(race.season.year))
+            # 响应包含赛道名称和国家，赛道同步后需要失效
+            add_cache_tags(circuit_tag(race.circuit_id))
+            race_responses.append(RACE_FIELDS.serialize(race, selected))
         
-        return ApiResponse(
+        return PageResponse(
             success=True,
             message="获取比赛列表成功",
-            data=race_responses
+            data=race_responses,
+            next_cursor=next_cursor,
+            total=total,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取比赛列表失败: {str(e)}")
 
 
-@router.get("/upcoming", response_model=ApiResponse[List[RaceResponse]])
-async def get_upcoming_races(
+@router.get("/upcoming", response_model=ApiResponse[List[RACE_FIELDS.item]])
+@redis_cache(prefix="races_upcoming", ttl=600, model=ApiResponse[List[RACE_FIELDS.item]])  # 缓存10分钟，日期变化后尽快更新
+def get_upcoming_races(
     limit: int = Query(5, ge=1, le=20, description="返回数量"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db),
 ):
     """
@@ -93,9 +114,9 @@ async def get_upcoming_races(
     try:
         today = date.today()
         
+        selected = RACE_FIELDS.parse(fields)
         races = db.query(Race).options(
-            joinedload(Race.season),
-            joinedload(Race.circuit)
+            *RACE_FIELDS.options(selected, Race.event_date, Race.circuit_id)
         ).filter(
             Race.event_date >= today
         ).order_by(
@@ -105,112 +126,45 @@ async def get_upcoming_races(
         # 转换数据
         race_responses = []
         for race in races:
-            race_dict = {
-                "id": race.id,
-                "season_id": race.season_id,
-                "circuit_id": race.circuit_id,
-                "round_number": race.round_number,
-                "country": race.country,
-                "location": race.location,
-                "official_event_name": race.official_event_name,
-                "event_date": race.event_date,
-                "event_format": race.event_format,
-                "is_sprint": race.is_sprint,
-                "session1": race.session1,
-                "session1_date": race.session1_date,
-                "session2": race.session2,
-                "session2_date": race.session2_date,
-                "session3": race.session3,
-                "session3_date": race.session3_date,
-                "session4": race.session4,
-                "session4_date": race.session4_date,
-                "session5": race.session5,
-                "session5_date": race.session5_date,
-                "season_name": race.season.name if race.season else None,
-                "circuit_name": race.circuit.circuit_name if race.circuit else None,
-                "circuit_country": race.circuit.country if race.circuit else None,
-            }
-            race_responses.append(race_dict)
+            if race.season:
+                add_cache_tags(season_tag(race.season.year))
+            # 响应包含赛道名称和国家，赛道同步后需要失效
+            add_cache_tags(circuit_tag(race.circuit_id))
+            race_responses.append(RACE_FIELDS.serialize(race, selected))
         
         return ApiResponse(
             success=True,
             message="获取即将到来的比赛成功",
             data=race_responses
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取即将到来的比赛失败: {str(e)}")
 
 
-@router.get("/{race_id}", response_model=ApiResponse[RaceResponse])
-async def get_race(
+@router.get("/{race_id}", response_model=ApiResponse[RACE_DETAIL_FIELDS.item])
+def get_race(
     race_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db),
 ):
     """
     获取单个比赛详情
     """
     try:
+        selected = RACE_DETAIL_FIELDS.parse(fields)
         race = db.query(Race).options(
-            joinedload(Race.season),
-            joinedload(Race.circuit)
+            *RACE_DETAIL_FIELDS.options(selected)
         ).filter(Race.id == race_id).first()
         
         if not race:
             raise HTTPException(status_code=404, detail="比赛不存在")
         
-        race_dict = {
-            "id": race.id,
-            "season_id": race.season_id,
-            "circuit_id": race.circuit_id,
-            "round_number": race.round_number,
-            "country": race.country,
-            "location": race.location,
-            "official_event_name": race.official_event_name,
-            "event_date": race.event_date,
-            "event_format": race.event_format,
-            "is_sprint": race.is_sprint,
-            "session1": race.session1,
-            "session1_date": race.session1_date,
-            "session2": race.session2,
-            "session2_date": race.session2_date,
-            "session3": race.session3,
-            "session3_date": race.session3_date,
-            "session4": race.session4,
-            "session4_date": race.session4_date,
-            "session5": race.session5,
-            "session5_date": race.session5_date,
-            "season_name": race.season.name if race.season else None,
-            "circuit_name": race.circuit.circuit_name if race.circuit else None,
-            "circuit_country": race.circuit.country if race.circuit else None,
-            # 包含完整的circuit对象
-            "circuit": {
-                "circuit_id": race.circuit.circuit_id,
-                "circuit_url": race.circuit.circuit_url,
-                "circuit_name": race.circuit.circuit_name,
-                "lat": race.circuit.lat,
-                "long": race.circuit.long,
-                "locality": race.circuit.locality,
-                "country": race.circuit.country,
-                "length": race.circuit.length,
-                "corners": race.circuit.corners,
-                "lap_record": race.circuit.lap_record,
-                "lap_record_driver": race.circuit.lap_record_driver,
-                "lap_record_year": race.circuit.lap_record_year,
-                "first_grand_prix": race.circuit.first_grand_prix,
-                "typical_lap_count": race.circuit.typical_lap_count,
-                "race_distance": race.circuit.race_distance,
-                "circuit_layout_image_url": race.circuit.circuit_layout_image_url,
-                "circuit_layout_image_path": race.circuit.circuit_layout_image_path,
-                "description": race.circuit.description,
-                "characteristics": race.circuit.characteristics,
-                "is_active": race.circuit.is_active,
-            } if race.circuit else None,
-        }
-        
         return ApiResponse(
             success=True,
             message="获取比赛详情成功",
-            data=race_dict
+            data=RACE_DETAIL_FIELDS.serialize(race, selected)
         )
     except HTTPException:
         raise
@@ -219,6 +173,7 @@ async def get_race(
 
 
 @router.get("/{race_id}/podium", response_model=ApiResponse[list])
+@redis_cache(prefix="race_podium", ttl=3600, tags=("race:{race_id}",), model=ApiResponse[list])  # 缓存1小时
 def get_race_podium(race_id: int, db: Session = Depends(get_db)):
     """
     获取指定比赛的前三名结果
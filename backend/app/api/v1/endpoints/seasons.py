@@ -1,33 +1,41 @@
 """
 赛季相关的API端点
 """
+from email.utils import formatdate
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.models.season import Season
 from app.schemas.season import SeasonResponse
-from app.schemas.base import ApiResponse
+from app.schemas.base import ApiResponse, PageResponse
+from app.api.pagination import Keyset
+from app.core.config import settings
+from app.services.season_bundle import SeasonBundle, season_bundles
 
 router = APIRouter()
 
+SEASON_KEYSET = Keyset("seasons", Season.year, descending=True)
 
-@router.get("/", response_model=ApiResponse[List[SeasonResponse]])
+
+@router.get("/", response_model=PageResponse[List[SeasonResponse]])
 def get_seasons(
     db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0, description="跳过的记录数"),
+    skip: int = Query(0, ge=0, description="跳过的记录数（传入 cursor 时忽略）"),
     limit: int = Query(100, ge=1, le=1000, description="返回的记录数"),
-    year: Optional[int] = Query(None, ge=1950, le=2030, description="按年份筛选")
+    year: Optional[int] = Query(None, ge=1950, le=2030, description="按年份筛选"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
 ):
-    """获取赛季列表"""
+    """获取赛季列表，按年份倒序，支持 skip/limit 和游标分页"""
     try:
         query = db.query(Season)
         
         if year is not None:
             query = query.filter(Season.year == year)
         
-        seasons = query.order_by(Season.year.desc()).offset(skip).limit(limit).all()
+        rows = SEASON_KEYSET.apply(query, cursor, limit, offset=skip).all()
+        seasons, next_cursor = SEASON_KEYSET.page(rows, limit)
         
         # 手动构造返回数据
         season_list = []
@@ -42,11 +50,14 @@ def get_seasons(
             }
             season_list.append(season_data)
         
-        return ApiResponse(
+        return PageResponse(
             success=True,
             message="获取赛季列表成功",
-            data=season_list
+            data=season_list,
+            next_cursor=next_cursor
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取赛季列表失败: {str(e)}")
 
@@ -110,6 +121,60 @@ def get_season_by_year(year: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"获取赛季失败: {str(e)}")
 
 
+def _bundle_response(request: Request, bundle: SeasonBundle, cache_control: str) -> Response:
+    """
+    返回数据包：客户端支持 gzip 时直接返回预先压缩的内容；
+    If-None-Match 与内容哈希一致时返回 304
+    """
+    headers = {
+        "ETag": bundle.etag,
+        "Last-Modified": formatdate(bundle.generated_at, usegmt=True),
+        "Cache-Control": cache_control,
+        "Content-Location": f"{settings.api_v1_str}/seasons/{bundle.year}/bundle/{bundle.content_hash}",
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and bundle.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=bundle.body, media_type="application/json", headers=headers)
+    return Response(content=bundle.decompressed(), media_type="application/json", headers=headers)
+
+
+def _get_bundle(db: Session, year: int) -> SeasonBundle:
+    try:
+        bundle = season_bundles.get(db, year)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"生成赛季数据包失败: {str(e)}")
+    if bundle is None:
+        raise HTTPException(status_code=404, detail=f"未找到{year}赛季")
+    return bundle
+
+
+@router.get("/{year}/bundle")
+def get_season_bundle(year: int, request: Request, db: Session = Depends(get_db)):
+    """
+    赛季数据包：比赛、赛道、比赛结果、领奖台和车手/车队积分榜
+    数据包在同步后预先生成并压缩，请求不访问数据库；ETag 为内容哈希，
+    Content-Location 指向带哈希的地址，该地址的内容不会变化，可以长期缓存（适合前端静态生成）
+    """
+    bundle = _get_bundle(db, year)
+    return _bundle_response(
+        request, bundle,
+        f"public, max-age={settings.season_bundle_max_age}, stale-while-revalidate={settings.season_bundle_max_age * 10}",
+    )
+
+
+@router.get("/{year}/bundle/{content_hash}")
+def get_season_bundle_by_hash(year: int, content_hash: str, request: Request, db: Session = Depends(get_db)):
+    """按内容哈希获取赛季数据包，内容不变，缓存一年；哈希不是当前数据包时返回 404"""
+    bundle = _get_bundle(db, year)
+    if bundle.content_hash != content_hash:
+        raise HTTPException(status_code=404, detail=f"{year}赛季数据包 {content_hash} 已过期")
+    return _bundle_response(request, bundle, "public, max-age=31536000, immutable")
+
+
 @router.get("/{season_id}", response_model=ApiResponse[SeasonResponse])
 def get_season(season_id: int, db: Session = Depends(get_db)):
     """按ID获取赛季"""
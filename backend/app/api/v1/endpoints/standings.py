@@ -3,35 +3,68 @@
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
+from sqlalchemy import func, select
 
-from app.api.deps import get_db
-from app.models.standings import DriverStanding, ConstructorStanding
+from app.api.deps import get_db, get_async_db
+from app.models.standings import (
+    DriverStanding, ConstructorStanding,
+    DriverStandingSnapshot, ConstructorStandingSnapshot,
+    DriverStandingRead,
+)
 from app.models.driver import Driver
 from app.models.constructor import Constructor
 from app.models.season import Season  # 导入 Season 模型
-from app.models.driver_season import DriverSeason # 导入 DriverSeason 模型
-from app.schemas.standings import DriverStandingResponse, ConstructorStandingResponse, StandingHistoryResponse
+from app.schemas.standings import (
+    DriverStandingResponse, ConstructorStandingResponse, StandingHistoryResponse,
+    StandingProgressionSeries, StandingProgressionResponse,
+)
 from app.schemas.base import ApiResponse
-from app.core.cache import redis_cache
+from app.core.cache import redis_cache, add_cache_tags, season_tag
+from app.core.database import gather_queries
+from app.core.data_version import GLOBAL_SCOPE, season_scope
+from app.api.pagination import Keyset, CachedTotal
 
 router = APIRouter()
 
+# 历史积分榜按赛季倒序，ID 保证排序键唯一
+DRIVER_HISTORY_KEYSET = Keyset("driver_standing_history", DriverStanding.season_id, DriverStanding.id, descending=True)
+CONSTRUCTOR_HISTORY_KEYSET = Keyset(
+    "constructor_standing_history", ConstructorStanding.season_id, ConstructorStanding.id, descending=True
+)
+
+async def _history_total_scope(db: AsyncSession, season: Optional[int]) -> str:
+    """
+    历史积分榜总数缓存使用的版本范围
+    按赛季（ID）过滤时使用该赛季的版本，其他赛季的写入不会使总数缓存失效；
+    不过滤时使用全局版本（所有范围中最新的版本）
+    """
+    if season:
+        year = await db.scalar(select(Season.year).where(Season.id == season))
+        if year is not None:
+            return season_scope(year)
+    return GLOBAL_SCOPE
+
+
 def _get_season_id(db: Session, season_id: Optional[int], year: Optional[int]) -> tuple[int, int]:
     """
     根据传入的 season_id 或 year 确定最终的赛季ID和年份.
     - 如果提供了 season_id, 直接使用.
     - 如果提供了 year, 查询对应的 season_id.
     - 如果都未提供, 获取最新的赛季.
+    解析出的赛季作为缓存标签，该赛季数据同步后缓存失效.
     """
     if season_id:
         season = db.query(Season).filter(Season.id == season_id).first()
         if not season:
             raise HTTPException(status_code=404, detail=f"未找到 ID 为 {season_id} 的赛季")
+        add_cache_tags(season_tag(season.year))
         return season.id, season.year
 
     if year:
+        add_cache_tags(season_tag(year))
         season = db.query(Season).filter(Season.year == year).first()
         if not season:
             # 兼容前端：如果某年没有数据，返回空列表而不是404
@@ -42,12 +75,13 @@ def _get_season_id(db: Session, season_id: Optional[int], year: Optional[int]) -
     active_season = db.query(Season).order_by(Season.year.desc()).first()
     if not active_season:
         raise HTTPException(status_code=404, detail="未找到任何赛季")
+    add_cache_tags(season_tag(active_season.year))
     return active_season.id, active_season.year
 
 
 @router.get("/drivers", response_model=ApiResponse[List[DriverStandingResponse]])
-@redis_cache(prefix="driver_standings", ttl=1800)  # 缓存30分钟
-async def get_driver_standings(
+@redis_cache(prefix="driver_standings", ttl=1800, model=ApiResponse[List[DriverStandingResponse]])  # 缓存30分钟
+def get_driver_standings(
     db: Session = Depends(get_db),
     season_id: Optional[int] = Query(None, description="赛季ID (优先)"),
     year: Optional[int] = Query(None, description="赛季年份"),
@@ -56,58 +90,39 @@ async def get_driver_standings(
     获取车手积分榜.
     可通过 season_id 或 year 查询.
     如果两者都未提供, 则返回当前活跃赛季的数据.
+    数据来自同步时重建的读模型（已包含车手信息和官方指定车队）, 一次索引扫描即可返回.
     """
     try:
-        final_season_id, current_year = _get_season_id(db, season_id, year)
-
-        # 1. 获取官方指定车队信息
-        official_teams_query = (
-            db.query(DriverSeason)
-            .options(
-                joinedload(DriverSeason.driver),
-                joinedload(DriverSeason.constructor)
-            )
-            .filter(DriverSeason.season_id == final_season_id)
-        )
-        official_teams_list = official_teams_query.all()
-        official_teams_map = {
-            item.driver_id: item.constructor for item in official_teams_list
-        }
+        query = db.query(DriverStandingRead)
+        if season_id:
+            query = query.filter(DriverStandingRead.season_id == season_id)
+        elif year:
+            query = query.filter(DriverStandingRead.season_year == year)
+        else:
+            latest_year = db.query(func.max(Season.year)).scalar_subquery()
+            query = query.filter(DriverStandingRead.season_year == latest_year)
 
+        standings = query.order_by(DriverStandingRead.position.asc()).all()
 
-        standings = (
-            db.query(DriverStanding)
-            .options(
-                joinedload(DriverStanding.driver),
-                joinedload(DriverStanding.constructor),
-            )
-            .filter(DriverStanding.season_id == final_season_id)
-            .order_by(DriverStanding.position.asc())
-            .all()
-        )
+        if not standings:
+            # 没有数据时按原逻辑区分赛季不存在（404 / 空列表提示）
+            _get_season_id(db, season_id, year)
+            return ApiResponse(success=True, message="获取车手积分榜成功", data=[])
 
-        result = []
-        for s in standings:
-            if not s.driver:
-                continue
-
-            # 2. 检查是否有官方指定的车队，并进行覆盖
-            final_constructor = official_teams_map.get(s.driver.driver_id, s.constructor)
-
-            if not final_constructor:
-                continue
-
-            result.append(DriverStandingResponse(
+        add_cache_tags(season_tag(standings[0].season_year))
+        result = [
+            DriverStandingResponse(
                 position=s.position,
                 points=s.points,
                 wins=s.wins,
-                driver_id=s.driver.driver_id,
-                driver_name=f"{s.driver.forename} {s.driver.surname}",
-                nationality=s.driver.nationality,
-                constructor_id=final_constructor.constructor_id,
-                constructor_name=final_constructor.name,
-            ))
-
+                driver_id=s.driver_id,
+                driver_name=s.driver_name,
+                nationality=s.nationality,
+                constructor_id=s.constructor_id,
+                constructor_name=s.constructor_name,
+            )
+            for s in standings
+        ]
 
         return ApiResponse(success=True, message="获取车手积分榜成功", data=result)
 
@@ -126,8 +141,8 @@ async def get_driver_standings(
 
 
 @router.get("/constructors", response_model=ApiResponse[List[ConstructorStandingResponse]])
-@redis_cache(prefix="constructor_standings", ttl=1800)  # 缓存30分钟
-async def get_constructor_standings(
+@redis_cache(prefix="constructor_standings", ttl=1800, model=ApiResponse[List[ConstructorStandingResponse]])  # 缓存30分钟
+def get_constructor_standings(
     db: Session = Depends(get_db),
     season_id: Optional[int] = Query(None, description="赛季ID (优先)"),
     year: Optional[int] = Query(None, description="赛季年份"),
@@ -176,14 +191,130 @@ async def get_constructor_standings(
         )
 
 
+def _build_progression(year: int, rows) -> StandingProgressionResponse:
+    """将按轮次排序的快照行整理为每个车手/车队一条走势"""
+    series: dict[str, StandingProgressionSeries] = {}
+    rounds: set[int] = set()
+    for row in rows:
+        rounds.add(row.round_number)
+        item = series.get(row.id)
+        if item is None:
+            item = series[row.id] = StandingProgressionSeries(
+                id=row.id, name=row.name, rounds=[], points=[], positions=[]
+            )
+        item.rounds.append(row.round_number)
+        item.points.append(row.points)
+        item.positions.append(row.position)
+        item.constructor_id = getattr(row, "constructor_id", None)
+
+    # 按最近一轮的排名排序
+    ordered = sorted(
+        series.values(),
+        key=lambda s: (s.positions[-1] is None, s.positions[-1] or 0, -s.points[-1]),
+    )
+    return StandingProgressionResponse(season=year, rounds=sorted(rounds), series=ordered)
+
+
+@router.get("/drivers/progression", response_model=ApiResponse[StandingProgressionResponse])
+@redis_cache(prefix="driver_standings_progression", ttl=1800, model=ApiResponse[StandingProgressionResponse])  # 缓存30分钟
+def get_driver_standings_progression(
+    db: Session = Depends(get_db),
+    season_id: Optional[int] = Query(None, description="赛季ID (优先)"),
+    year: Optional[int] = Query(None, description="赛季年份"),
+    driver_id: Optional[str] = Query(None, description="只返回指定车手"),
+):
+    """
+    获取赛季内车手积分的逐轮走势.
+    数据来自每轮积分榜快照，按 (season_id, round_number) 一次索引范围扫描.
+    """
+    try:
+        final_season_id, final_year = _get_season_id(db, season_id, year)
+
+        query = (
+            db.query(
+                DriverStandingSnapshot.driver_id.label("id"),
+                (Driver.forename + " " + Driver.surname).label("name"),
+                DriverStandingSnapshot.constructor_id,
+                DriverStandingSnapshot.round_number,
+                DriverStandingSnapshot.points,
+                DriverStandingSnapshot.position,
+            )
+            .join(Driver, Driver.driver_id == DriverStandingSnapshot.driver_id)
+            .filter(DriverStandingSnapshot.season_id == final_season_id)
+        )
+        if driver_id:
+            query = query.filter(DriverStandingSnapshot.driver_id == driver_id)
+
+        rows = query.order_by(DriverStandingSnapshot.round_number.asc()).all()
+
+        return ApiResponse(
+            success=True,
+            message="获取车手积分走势成功",
+            data=_build_progression(final_year, rows),
+        )
+
+    except HTTPException as e:
+        if e.status_code == 200:
+            return ApiResponse(success=True, message=e.detail, data=None)
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取车手积分走势失败: {str(e)}")
+
+
+@router.get("/constructors/progression", response_model=ApiResponse[StandingProgressionResponse])
+@redis_cache(prefix="constructor_standings_progression", ttl=1800, model=ApiResponse[StandingProgressionResponse])  # 缓存30分钟
+def get_constructor_standings_progression(
+    db: Session = Depends(get_db),
+    season_id: Optional[int] = Query(None, description="赛季ID (优先)"),
+    year: Optional[int] = Query(None, description="赛季年份"),
+    constructor_id: Optional[str] = Query(None, description="只返回指定车队"),
+):
+    """
+    获取赛季内车队积分的逐轮走势.
+    数据来自每轮积分榜快照，按 (season_id, round_number) 一次索引范围扫描.
+    """
+    try:
+        final_season_id, final_year = _get_season_id(db, season_id, year)
+
+        query = (
+            db.query(
+                ConstructorStandingSnapshot.constructor_id.label("id"),
+                Constructor.name.label("name"),
+                ConstructorStandingSnapshot.round_number,
+                ConstructorStandingSnapshot.points,
+                ConstructorStandingSnapshot.position,
+            )
+            .join(Constructor, Constructor.constructor_id == ConstructorStandingSnapshot.constructor_id)
+            .filter(ConstructorStandingSnapshot.season_id == final_season_id)
+        )
+        if constructor_id:
+            query = query.filter(ConstructorStandingSnapshot.constructor_id == constructor_id)
+
+        rows = query.order_by(ConstructorStandingSnapshot.round_number.asc()).all()
+
+        return ApiResponse(
+            success=True,
+            message="获取车队积分走势成功",
+            data=_build_progression(final_year, rows),
+        )
+
+    except HTTPException as e:
+        if e.status_code == 200:
+            return ApiResponse(success=True, message=e.detail, data=None)
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取车队积分走势失败: {str(e)}")
+
+
 @router.get("/drivers/{driver_id}/history")
-@redis_cache(prefix="driver_standings_history", ttl=3600)  # 缓存1小时
+@redis_cache(prefix="driver_standings_history", ttl=3600, tags=("driver:{driver_id}",))  # 缓存1小时
 async def get_driver_standing_history(
     driver_id: str,
     season: Optional[int] = Query(None, description="赛季年份（可选）"),
     limit: int = Query(20, ge=1, le=100, description="返回记录数量限制"),
-    offset: int = Query(0, ge=0, description="偏移量"),
-    db: Session = Depends(get_db)
+    offset: int = Query(0, ge=0, description="偏移量（传入 cursor 时忽略）"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取指定车手的积分榜历史
@@ -193,30 +324,44 @@ async def get_driver_standing_history(
         season: 赛季年份（可选）
         limit: 返回记录数量限制
         offset: 偏移量
+        cursor: 游标，传入时从上一页最后一条之后开始
     
     Returns:
         车手积分榜历史
     """
     try:
-        # 验证车手是否存在
-        driver = db.query(Driver).filter(Driver.driver_id == driver_id).first()
-        if not driver:
-            raise HTTPException(status_code=404, detail="车手不存在")
-        
-        # 构建查询
-        query = db.query(DriverStanding).options(
-            joinedload(DriverStanding.constructor)
-        ).filter(DriverStanding.driver_id == driver_id)
-        
+        conditions = [DriverStanding.driver_id == driver_id]
         if season:
-            query = query.filter(DriverStanding.season_id == season)
+            conditions.append(DriverStanding.season_id == season)
+        page_query = DRIVER_HISTORY_KEYSET.apply(
+            select(DriverStanding).options(joinedload(DriverStanding.constructor)).where(*conditions),
+            cursor, limit, offset=offset,
+        )
         
-        # 按赛季排序
-        query = query.order_by(desc(DriverStanding.season_id))
+        # 总数按数据版本缓存，未缓存时才查询
+        total_cache = CachedTotal(
+            "driver_standing_history", await _history_total_scope(db, season), driver_id=driver_id, season=season
+        )
+        total = await run_in_threadpool(total_cache.get)
+        queries = [
+            lambda session: session.scalar(select(Driver).where(Driver.driver_id == driver_id)),
+            lambda session: session.scalars(page_query),
+        ]
+        if total is None:
+            queries.append(lambda session: session.scalar(
+                select(func.count()).select_from(DriverStanding).where(*conditions)
+            ))
         
-        # 分页
-        total = query.count()
-        standings = query.offset(offset).limit(limit).all()
+        # 车手、当前页和总数相互独立，并发查询
+        driver, rows, *counted = await gather_queries(db, *queries)
+        
+        # 验证车手是否存在
+        if not driver:
+            raise HTTPException(status_code=404, detail="车手不存在")
+        if counted:
+            total = counted[0]
+            await run_in_threadpool(total_cache.set, total)
+        standings, next_cursor = DRIVER_HISTORY_KEYSET.page(rows.all(), limit)
         
         # 转换为响应格式
         standings_data = []
@@ -247,7 +392,8 @@ async def get_driver_standing_history(
             "standings": standings_data,
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor
         }
         
     except HTTPException:
@@ -257,13 +403,14 @@ async def get_driver_standing_history(
 
 
 @router.get("/constructors/{constructor_id}/history")
-@redis_cache(prefix="constructor_standings_history", ttl=3600)  # 缓存1小时
+@redis_cache(prefix="constructor_standings_history", ttl=3600, tags=("constructor:{constructor_id}",))  # 缓存1小时
 async def get_constructor_standing_history(
     constructor_id: str,
     season: Optional[int] = Query(None, description="赛季年份（可选）"),
     limit: int = Query(20, ge=1, le=100, description="返回记录数量限制"),
-    offset: int = Query(0, ge=0, description="偏移量"),
-    db: Session = Depends(get_db)
+    offset: int = Query(0, ge=0, description="偏移量（传入 cursor 时忽略）"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取指定车队的积分榜历史
@@ -273,28 +420,46 @@ async def get_constructor_standing_history(
         season: 赛季年份（可选）
         limit: 返回记录数量限制
         offset: 偏移量
+        cursor: 游标，传入时从上一页最后一条之后开始
     
     Returns:
         车队积分榜历史
     """
     try:
-        # 验证车队是否存在
-        constructor = db.query(Constructor).filter(Constructor.constructor_id == constructor_id).first()
-        if not constructor:
-            raise HTTPException(status_code=404, detail="车队不存在")
-        
-        # 构建查询
-        query = db.query(ConstructorStanding).filter(ConstructorStanding.constructor_id == constructor_id)
-        
+        conditions = [ConstructorStanding.constructor_id == constructor_id]
         if season:
-            query = query.filter(ConstructorStanding.season_id == season)
+            conditions.append(ConstructorStanding.season_id == season)
+        page_query = CONSTRUCTOR_HISTORY_KEYSET.apply(
+            select(ConstructorStanding).where(*conditions), cursor, limit, offset=offset
+        )
         
-        # 按赛季排序
-        query = query.order_by(desc(ConstructorStanding.season_id))
+        # 总数按数据版本缓存，未缓存时才查询
+        total_cache = CachedTotal(
+            "constructor_standing_history", await _history_total_scope(db, season),
+            constructor_id=constructor_id, season=season,
+        )
+        total = await run_in_threadpool(total_cache.get)
+        queries = [
+            lambda session: session.scalar(
+                select(Constructor).where(Constructor.constructor_id == constructor_id)
+            ),
+            lambda session: session.scalars(page_query),
+        ]
+        if total is None:
+            queries.append(lambda session: session.scalar(
+                select(func.count()).select_from(ConstructorStanding).where(*conditions)
+            ))
+        
+        # 车队、当前页和总数相互独立，并发查询
+        constructor, rows, *counted = await gather_queries(db, *queries)
         
-        # 分页
-        total = query.count()
-        standings = query.offset(offset).limit(limit).all()
+        # 验证车队是否存在
+        if not constructor:
+            raise HTTPException(status_code=404, detail="车队不存在")
+        if counted:
+            total = counted[0]
+            await run_in_threadpool(total_cache.set, total)
+        standings, next_cursor = CONSTRUCTOR_HISTORY_KEYSET.page(rows.all(), limit)
         
         # 转换为响应格式
         standings_data = []
@@ -321,7 +486,8 @@ async def get_constructor_standing_history(
             "standings": standings_data,
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor
         }
         
     except HTTPException:
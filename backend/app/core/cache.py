@@ -1,93 +1,502 @@
 """
 缓存工具模块
 提供Redis缓存装饰器和工具函数
+
+缓存条目按实体打标签（赛季、车手、车队、比赛、赛道），每个标签在 Redis 中有一个
+记录相关缓存键的集合，数据写入后按标签精确删除受影响的键
 """
-import json
+import time
+import string
+import uuid
+import asyncio
+import inspect
 import functools
-from typing import Any, Optional, Callable
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Callable, Sequence, Set
+from urllib.parse import urlencode
+
 import structlog
-from .redis import get_redis_client
+from fastapi.encoders import jsonable_encoder
+from fastapi.params import Depends as DependsParam, Param
+from fastapi import Request, Response, BackgroundTasks
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .redis import get_redis_client, get_redis_binary_client
+from .cache_codecs import get_serializer
 from .config import settings
+from .database import SessionLocal, AsyncSessionLocal
+from .local_cache import MISS, local_cache, invalidation_listener, publish_invalidation
 
 logger = structlog.get_logger()
 
+# 缓存键格式版本，键或值的结构变化时递增，旧键自然过期
+# v2: 值包装为 {"value": ..., "fresh_until": ...}，支持软/硬过期
+# v3: 值为带帧头的二进制（编码器/压缩算法/新鲜期），见 cache_codecs
+CACHE_KEY_SCHEMA_VERSION = 3
+
+# 写入缓存并登记到各标签集合，标签集合的TTL不短于其中的缓存键
+# KEYS[1]: 缓存键，KEYS[2..]: 标签集合
+# ARGV: payload, ttl
+_STORE_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 2, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    if redis.call('TTL', KEYS[i]) < tonumber(ARGV[2]) then
+        redis.call('EXPIRE', KEYS[i], ARGV[2])
+    end
+end
+return 1
+"""
+
+# 只删除自己持有的锁
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 等待其他进程重新计算时的轮询间隔（秒）
+_LOCK_POLL_INTERVAL = 0.05
+
+# 正在运行的后台刷新任务（保持引用，避免任务被回收）
+_refresh_tasks: set = set()
+
+# 批量删除时每条 DEL 命令的键数
+_DELETE_BATCH_SIZE = 500
+
+# 端点执行过程中动态添加的标签
+_current_tags: ContextVar[Optional[Set[str]]] = ContextVar("cache_tags", default=None)
+
+
+def season_tag(year: Any) -> str:
+    return f"season:{year}"
+
+
+def driver_tag(driver_id: Any) -> str:
+    return f"driver:{driver_id}"
+
+
+def constructor_tag(constructor_id: Any) -> str:
+    return f"constructor:{constructor_id}"
+
+
+def race_tag(race_id: Any) -> str:
+    return f"race:{race_id}"
+
+
+def circuit_tag(circuit_id: Any) -> str:
+    return f"circuit:{circuit_id}"
+
+
+def prefix_tag(prefix: str) -> str:
+    """每个缓存条目都带有其前缀标签，可按接口整体失效"""
+    return f"prefix:{prefix}"
 
-def cache_key_builder(prefix: str, *args, **kwargs) -> str:
+
+def _tag_key(tag: str) -> str:
+    return f"{settings.cache_prefix}:v{CACHE_KEY_SCHEMA_VERSION}:tag:{tag}"
+
+
+def add_cache_tags(*tags: str):
     """
-    构建缓存键
+    为当前正在计算的缓存条目添加标签
+    用于只有查询后才知道的实体（如未指定年份时解析出的当前赛季），在缓存装饰器外调用无效果
     """
-    key_parts = [settings.cache_prefix, prefix]
-    
-    # 添加位置参数
-    if args:
-        key_parts.extend([str(arg) for arg in args])
-    
-    # 添加关键字参数（排序后确保一致性）
-    if kwargs:
-        sorted_kwargs = sorted(kwargs.items())
-        for k, v in sorted_kwargs:
-            if v is not None:
-                key_parts.append(f"{k}:{v}")
-    
-    return ":".join(key_parts)
+    collected = _current_tags.get()
+    if collected is not None:
+        collected.update(tag for tag in tags if tag)
+
+# 不属于请求参数的注入对象，不参与构建缓存键
+_NON_KEY_TYPES = (Session, AsyncSession, Request, Response, BackgroundTasks)
+
+
+def _key_value(value: Any) -> str:
+    """缓存键中参数值的稳定字符串形式"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(_key_value(v) for v in (sorted(value) if isinstance(value, set) else value))
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+def cache_key_builder(prefix: str, params: Optional[Dict[str, Any]] = None, version: int = 1) -> str:
+    """
+    构建缓存键: {cache_prefix}:v{格式版本}:{prefix}:v{接口版本}:{排序后的查询参数}
+    值为 None 的参数不参与构建，参数顺序不影响结果
+    """
+    items = sorted((k, _key_value(v)) for k, v in (params or {}).items() if v is not None)
+    return ":".join([
+        settings.cache_prefix,
+        f"v{CACHE_KEY_SCHEMA_VERSION}",
+        prefix,
+        f"v{version}",
+        urlencode(items),
+    ])
+
+
+def _declared_key_params(func: Callable, exclude: Sequence[str] = ()) -> list:
+    """
+    函数声明的请求参数（路径/查询参数）
+    依赖注入的参数（Depends）和 Session/Request 等对象不参与构建缓存键
+    """
+    names = []
+    for name, param in inspect.signature(func).parameters.items():
+        if name in exclude or param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        if isinstance(param.default, DependsParam):
+            continue
+        annotation = param.annotation
+        if inspect.isclass(annotation) and issubclass(annotation, _NON_KEY_TYPES):
+            continue
+        names.append(name)
+    return names
+
+
+def _request_params(signature: inspect.Signature, key_params: Sequence[str], args, kwargs) -> Dict[str, Any]:
+    """从调用参数中取出参与构建缓存键的参数值（未传入的使用声明的默认值）"""
+    bound = signature.bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    params = {}
+    for name in key_params:
+        value = bound.arguments.get(name)
+        # 直接调用端点函数时默认值是 Query(...) 等声明对象
+        if isinstance(value, Param):
+            value = value.default
+        params[name] = value
+    return params
+
+
+def _session_params(signature: inspect.Signature) -> Dict[str, Callable]:
+    """注入数据库会话的参数名及对应的会话工厂，后台刷新时需要替换为新的会话"""
+    params = {}
+    for name, param in signature.parameters.items():
+        if not inspect.isclass(param.annotation):
+            continue
+        if issubclass(param.annotation, AsyncSession):
+            params[name] = AsyncSessionLocal
+        elif issubclass(param.annotation, Session):
+            params[name] = SessionLocal
+    return params
+
+
+def _acquire_lock(redis_client, cache_key: str) -> Optional[str]:
+    """尝试获取重新计算的锁（SET NX PX），成功时返回锁令牌"""
+    token = uuid.uuid4().hex
+    if redis_client.set(f"{cache_key}:lock", token, nx=True, px=int(settings.cache_lock_ttl * 1000)):
+        return token
+    return None
 
 
-def redis_cache(prefix: str, ttl: int = None):
+def _release_lock(redis_client, cache_key: str, token: str):
+    try:
+        redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"{cache_key}:lock", token)
+    except Exception as e:
+        logger.error("缓存锁释放失败", error=str(e), cache_key=cache_key)
+
+
+class _CachedEntry(NamedTuple):
+    """Redis 中的缓存条目"""
+    value: Any
+    fresh_until: float
+    size: int
+    remaining_ms: int
+
+
+def _read_entry(redis_client, cache_key: str) -> Optional[_CachedEntry]:
+    """读取并解码 Redis 中的缓存条目，不存在时返回 None"""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(cache_key)
+    pipe.pttl(cache_key)
+    raw, remaining_ms = pipe.execute()
+    if not raw:
+        return None
+    value, fresh_until = get_serializer().loads(raw)
+    return _CachedEntry(value, fresh_until, len(raw), remaining_ms)
+
+
+def _format_tags(templates: Sequence[str], params: Dict[str, Any]) -> Set[str]:
+    """用请求参数填充标签模板，缺少参数（值为 None）的模板跳过"""
+    tags = set()
+    for template in templates:
+        fields = [name for _, name, _, _ in string.Formatter().parse(template) if name]
+        if all(params.get(name) is not None for name in fields):
+            tags.add(template.format(**params))
+    return tags
+
+
+def redis_cache(
+    prefix: str,
+    ttl: int = None,
+    version: int = 1,
+    exclude: Sequence[str] = (),
+    local: bool = True,
+    local_ttl: Optional[int] = None,
+    local_max_entries: Optional[int] = None,
+    stale_ttl: Optional[int] = None,
+    tags: Sequence[str] = (),
+    model: Any = None,
+):
     """
     Redis缓存装饰器
+    缓存键只由端点声明的路径/查询参数构建，注入的数据库会话等依赖不参与；
+    Redis 之前还有一层进程内 LRU 缓存，失效消息通过 Redis pub/sub 同步到所有进程
+    
+    被装饰的端点可以是普通函数（同步查询数据库），此时在线程池中执行；
+    Redis 读写同样在线程池中执行，只有进程内缓存命中在事件循环中直接返回
+    
+    防止缓存击穿：
+    - 软过期（ttl）后仍返回旧值，同时由一个请求在后台刷新
+    - 硬过期（ttl + stale_ttl）后条目被删除，同一时间只有持有 Redis 锁的请求查询数据库，
+      其他请求等待其写入结果
     
     Args:
         prefix: 缓存键前缀
-        ttl: 过期时间（秒），默认使用配置中的cache_ttl
+        ttl: 软过期时间（秒），默认使用配置中的cache_ttl
+        version: 接口响应格式版本，响应结构变化时递增以避免读取旧格式的缓存
+        exclude: 额外排除、不参与构建缓存键的参数名
+        local: 是否使用进程内缓存层
+        local_ttl: 进程内缓存的TTL上限（秒），默认使用配置中的local_cache_ttl
+        local_max_entries: 该前缀在进程内缓存中的条目上限
+        stale_ttl: 软过期后仍可返回旧值的时间（秒），默认使用配置中的cache_stale_ttl
+        tags: 标签模板，用请求参数填充，如 "driver:{driver_id}"；
+            端点内部还可以通过 add_cache_tags 添加查询后才能确定的标签
+        model: 返回值类型（通常与路由的 response_model 相同），指定后缓存命中时
+            校验还原为该类型，命中与未命中返回相同类型的对象
     """
     def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        key_params = _declared_key_params(func, exclude)
+        session_params = _session_params(signature)
+        use_local = local and settings.local_cache_enabled
+        if use_local and local_max_entries:
+            local_cache.configure_prefix(prefix, local_max_entries)
+        adapter = TypeAdapter(model) if model is not None else None
+        is_coroutine = inspect.iscoroutinefunction(func)
+
+        def restore(value: Any) -> Any:
+            """缓存中的 JSON 兼容结构还原为返回值类型"""
+            return adapter.validate_python(value) if adapter is not None else value
+
+        async def compute(params: Dict[str, Any], args, kwargs):
+            """执行原函数并收集标签"""
+            collected = _format_tags(tags, params) | {prefix_tag(prefix)}
+            token = _current_tags.set(collected)
+            try:
+                if is_coroutine:
+                    return await func(*args, **kwargs), collected
+                # 线程池会复制当前上下文，端点中 add_cache_tags 添加到同一个集合
+                return await run_in_threadpool(func, *args, **kwargs), collected
+            finally:
+                _current_tags.reset(token)
+
+        def store(redis_client, cache_key: str, result: Any, entry_tags: Iterable[str], store_local: bool = True):
+            """写入 Redis 和本地缓存，pydantic 模型等先转换为与响应一致的 JSON 兼容结构再编码"""
+            cache_ttl = ttl or settings.cache_ttl
+            hard_ttl = cache_ttl + (settings.cache_stale_ttl if stale_ttl is None else stale_ttl)
+            try:
+                encoded = jsonable_encoder(result)
+                payload = get_serializer().dumps(encoded, time.time() + cache_ttl)
+                tag_keys = [_tag_key(tag) for tag in sorted(entry_tags)]
+                redis_client.eval(_STORE_SCRIPT, 1 + len(tag_keys), cache_key, *tag_keys, payload, hard_ttl)
+                if use_local and store_local:
+                    # 本地缓存保存返回值类型的对象，命中时无需再解码
+                    local_ttl_seconds = min(local_ttl or settings.local_cache_ttl, cache_ttl)
+                    local_value = result if adapter is not None else encoded
+                    local_cache.set(prefix, cache_key, local_value, local_ttl_seconds, len(payload))
+                logger.info("结果已缓存", cache_key=cache_key, ttl=cache_ttl, hard_ttl=hard_ttl, size=len(payload))
+            except Exception as e:
+                logger.error("缓存写入失败", error=str(e), cache_key=cache_key)
+
+        async def refresh(redis_client, cache_key: str, token: str, params: Dict[str, Any], args, kwargs):
+            """后台刷新软过期的条目，使用新的数据库会话（请求的会话在响应后关闭）"""
+            sessions = []
+            try:
+                bound = signature.bind_partial(*args, **kwargs)
+                for name, session_factory in session_params.items():
+                    sessions.append(session_factory())
+                    bound.arguments[name] = sessions[-1]
+                result, entry_tags = await compute(params, bound.args, bound.kwargs)
+                await run_in_threadpool(store, redis_client, cache_key, result, entry_tags)
+                logger.info("缓存已在后台刷新", cache_key=cache_key)
+            except Exception as e:
+                logger.error("缓存后台刷新失败", error=str(e), cache_key=cache_key)
+            finally:
+                for session in sessions:
+                    if isinstance(session, AsyncSession):
+                        await session.close()
+                    else:
+                        session.close()
+                await run_in_threadpool(_release_lock, redis_client, cache_key, token)
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            redis_client = get_redis_client()
-            cache_ttl = ttl or settings.cache_ttl
+            redis_client = get_redis_binary_client()
+            max_local_ttl = min(local_ttl or settings.local_cache_ttl, ttl or settings.cache_ttl)
             
             # 构建缓存键
-            cache_key = cache_key_builder(prefix, *args, **kwargs)
+            params = _request_params(signature, key_params, args, kwargs)
+            cache_key = cache_key_builder(prefix, params, version)
+            
+            # 第一层：进程内缓存
+            if use_local:
+                invalidation_listener.ensure_started()
+                value = local_cache.get(cache_key)
+                if value is not MISS:
+                    logger.debug("本地缓存命中", cache_key=cache_key)
+                    return value
             
+            # 第二层：Redis，Redis 不可用时直接查询
+            redis_available = True
             try:
-                # 尝试从缓存获取
-                cached_data = redis_client.get(cache_key)
-                if cached_data:
-                    logger.info("缓存命中", cache_key=cache_key)
-                    return json.loads(cached_data)
-                
-                # 缓存未命中，执行原函数
-                logger.info("缓存未命中，执行查询", cache_key=cache_key)
-                result = await func(*args, **kwargs)
-                
-                # 存储到缓存
-                redis_client.setex(
-                    cache_key,
-                    cache_ttl,
-                    json.dumps(result, default=str, ensure_ascii=False)
-                )
-                logger.info("结果已缓存", cache_key=cache_key, ttl=cache_ttl)
-                
-                return result
-                
+                entry = await run_in_threadpool(_read_entry, redis_client, cache_key)
+                if entry is not None:
+                    value = restore(entry.value)
+                    fresh_for = entry.fresh_until - time.time()
+                    if fresh_for > 0:
+                        logger.info("缓存命中", cache_key=cache_key)
+                        if use_local:
+                            # 本地副本不会比 Redis 中的新鲜期活得更久
+                            local_cache.set(
+                                prefix, cache_key, value,
+                                min(max_local_ttl, fresh_for, entry.remaining_ms / 1000), entry.size,
+                            )
+                        return value
+                    
+                    # 软过期：返回旧值，只有拿到锁的请求在后台刷新
+                    token = await run_in_threadpool(_acquire_lock, redis_client, cache_key)
+                    if token:
+                        task = asyncio.create_task(refresh(redis_client, cache_key, token, params, args, kwargs))
+                        _refresh_tasks.add(task)
+                        task.add_done_callback(_refresh_tasks.discard)
+                    logger.info("缓存已软过期，返回旧值", cache_key=cache_key, refreshing=bool(token))
+                    return value
             except Exception as e:
-                logger.error("缓存操作失败", error=str(e), cache_key=cache_key)
-                # 缓存失败时直接执行原函数
-                return await func(*args, **kwargs)
+                redis_available = False
+                logger.error("缓存读取失败", error=str(e), cache_key=cache_key)
+            
+            # 硬过期或不存在：单飞重新计算，其他请求等待结果写入
+            token = None
+            if redis_available:
+                try:
+                    token = await run_in_threadpool(_acquire_lock, redis_client, cache_key)
+                    if token is None:
+                        entry = await _wait_for_entry(redis_client, cache_key)
+                        if entry is not None:
+                            logger.info("等待其他请求重新计算后命中缓存", cache_key=cache_key)
+                            return restore(entry.value)
+                        logger.warning("等待缓存重新计算超时，直接查询", cache_key=cache_key)
+                except Exception as e:
+                    logger.error("缓存锁操作失败", error=str(e), cache_key=cache_key)
+            
+            # 缓存未命中，执行原函数（函数本身的异常直接抛出，不会重复执行）
+            logger.info("缓存未命中，执行查询", cache_key=cache_key)
+            try:
+                result, entry_tags = await compute(params, args, kwargs)
+                await run_in_threadpool(store, redis_client, cache_key, result, entry_tags)
+            finally:
+                if token:
+                    await run_in_threadpool(_release_lock, redis_client, cache_key, token)
+            
+            return result
         
+        async def warm(*args, **kwargs):
+            """
+            跳过缓存读取，重新计算并写入 Redis（缓存预热使用）
+            预热通常在 Celery worker 中运行，不写入该进程的本地缓存
+            """
+            # 直接调用时未传入的参数默认值是 Query(...) 等声明对象，替换为实际默认值
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            for name, value in bound.arguments.items():
+                if isinstance(value, Param):
+                    bound.arguments[name] = value.default
+            params = _request_params(signature, key_params, bound.args, bound.kwargs)
+            cache_key = cache_key_builder(prefix, params, version)
+            result, entry_tags = await compute(params, bound.args, bound.kwargs)
+            await run_in_threadpool(store, get_redis_binary_client(), cache_key, result, entry_tags, store_local=False)
+            return cache_key
+        
+        wrapper.warm = warm
         return wrapper
     return decorator
 
 
+async def _wait_for_entry(redis_client, cache_key: str) -> Optional[_CachedEntry]:
+    """等待持有锁的请求写入结果，锁释放后仍没有结果时返回 None"""
+    deadline = time.monotonic() + settings.cache_lock_wait
+    while time.monotonic() < deadline:
+        await asyncio.sleep(_LOCK_POLL_INTERVAL)
+        entry = await run_in_threadpool(_read_entry, redis_client, cache_key)
+        if entry is not None:
+            return entry
+        if not await run_in_threadpool(redis_client.exists, f"{cache_key}:lock"):
+            # 计算失败或锁已过期
+            return await run_in_threadpool(_read_entry, redis_client, cache_key)
+    return None
+
+
+def _delete_keys(redis_client, keys: Sequence[str]):
+    """分批删除，避免单条命令过大"""
+    for start in range(0, len(keys), _DELETE_BATCH_SIZE):
+        redis_client.delete(*keys[start:start + _DELETE_BATCH_SIZE])
+
+
+def invalidate_cache_tags(*tags: str) -> int:
+    """
+    按标签删除缓存（Redis 和所有进程的本地缓存）
+    只读取这些标签的键集合，复杂度与受影响的键数成正比
+
+    Returns:
+        int: 删除的缓存键数
+    """
+    tags = sorted({tag for tag in tags if tag})
+    if not tags:
+        return 0
+    tag_keys = [_tag_key(tag) for tag in tags]
+    keys: list = []
+    try:
+        redis_client = get_redis_client()
+        pipe = redis_client.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        keys = sorted(set().union(*pipe.execute()))
+        _delete_keys(redis_client, keys + tag_keys)
+        logger.info("缓存已按标签失效", tags=tags, count=len(keys))
+    except Exception as e:
+        logger.error("缓存失效操作失败", error=str(e), tags=tags)
+    publish_invalidation(keys=keys)
+    return len(keys)
+
+
+def invalidate_cache_prefix(prefix: str) -> int:
+    """删除某个接口前缀下的全部缓存"""
+    return invalidate_cache_tags(prefix_tag(prefix))
+
+
 def invalidate_cache_pattern(pattern: str):
     """
-    根据模式删除缓存
+    根据模式删除缓存（Redis 和所有进程的本地缓存）
+    使用 SCAN 增量遍历，只用于维护脚本；业务代码应使用 invalidate_cache_tags
     """
+    full_pattern = f"{settings.cache_prefix}:v{CACHE_KEY_SCHEMA_VERSION}:{pattern}"
     try:
         redis_client = get_redis_client()
-        keys = redis_client.keys(f"{settings.cache_prefix}:{pattern}")
+        keys = list(redis_client.scan_iter(match=full_pattern, count=_DELETE_BATCH_SIZE))
         if keys:
-            redis_client.delete(*keys)
+            _delete_keys(redis_client, keys)
             logger.info("缓存已失效", pattern=pattern, count=len(keys))
     except Exception as e:
-        logger.error("缓存失效操作失败", error=str(e), pattern=pattern)
\ No newline at end of file
+        logger.error("缓存失效操作失败", error=str(e), pattern=pattern)
+    publish_invalidation(patterns=[full_pattern])
+
+
+def get_local_cache_stats() -> Dict[str, Any]:
+    """进程内缓存统计"""
+    return local_cache.stats()
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+缓存值的序列化与压缩
+缓存值先转换为 JSON 兼容结构，再由可插拔的编码器（json / orjson / msgpack）编码，
+超过阈值时按配置压缩（zlib / zstd / lz4）。
+每个值带有帧头记录所用的编码器和压缩算法，修改配置后旧条目仍可正确读取
+"""
+import json
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 可选依赖
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - 可选依赖
+    lz4_frame = None
+
+
+# 帧头: 格式版本(1B) 编码器ID(1B) 压缩ID(1B) 新鲜期截止时间戳(8B, double)
+FRAME_VERSION = 1
+_HEADER = struct.Struct(">BBBd")
+
+
+class CodecUnavailable(Exception):
+    """编码器或压缩算法依赖的库未安装"""
+    pass
+
+
+@dataclass(frozen=True)
+class Codec:
+    """编码器：JSON 兼容结构 <-> bytes"""
+    id: int
+    name: str
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+    available: bool = True
+
+
+@dataclass(frozen=True)
+class Compressor:
+    """压缩算法"""
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+    available: bool = True
+
+
+def _json_encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+CODECS: Dict[str, Codec] = {
+    "json": Codec(1, "json", _json_encode, json.loads),
+    "orjson": Codec(
+        2, "orjson",
+        lambda value: orjson.dumps(value),
+        lambda data: orjson.loads(data),
+        available=orjson is not None,
+    ),
+    "msgpack": Codec(
+        3, "msgpack",
+        lambda value: msgpack.packb(value, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False),
+        available=msgpack is not None,
+    ),
+}
+
+COMPRESSORS: Dict[str, Compressor] = {
+    "none": Compressor(0, "none", _identity, _identity),
+    "zlib": Compressor(1, "zlib", lambda data: zlib.compress(data, 6), zlib.decompress),
+    "zstd": Compressor(
+        2, "zstd",
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+        available=zstandard is not None,
+    ),
+    "lz4": Compressor(
+        3, "lz4",
+        lambda data: lz4_frame.compress(data),
+        lambda data: lz4_frame.decompress(data),
+        available=lz4_frame is not None,
+    ),
+}
+
+_CODECS_BY_ID = {codec.id: codec for codec in CODECS.values()}
+_COMPRESSORS_BY_ID = {compressor.id: compressor for compressor in COMPRESSORS.values()}
+
+
+class CacheSerializer:
+    """
+    按配置编码/压缩缓存值
+    配置的编码器或压缩算法不可用时降级为 json / 不压缩，并记录一次警告
+    """
+
+    def __init__(self, codec: str = "json", compression: str = "none", threshold: int = 1024):
+        self.codec = self._resolve(CODECS, codec, "json", "编码器")
+        self.compressor = self._resolve(COMPRESSORS, compression, "none", "压缩算法")
+        self.threshold = threshold
+
+    @staticmethod
+    def _resolve(registry: Dict[str, Any], name: str, fallback: str, label: str):
+        item = registry.get(name)
+        if item is None:
+            raise ValueError(f"未知的缓存{label}: {name}，可选: {', '.join(registry)}")
+        if not item.available:
+            logger.warning(f"缓存{label}依赖的库未安装，降级使用 {fallback}", requested=name)
+            return registry[fallback]
+        return item
+
+    def dumps(self, value: Any, fresh_until: float) -> bytes:
+        """编码为带帧头的 bytes，value 必须是 JSON 兼容结构"""
+        body = self.codec.encode(value)
+        compressor = COMPRESSORS["none"]
+        if self.compressor.id and len(body) >= self.threshold:
+            compressed = self.compressor.compress(body)
+            # 压缩无收益时保留原文
+            if len(compressed) < len(body):
+                body, compressor = compressed, self.compressor
+        return _HEADER.pack(FRAME_VERSION, self.codec.id, compressor.id, fresh_until) + body
+
+    @staticmethod
+    def loads(data: bytes) -> Tuple[Any, float]:
+        """
+        解码带帧头的 bytes
+
+        Returns:
+            (值, 新鲜期截止时间戳)
+        """
+        version, codec_id, compressor_id, fresh_until = _HEADER.unpack_from(data)
+        if version != FRAME_VERSION:
+            raise ValueError(f"不支持的缓存帧版本: {version}")
+        codec = _CODECS_BY_ID.get(codec_id)
+        compressor = _COMPRESSORS_BY_ID.get(compressor_id)
+        if codec is None or compressor is None:
+            raise ValueError(f"未知的缓存编码: codec={codec_id} compression={compressor_id}")
+        if not codec.available or not compressor.available:
+            raise CodecUnavailable(f"缺少解码所需的库: {codec.name}/{compressor.name}")
+        return codec.decode(compressor.decompress(data[_HEADER.size:])), fresh_until
+
+
+_serializer: Optional[CacheSerializer] = None
+
+
+def get_serializer() -> CacheSerializer:
+    """按配置创建的全局序列化器"""
+    global _serializer
+    if _serializer is None:
+        _serializer = CacheSerializer(
+            settings.cache_codec,
+            settings.cache_compression,
+            settings.cache_compression_threshold,
+        )
+    return _serializer
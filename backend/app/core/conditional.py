@@ -0,0 +1,165 @@
+"""
+读接口的 HTTP 条件请求（ETag / Last-Modified / 304）
+ETag 和 Last-Modified 由请求所属范围的数据版本生成，不依赖响应内容
+（按赛季查询时使用该赛季和参考数据的版本，其他赛季的写入不会使 ETag 失效）；
+请求携带的 If-None-Match / If-Modified-Since 仍然有效时直接返回 304，
+不进入端点，也不访问数据库和缓存
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+from datetime import date
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .data_version import GLOBAL_SCOPE, REFERENCE_SCOPE, get_data_versions, season_scopes
+
+
+@dataclass(frozen=True)
+class ConditionalRoute:
+    """
+    支持条件请求的路径规则
+    - pattern: 匹配请求路径的正则表达式
+    - season_param: 表示赛季年份的查询参数，传入时使用该赛季和参考数据的版本
+    - override_params: 优先于赛季年份的参数（如 season_id），传入时使用 scopes
+    - scopes: 未按赛季查询时使用的版本范围，默认为全局版本（所有范围中最新的版本）
+    - daily: 响应随日期变化（如即将到来的比赛），ETag 中加入当天日期
+    """
+    pattern: "re.Pattern[str]"
+    season_param: Optional[str] = None
+    override_params: Tuple[str, ...] = ()
+    scopes: Tuple[str, ...] = (GLOBAL_SCOPE,)
+    daily: bool = False
+
+
+def _route(path: str, **options) -> ConditionalRoute:
+    return ConditionalRoute(re.compile(f"^{re.escape(settings.api_v1_str)}{path}"), **options)
+
+
+# 按顺序匹配，第一个匹配的规则生效
+CONDITIONAL_ROUTES: Tuple[ConditionalRoute, ...] = (
+    # 历史积分榜的 season 参数是赛季ID，使用全局版本
+    _route(r"/standings/(drivers|constructors)/[^/]+/history/?$"),
+    _route(r"/standings(/|$)", season_param="year", override_params=("season_id",)),
+    _route(r"/races/upcoming/?$", daily=True),
+    _route(r"/races(/|$)", season_param="season"),
+    # 赛道接口只包含参考数据
+    _route(r"/circuits(/|$)", scopes=(REFERENCE_SCOPE,)),
+)
+
+
+def _match(path: str, routes: Sequence[ConditionalRoute]) -> Optional[ConditionalRoute]:
+    for route in routes:
+        if route.pattern.match(path):
+            return route
+    return None
+
+
+def _version_scopes(route: ConditionalRoute, query_string: bytes) -> List[str]:
+    if route.season_param is None:
+        return list(route.scopes)
+    params = parse_qs(query_string.decode("latin-1"))
+    if any(params.get(name) for name in route.override_params):
+        return list(route.scopes)
+    values = params.get(route.season_param)
+    if values and values[0].isdigit():
+        return season_scopes(values[0])
+    return list(route.scopes)
+
+
+def _make_etag(versions: Dict[str, int], route: ConditionalRoute) -> str:
+    """
+    弱 ETag：响应体中的 timestamp 等字段每次都不同，但数据在语义上相同
+    加入应用版本，部署改变响应格式后旧 ETag 失效；任一范围的版本变化都会生成新的 ETag
+    """
+    version = max(versions.values())
+    parts = [settings.app_version] + [f"{scope}={versions[scope]}" for scope in sorted(versions)]
+    if route.daily:
+        parts.append(date.today().isoformat())
+    digest = hashlib.sha1(":".join(parts).encode()).hexdigest()[:16]
+    return f'W/"{version:x}-{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 使用弱比较"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, version: int) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # Last-Modified 只精确到秒
+    return since.timestamp() >= version // 1000
+
+
+class ConditionalRequestMiddleware:
+    """只处理匹配规则的 GET 请求，只给 200 响应添加 ETag / Last-Modified"""
+
+    def __init__(self, app: ASGIApp, routes: Sequence[ConditionalRoute] = CONDITIONAL_ROUTES):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        route = _match(scope["path"], self.routes)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        scope_names = _version_scopes(route, scope.get("query_string", b""))
+        # 版本保存在 Redis 中，读取放到线程池，不阻塞事件循环
+        versions = await run_in_threadpool(get_data_versions, scope_names)
+        if any(name not in versions for name in scope_names):
+            # Redis 不可用时不做条件处理
+            await self.app(scope, receive, send)
+            return
+
+        # 最后修改时间取各范围中最新的版本
+        version = max(versions.values())
+        etag = _make_etag(versions, route)
+        validators = {
+            "ETag": etag,
+            "Last-Modified": formatdate(version / 1000, usegmt=True),
+            # 浏览器可以保存响应，但每次使用前都要带上 ETag 重新验证
+            "Cache-Control": "no-cache",
+        }
+
+        headers = Headers(scope=scope)
+        if_none_match = headers.get("if-none-match")
+        if_modified_since = headers.get("if-modified-since")
+        if (if_none_match is not None and _etag_matches(if_none_match, etag)) or (
+            # 随日期变化的响应只能用 ETag 验证
+            if_none_match is None and if_modified_since and not route.daily
+            and _not_modified_since(if_modified_since, version)
+        ):
+            await Response(status_code=304, headers=validators)(scope, receive, send)
+            return
+
+        async def send_with_validators(message: Message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = MutableHeaders(scope=message)
+                for name, value in validators.items():
+                    response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
@@ -2,7 +2,7 @@
 应用配置管理
 使用 Pydantic Settings 管理环境变量
 """
-from typing import List
+from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -32,6 +32,19 @@ class Settings(BaseSettings):
     database_name: str = Field(default="database_name", description="数据库名称")
     database_user: str = Field(default="username", description="数据库用户")
     database_password: str = Field(default="password", description="数据库密码")
+    database_pool_size: int = Field(default=10, description="同步引擎连接池大小")
+    database_max_overflow: int = Field(default=20, description="同步引擎超出池大小后可创建的最大连接数")
+    database_pool_timeout: int = Field(default=30, description="获取连接的超时时间（秒）")
+    async_database_url: Optional[str] = Field(
+        default=None,
+        description="异步引擎（asyncpg）连接URL，未设置时由 database_url 转换"
+    )
+    async_database_pool_size: int = Field(default=10, description="异步引擎连接池大小")
+    async_database_max_overflow: int = Field(default=10, description="异步引擎超出池大小后可创建的最大连接数")
+    threadpool_size: int = Field(
+        default=30,
+        description="同步端点和缓存读写使用的线程池大小，不宜超过数据库连接池容量（pool_size + max_overflow）"
+    )
     
     # Redis配置
     redis_url: str = Field(
@@ -42,11 +55,20 @@ class Settings(BaseSettings):
     redis_port: int = Field(default=6379, description="Redis端口")
     redis_db: int = Field(default=0, description="Redis数据库")
     redis_password: str = Field(default="", description="Redis密码")
+    redis_pool_timeout: float = Field(
+        default=5.0,
+        description="Redis 连接池用尽时等待空闲连接的时间（秒），连接池容量按 threadpool_size 计算"
+    )
     
     # FastF1配置
     fastf1_cache_dir: str = Field(default="./cache", description="FastF1缓存目录")
     fastf1_logging_level: str = Field(default="INFO", description="FastF1日志级别")
-    
+
+    # Ergast API 限流配置（所有进程共享）
+    ergast_burst_limit: int = Field(default=4, description="Ergast每秒突发请求上限")
+    ergast_hourly_limit: int = Field(default=500, description="Ergast每小时请求上限")
+    sync_pipeline_workers: int = Field(default=4, description="全量同步流水线的并发获取线程数")
+
     # Celery配置
     celery_broker_url: str = Field(
         default="redis://localhost:6379/1",
@@ -90,6 +112,27 @@ class Settings(BaseSettings):
     # 缓存配置
     cache_ttl: int = Field(default=3600, description="缓存TTL(秒)")
     cache_prefix: str = Field(default="f1_web", description="缓存前缀")
+    cache_codec: str = Field(default="orjson", description="缓存编码器: json / orjson / msgpack")
+    cache_compression: str = Field(default="none", description="缓存压缩算法: none / zlib / zstd / lz4")
+    cache_compression_threshold: int = Field(default=4096, description="超过该字节数才压缩")
+    cache_stale_ttl: int = Field(default=600, description="缓存软过期后仍可返回旧值的时间(秒)")
+    cache_lock_ttl: int = Field(default=30, description="缓存重新计算锁的过期时间(秒)")
+    cache_lock_wait: float = Field(default=5.0, description="等待其他请求重新计算缓存的最长时间(秒)")
+    local_cache_enabled: bool = Field(default=True, description="启用进程内缓存层")
+    local_cache_max_bytes: int = Field(default=32 * 1024 * 1024, description="进程内缓存总字节数上限")
+    local_cache_max_entries: int = Field(default=256, description="进程内缓存每个前缀的默认条目上限")
+    local_cache_ttl: int = Field(default=60, description="进程内缓存TTL上限(秒)")
+    cache_warm_concurrency: int = Field(default=4, description="缓存预热的并发数")
+    batch_max_requests: int = Field(default=10, description="批量接口单次最多包含的子请求数")
+    season_bundle_max_age: int = Field(
+        default=60,
+        description="赛季数据包未带哈希的地址的浏览器/CDN 缓存时间(秒)，也是无法读取数据版本时的重新生成间隔"
+    )
+    search_index_ttl: int = Field(default=300, description="无法读取数据版本时搜索索引的重建间隔(秒)")
+    conditional_requests_enabled: bool = Field(
+        default=True,
+        description="读接口根据数据版本返回 ETag / Last-Modified，并响应 304"
+    )
     
     # 数据更新配置
     data_update_interval: int = Field(default=300, description="数据更新间隔(秒)")
@@ -0,0 +1,103 @@
+"""
+数据版本
+每个赛季有一个数据版本，赛道、车手、车队等参考数据另有一个版本，数据写入后只更新相关的范围；
+全局版本是所有范围中最新的版本，读取时计算，用于不按赛季区分的接口。
+版本是写入时的毫秒时间戳（保证递增），同时作为数据的最后修改时间。
+HTTP 条件请求（ETag / Last-Modified）根据版本判断数据是否变化，无需访问数据库
+"""
+from typing import Dict, List, Sequence
+
+import structlog
+
+from .config import settings
+from .redis import get_redis_client
+
+logger = structlog.get_logger()
+
+# 所有范围中最新的版本（读取时计算，写入不会单独更新）
+GLOBAL_SCOPE = "global"
+
+# 参考数据（赛道、车手、车队）的版本，只有这些数据写入时更新
+REFERENCE_SCOPE = "reference"
+
+_VERSION_KEY = f"{settings.cache_prefix}:data_version"
+
+# 更新版本：取当前毫秒时间和旧版本 + 1 中的较大值，时钟回拨时版本仍然递增
+# KEYS[1]: 版本哈希，ARGV: 需要更新的范围
+_BUMP_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+for i = 1, #ARGV do
+    local old = tonumber(redis.call('HGET', KEYS[1], ARGV[i])) or 0
+    redis.call('HSET', KEYS[1], ARGV[i], tostring(math.max(now, old + 1)))
+end
+return now
+"""
+
+# 读取版本，从未写入过的范围初始化为当前时间（之后的请求得到相同的版本）；
+# 全局版本取哈希中所有范围的最大值
+# KEYS[1]: 版本哈希，ARGV: 需要读取的范围
+_READ_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local versions = {}
+for i = 1, #ARGV do
+    redis.call('HSETNX', KEYS[1], ARGV[i], tostring(now))
+    if ARGV[i] == '%s' then
+        local latest = 0
+        for _, value in ipairs(redis.call('HVALS', KEYS[1])) do
+            latest = math.max(latest, tonumber(value))
+        end
+        versions[i] = tostring(latest)
+    else
+        versions[i] = redis.call('HGET', KEYS[1], ARGV[i])
+    end
+end
+return versions
+""" % GLOBAL_SCOPE
+
+
+def season_scope(year) -> str:
+    return f"season:{year}"
+
+
+def season_scopes(year) -> List[str]:
+    """
+    赛季数据接口依赖的版本范围
+    响应中的赛道、车手、车队名称属于参考数据，除赛季版本外还要包含参考数据版本
+    """
+    return [season_scope(year), REFERENCE_SCOPE]
+
+
+def bump_data_version(*season_years: int, reference: bool = False):
+    """
+    数据写入提交后更新相关赛季的版本，reference 为 True 时同时更新参考数据版本
+    只写入某个赛季的数据不会改变其他赛季的版本；Redis 不可用时只记录错误
+    """
+    scopes = [season_scope(year) for year in sorted(set(season_years))]
+    if reference:
+        scopes.append(REFERENCE_SCOPE)
+    if not scopes:
+        return
+    try:
+        get_redis_client().eval(_BUMP_SCRIPT, 1, _VERSION_KEY, *scopes)
+        logger.info("数据版本已更新", scopes=scopes)
+    except Exception as e:
+        logger.error("数据版本更新失败", error=str(e), scopes=scopes)
+
+
+def get_data_versions(scopes: Sequence[str]) -> Dict[str, int]:
+    """
+    读取数据版本
+
+    Returns:
+        Dict[str, int]: 范围 -> 版本（毫秒时间戳），Redis 不可用时返回空字典
+    """
+    if not scopes:
+        return {}
+    try:
+        versions = get_redis_client().eval(_READ_SCRIPT, 1, _VERSION_KEY, *scopes)
+    except Exception as e:
+        logger.error("数据版本读取失败", error=str(e))
+        return {}
+    return {scope: int(version) for scope, version in zip(scopes, versions)}
@@ -1,8 +1,14 @@
 """
 数据库连接和会话管理
-使用 SQLAlchemy 2.0 异步特性
+同步引擎（psycopg2）用于同步服务、Celery 任务和普通函数端点；
+异步引擎（asyncpg）用于异步端点，在事件循环中直接等待数据库
 """
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -12,9 +18,9 @@ from .config import settings
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    pool_size=10,         # 连接池大小
-    max_overflow=20,      # 超出池大小后可创建的最大连接数
-    pool_timeout=30,      # 连接超时时间（秒）
+    pool_size=settings.database_pool_size,          # 连接池大小
+    max_overflow=settings.database_max_overflow,    # 超出池大小后可创建的最大连接数
+    pool_timeout=settings.database_pool_timeout,    # 连接超时时间（秒）
     echo=settings.debug,
 )
 
@@ -25,6 +31,37 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+
+def _async_database_url() -> URL:
+    """
+    异步引擎的连接URL
+    未单独配置时把 database_url 的驱动替换为 asyncpg；asyncpg 不识别 sslmode，改为 ssl
+    """
+    if settings.async_database_url:
+        return make_url(settings.async_database_url)
+    url = make_url(settings.database_url).set(drivername="postgresql+asyncpg")
+    if "sslmode" in url.query:
+        url = url.update_query_dict({"ssl": url.query["sslmode"]}).difference_update_query(["sslmode"])
+    return url
+
+
+# 创建异步数据库引擎（连接在首次使用时建立）
+async_engine = create_async_engine(
+    _async_database_url(),
+    pool_pre_ping=True,
+    pool_size=settings.async_database_pool_size,
+    max_overflow=settings.async_database_max_overflow,
+    pool_timeout=settings.database_pool_timeout,
+    echo=settings.debug,
+)
+
+# 创建异步会话工厂，提交后不过期对象，避免在序列化时触发隐式的异步加载
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # 创建基础模型类
 Base = declarative_base()
 
@@ -41,6 +78,29 @@ def get_db():
         db.close()
 
 
+async def gather_queries(db: AsyncSession, *queries: Callable[[AsyncSession], Awaitable[Any]]) -> List[Any]:
+    """
+    并发执行相互独立的查询
+    同一个 AsyncSession 同时只能执行一条语句：第一个查询使用传入的会话，
+    其余查询各自使用新的会话（连接池中的其他连接）
+
+    Args:
+        db: 请求的异步会话
+        queries: 接收 AsyncSession 并返回查询结果的协程函数
+
+    Returns:
+        List[Any]: 按传入顺序排列的查询结果
+    """
+    async def run_in_new_session(query):
+        async with AsyncSessionLocal() as session:
+            return await query(session)
+
+    if not queries:
+        return []
+    first, *rest = queries
+    return list(await asyncio.gather(first(db), *(run_in_new_session(query) for query in rest)))
+
+
 def init_db():
     """
     初始化数据库
@@ -0,0 +1,234 @@
+"""
+进程内缓存层
+位于 Redis 之前的 LRU + TTL 缓存，按字节数和每个前缀的条目数淘汰；
+各进程通过 Redis pub/sub 广播失效消息保持一致
+"""
+import fnmatch
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+import redis
+import structlog
+
+from .config import settings
+from .redis import get_redis_client
+
+logger = structlog.get_logger()
+
+# 未命中标记（缓存值本身可能是 None）
+MISS = object()
+
+# 失效消息频道
+INVALIDATION_CHANNEL = f"{settings.cache_prefix}:cache:invalidate"
+
+
+@dataclass
+class _Entry:
+    prefix: str
+    value: Any
+    expires_at: float
+    size: int
+
+
+class LocalCache:
+    """
+    线程安全的进程内 LRU/TTL 缓存
+    - 所有条目共享总字节数上限，超出时淘汰全局最久未使用的条目
+    - 每个前缀有单独的条目上限，热点前缀不会挤掉其他前缀
+    """
+
+    def __init__(self, max_bytes: int, default_max_entries: int = 256):
+        self.max_bytes = max_bytes
+        self.default_max_entries = default_max_entries
+        # 全局 LRU 顺序
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # 每个前缀内部的 LRU 顺序（只记录键）
+        self._prefixes: Dict[str, "OrderedDict[str, None]"] = {}
+        self._prefix_limits: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure_prefix(self, prefix: str, max_entries: int):
+        """设置某个前缀的条目上限"""
+        with self._lock:
+            self._prefix_limits[prefix] = max_entries
+
+    def get(self, key: str) -> Any:
+        """读取缓存，未命中或已过期返回 MISS"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self._prefixes[entry.prefix].move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, prefix: str, key: str, value: Any, ttl: float, size: int):
+        """写入缓存，size 为序列化后的字节数，用于容量控制"""
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _Entry(prefix, value, time.monotonic() + ttl, size)
+            keys = self._prefixes.setdefault(prefix, OrderedDict())
+            keys[key] = None
+            self._bytes += size
+
+            limit = self._prefix_limits.get(prefix, self.default_max_entries)
+            while len(keys) > limit:
+                self._remove(next(iter(keys)))
+                self.evictions += 1
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, keys: Iterable[str]) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    removed += 1
+            return removed
+
+    def delete_matching(self, pattern: str) -> int:
+        """删除匹配通配符模式的键"""
+        with self._lock:
+            matched = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in matched:
+                self._remove(key)
+            return len(matched)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._prefixes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "prefixes": {prefix: len(keys) for prefix, keys in self._prefixes.items() if keys},
+            }
+
+    def _remove(self, key: str):
+        """删除条目（调用方持有锁）"""
+        entry = self._entries.pop(key)
+        del self._prefixes[entry.prefix][key]
+        self._bytes -= entry.size
+
+
+local_cache = LocalCache(
+    max_bytes=settings.local_cache_max_bytes,
+    default_max_entries=settings.local_cache_max_entries,
+)
+
+
+class _InvalidationListener:
+    """
+    订阅失效频道的后台线程
+    每个进程首次使用缓存时启动（fork 之后的子进程会重新启动）
+    """
+
+    def __init__(self):
+        self.instance_id = uuid.uuid4().hex
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # fork 得到的缓存内容可能已过期
+            local_cache.clear()
+            thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # 断线期间可能错过失效消息，重新订阅后清空本地缓存
+                local_cache.clear()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._apply(message["data"])
+            except redis.RedisError as e:
+                logger.warning("缓存失效订阅中断，稍后重连", error=str(e))
+                local_cache.clear()
+                time.sleep(5)
+            except Exception as e:
+                logger.error("缓存失效订阅异常", error=str(e))
+                time.sleep(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    @staticmethod
+    def _apply(data: str):
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return
+        if payload.get("all"):
+            local_cache.clear()
+            return
+        removed = local_cache.delete(payload.get("keys", []))
+        for pattern in payload.get("patterns", []):
+            removed += local_cache.delete_matching(pattern)
+        if removed:
+            logger.debug("本地缓存已失效", count=removed)
+
+
+invalidation_listener = _InvalidationListener()
+
+
+def publish_invalidation(keys: Iterable[str] = (), patterns: Iterable[str] = (), clear_all: bool = False):
+    """
+    失效本进程的本地缓存并通知其他进程
+    """
+    keys, patterns = list(keys), list(patterns)
+    if clear_all:
+        local_cache.clear()
+    else:
+        local_cache.delete(keys)
+        for pattern in patterns:
+            local_cache.delete_matching(pattern)
+
+    message = {"origin": invalidation_listener.instance_id, "keys": keys, "patterns": patterns, "all": clear_all}
+    try:
+        get_redis_client().publish(INVALIDATION_CHANNEL, json.dumps(message))
+    except Exception as e:
+        logger.error("发布缓存失效消息失败", error=str(e))
@@ -0,0 +1,237 @@
+"""
+跨进程共享的令牌桶限流器
+令牌桶状态保存在 Redis 中，API 进程、Celery worker 和脚本共用同一份配额；
+预算充足时请求不等待，只有配额耗尽时才按需等待
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import redis
+import structlog
+
+from .config import settings
+from .redis import redis_client
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """单个令牌桶：容量和每秒补充的令牌数"""
+    name: str
+    capacity: float
+    refill_per_second: float
+
+
+# 原子地检查并扣减所有令牌桶
+# KEYS: 各令牌桶的 key
+# ARGV: 依次为每个桶的 capacity, refill_per_second
+# 返回需要等待的秒数（字符串），"0" 表示已获取令牌
+_ACQUIRE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local tokens = {}
+local wait = 0
+
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if available == nil or ts == nil then
+        available = capacity
+        ts = now
+    end
+    available = math.min(capacity, available + math.max(0, now - ts) * rate)
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, (1 - available) / rate)
+    end
+end
+
+if wait > 0 then
+    return tostring(wait)
+end
+
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i] - 1), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[i], math.ceil(capacity / rate) + 1)
+end
+return "0"
+"""
+
+
+class RateLimitTimeout(Exception):
+    """在超时时间内未能获取令牌"""
+    pass
+
+
+class _LocalBuckets:
+    """进程内令牌桶，Redis 不可用时的降级实现"""
+
+    def __init__(self, buckets: Sequence[Bucket]):
+        self.buckets = list(buckets)
+        self._lock = threading.Lock()
+        now = time.monotonic()
+        self._state: Dict[str, Tuple[float, float]] = {
+            bucket.name: (bucket.capacity, now) for bucket in self.buckets
+        }
+
+    def try_acquire(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            refilled: Dict[str, float] = {}
+            wait = 0.0
+            for bucket in self.buckets:
+                available, ts = self._state[bucket.name]
+                available = min(bucket.capacity, available + (now - ts) * bucket.refill_per_second)
+                refilled[bucket.name] = available
+                if available < 1:
+                    wait = max(wait, (1 - available) / bucket.refill_per_second)
+
+            if wait > 0:
+                return wait
+
+            for bucket in self.buckets:
+                self._state[bucket.name] = (refilled[bucket.name] - 1, now)
+            return 0.0
+
+    def peek(self) -> Dict[str, float]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                bucket.name: min(
+                    bucket.capacity,
+                    self._state[bucket.name][0] + (now - self._state[bucket.name][1]) * bucket.refill_per_second,
+                )
+                for bucket in self.buckets
+            }
+
+
+class TokenBucketLimiter:
+    """
+    多令牌桶限流器
+    每次请求需要同时从所有桶中取得一个令牌（如每秒突发上限 + 每小时上限）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        buckets: Sequence[Bucket],
+        client: Optional[redis.Redis] = None,
+        key_prefix: Optional[str] = None,
+    ):
+        self.name = name
+        self.buckets: List[Bucket] = list(buckets)
+        self.client = client if client is not None else redis_client
+        prefix = key_prefix or f"{settings.cache_prefix}:ratelimit"
+        self.keys = [f"{prefix}:{name}:{bucket.name}" for bucket in self.buckets]
+        self._args: List[float] = []
+        for bucket in self.buckets:
+            self._args.extend([bucket.capacity, bucket.refill_per_second])
+
+        self._script = self.client.register_script(_ACQUIRE_SCRIPT)
+        self._local = _LocalBuckets(self.buckets)
+        self._redis_available = True
+
+    def try_acquire(self) -> float:
+        """
+        尝试获取一个令牌
+
+        Returns:
+            float: 0 表示已获取；否则为预计需要等待的秒数
+        """
+        try:
+            wait = float(self._script(keys=self.keys, args=self._args))
+            if not self._redis_available:
+                logger.info("限流器恢复使用Redis", limiter=self.name)
+                self._redis_available = True
+            return wait
+        except redis.RedisError as e:
+            if self._redis_available:
+                logger.warning("Redis不可用，限流器降级为进程内令牌桶", limiter=self.name, error=str(e))
+                self._redis_available = False
+            return self._local.try_acquire()
+
+    def peek(self) -> Dict[str, float]:
+        """
+        查看各令牌桶当前可用的令牌数（不消耗令牌）
+
+        Returns:
+            Dict[str, float]: 桶名 -> 可用令牌数
+        """
+        try:
+            seconds, micros = self.client.time()
+            now = seconds + micros / 1_000_000
+            pipe = self.client.pipeline(transaction=False)
+            for key in self.keys:
+                pipe.hmget(key, "tokens", "ts")
+            states = pipe.execute()
+        except redis.RedisError:
+            return self._local.peek()
+
+        available: Dict[str, float] = {}
+        for bucket, (tokens, ts) in zip(self.buckets, states):
+            if tokens is None or ts is None:
+                available[bucket.name] = bucket.capacity
+            else:
+                refilled = float(tokens) + max(0.0, now - float(ts)) * bucket.refill_per_second
+                available[bucket.name] = min(bucket.capacity, refilled)
+        return available
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        阻塞直到获取令牌
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        start = time.monotonic()
+        while True:
+            wait = self.try_acquire()
+            waited = time.monotonic() - start
+            if wait <= 0:
+                if waited >= 1:
+                    logger.info("限流等待结束", limiter=self.name, waited=round(waited, 2))
+                return waited
+
+            if timeout is not None and waited + wait > timeout:
+                raise RateLimitTimeout(f"{self.name} 限流器在 {timeout} 秒内未能获取令牌")
+
+            time.sleep(wait)
+
+
+_ergast_limiter: Optional[TokenBucketLimiter] = None
+_ergast_limiter_lock = threading.Lock()
+
+
+def get_ergast_limiter() -> TokenBucketLimiter:
+    """获取 Ergast API 的全局限流器（突发上限 + 每小时上限）"""
+    global _ergast_limiter
+    if _ergast_limiter is None:
+        with _ergast_limiter_lock:
+            if _ergast_limiter is None:
+                _ergast_limiter = TokenBucketLimiter(
+                    "ergast",
+                    [
+                        Bucket(
+                            "burst",
+                            capacity=settings.ergast_burst_limit,
+                            refill_per_second=settings.ergast_burst_limit,
+                        ),
+                        Bucket(
+                            "hourly",
+                            capacity=settings.ergast_hourly_limit,
+                            refill_per_second=settings.ergast_hourly_limit / 3600,
+                        ),
+                    ],
+                )
+    return _ergast_limiter
@@ -7,16 +7,35 @@ from .config import settings
 
 logger = structlog.get_logger()
 
+# 连接池容量：同步端点和缓存读写在线程池中执行，每个线程同时最多持有一个连接；
+# 另外预留给常驻的 pub/sub 失效监听和在事件循环中直接执行的调用（中间件读取数据版本等）
+REDIS_POOL_HEADROOM = 10
+
+
+def _create_pool(decode_responses: bool) -> redis.BlockingConnectionPool:
+    """
+    创建连接池
+    连接用尽时等待其他请求归还（最多 redis_pool_timeout 秒），而不是立即抛出 Too many connections：
+    缓存层会把连接错误当作 Redis 不可用，跳过防击穿锁直接查询数据库
+    """
+    return redis.BlockingConnectionPool.from_url(
+        settings.redis_url,
+        decode_responses=decode_responses,
+        max_connections=settings.threadpool_size + REDIS_POOL_HEADROOM,
+        timeout=settings.redis_pool_timeout,
+    )
+
+
 # 创建Redis连接池
-redis_pool = redis.ConnectionPool.from_url(
-    settings.redis_url,
-    decode_responses=True,
-    max_connections=20,
-)
+redis_pool = _create_pool(decode_responses=True)
 
 # 创建Redis客户端
 redis_client = redis.Redis(connection_pool=redis_pool)
 
+# 二进制连接池，用于读写经过编码/压缩的缓存值
+redis_binary_pool = _create_pool(decode_responses=False)
+redis_binary_client = redis.Redis(connection_pool=redis_binary_pool)
+
 
 def get_redis():
     """
@@ -34,6 +53,14 @@ def get_redis_client():
     return redis_client
 
 
+def get_redis_binary_client():
+    """
+    获取不解码响应的Redis客户端
+    缓存值为二进制帧，不能按 UTF-8 解码
+    """
+    return redis_binary_client
+
+
 def init_redis():
     """
     初始化Redis连接
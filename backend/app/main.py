@@ -1,6 +1,7 @@
 """
 FastAPI 主应用
 """
+from anyio import to_thread
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -8,6 +9,7 @@ from sqlalchemy.exc import SQLAlchemyError
 import structlog
 
 from .core.config import settings
+from .core.conditional import ConditionalRequestMiddleware
 from .core.database import init_db
 from .core.redis import init_redis
 from .core.exceptions import (
@@ -60,6 +62,10 @@ app.add_exception_handler(BaseAPIException, base_api_exception_handler)
 app.add_exception_handler(SQLAlchemyError, sqlalchemy_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
+# 条件请求中间件在 CORS 中间件内层，304 响应同样带有 CORS 头
+if settings.conditional_requests_enabled:
+    app.add_middleware(ConditionalRequestMiddleware)
+
 # 动态CORS配置
 def get_cors_origins():
     origins = list(settings.backend_cors_origins)
@@ -99,6 +105,9 @@ async def startup_event():
     """应用启动事件"""
     logger.info("🚀 启动F1 Web后端服务")
     
+    # 同步端点（数据库查询）和缓存的 Redis 读写在线程池中执行，不阻塞事件循环
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    
     # 初始化数据库
     try:
         init_db()
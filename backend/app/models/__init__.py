@@ -11,7 +11,11 @@ from .race import Race
 from .result import Result
 from .qualifying_result import QualifyingResult
 from .sprint_result import SprintResult
-from .standings import DriverStanding, ConstructorStanding
+from .standings import (
+    DriverStanding, ConstructorStanding,
+    DriverStandingSnapshot, ConstructorStandingSnapshot,
+    DriverStandingRead,
+)
 
 __all__ = [
     "Base",
@@ -25,5 +29,8 @@ __all__ = [
     "QualifyingResult",
     "SprintResult",
     "DriverStanding",
-    "ConstructorStanding"
+    "ConstructorStanding",
+    "DriverStandingSnapshot",
+    "ConstructorStandingSnapshot",
+    "DriverStandingRead",
 ] 
\ No newline at end of file
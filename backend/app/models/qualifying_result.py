@@ -1,7 +1,7 @@
 """
 排位赛结果数据模型 - 基于FastF1实际数据结构
 """
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -33,5 +33,10 @@ class QualifyingResult(Base):
     driver = relationship("Driver", back_populates="qualifying_results")
     constructor = relationship("Constructor", back_populates="qualifying_results")
     
+    # 每场比赛每位车手只有一条成绩，作为批量UPSERT的冲突键
+    __table_args__ = (
+        UniqueConstraint('race_id', 'driver_id', name='uq_qualifying_results_race_driver'),
+    )
+    
     def __repr__(self):
         return f"<QualifyingResult(race_id={self.race_id}, driver_id='{self.driver_id}', position={self.position})>" 
\ No newline at end of file
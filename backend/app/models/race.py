@@ -1,7 +1,7 @@
 """
 比赛数据模型 - 基于FastF1实际数据结构
 """
-from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -48,5 +48,10 @@ class Race(Base):
     qualifying_results = relationship("QualifyingResult", back_populates="race")
     sprint_results = relationship("SprintResult", back_populates="race")
     
+    # 比赛列表按 (日期, ID) 游标分页
+    __table_args__ = (
+        Index('idx_race_event_date_id', 'event_date', 'id'),
+    )
+    
     def __repr__(self):
         return f"<Race(round={self.round_number}, name='{self.official_event_name}', date={self.event_date})>" 
\ No newline at end of file
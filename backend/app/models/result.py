@@ -1,7 +1,7 @@
 """
 比赛结果数据模型 - 基于FastF1实际数据结构
 """
-from sqlalchemy import Column, String, Integer, Float, BigInteger, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, BigInteger, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -40,5 +40,10 @@ class Result(Base):
     driver = relationship("Driver", back_populates="results")
     constructor = relationship("Constructor", back_populates="results")
     
+    # 每场比赛每位车手只有一条成绩，作为批量UPSERT的冲突键
+    __table_args__ = (
+        UniqueConstraint('race_id', 'driver_id', name='uq_results_race_driver'),
+    )
+    
     def __repr__(self):
         return f"<Result(race_id={self.race_id}, driver_id='{self.driver_id}', position={self.position})>" 
\ No newline at end of file
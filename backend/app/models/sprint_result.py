@@ -1,7 +1,7 @@
 """
 冲刺赛结果数据模型 - 基于FastF1实际数据结构
 """
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -46,5 +46,10 @@ class SprintResult(Base):
     driver = relationship("Driver", back_populates="sprint_results")
     constructor = relationship("Constructor", back_populates="sprint_results")
     
+    # 每场比赛每位车手只有一条成绩，作为批量UPSERT的冲突键
+    __table_args__ = (
+        UniqueConstraint('race_id', 'driver_id', name='uq_sprint_results_race_driver'),
+    )
+    
     def __repr__(self):
         return f"<SprintResult(race_id={self.race_id}, driver_id='{self.driver_id}', position={self.position})>" 
\ No newline at end of file
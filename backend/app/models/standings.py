@@ -1,7 +1,7 @@
 """
 积分榜数据模型 - 基于FastF1实际数据结构
 """
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -30,11 +30,13 @@ class DriverStanding(Base):
     driver = relationship("Driver", back_populates="driver_standings")
     constructor = relationship("Constructor", back_populates="driver_standings")
     
-    # 复合索引
+    # 复合索引，(season_id, driver_id) 唯一，作为差异同步的比较键
     __table_args__ = (
         Index('idx_driver_standing_season', 'season_id'),
-        Index('idx_driver_standing_season_driver', 'season_id', 'driver_id'),
+        UniqueConstraint('season_id', 'driver_id', name='uq_driver_standings_season_driver'),
         Index('idx_driver_standing_season_constructor', 'season_id', 'constructor_id'),
+        # 车手历史积分榜的游标分页
+        Index('idx_driver_standing_driver_season', 'driver_id', 'season_id', 'id'),
     )
     
     def __repr__(self):
@@ -62,11 +64,108 @@ class ConstructorStanding(Base):
     season = relationship("Season", back_populates="constructor_standings")
     constructor = relationship("Constructor", back_populates="constructor_standings")
     
-    # 复合索引
+    # 复合索引，(season_id, constructor_id) 唯一，作为差异同步的比较键
     __table_args__ = (
         Index('idx_constructor_standing_season', 'season_id'),
-        Index('idx_constructor_standing_season_constructor', 'season_id', 'constructor_id'),
+        UniqueConstraint('season_id', 'constructor_id', name='uq_constructor_standings_season_constructor'),
+        # 车队历史积分榜的游标分页
+        Index('idx_constructor_standing_constructor_season', 'constructor_id', 'season_id', 'id'),
     )
     
     def __repr__(self):
-        return f"<ConstructorStanding(season_id={self.season_id}, constructor_id='{self.constructor_id}', position={self.position})>" 
\ No newline at end of file
+        return f"<ConstructorStanding(season_id={self.season_id}, constructor_id='{self.constructor_id}', position={self.position})>" 
+
+class DriverStandingSnapshot(Base):
+    """车手积分榜快照 - 每个赛季每轮结束后的积分榜"""
+    __tablename__ = "driver_standing_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # 外键关联
+    season_id = Column(Integer, ForeignKey("seasons.id"), nullable=False)
+    round_number = Column(Integer, nullable=False)  # 该积分榜对应的轮次
+    driver_id = Column(String(50), ForeignKey("drivers.driver_id"), nullable=False)
+    constructor_id = Column(String(50), ForeignKey("constructors.constructor_id"), nullable=False)
+    
+    # 积分榜信息
+    position = Column(Integer, nullable=True)
+    position_text = Column(String(10), nullable=True)
+    points = Column(Float, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    
+    # 关联关系
+    driver = relationship("Driver")
+    constructor = relationship("Constructor")
+    
+    # 赛季积分走势按 (season_id, round_number) 范围扫描，单个车手的走势按 (driver_id, season_id) 扫描
+    __table_args__ = (
+        UniqueConstraint('season_id', 'round_number', 'driver_id', name='uq_driver_standing_snapshots_season_round_driver'),
+        Index('idx_driver_standing_snapshot_driver_season', 'driver_id', 'season_id'),
+    )
+    
+    def __repr__(self):
+        return f"<DriverStandingSnapshot(season_id={self.season_id}, round={self.round_number}, driver_id='{self.driver_id}', points={self.points})>"
+
+
+class ConstructorStandingSnapshot(Base):
+    """车队积分榜快照 - 每个赛季每轮结束后的积分榜"""
+    __tablename__ = "constructor_standing_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # 外键关联
+    season_id = Column(Integer, ForeignKey("seasons.id"), nullable=False)
+    round_number = Column(Integer, nullable=False)  # 该积分榜对应的轮次
+    constructor_id = Column(String(50), ForeignKey("constructors.constructor_id"), nullable=False)
+    
+    # 积分榜信息
+    position = Column(Integer, nullable=True)
+    position_text = Column(String(10), nullable=True)
+    points = Column(Float, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    
+    # 关联关系
+    constructor = relationship("Constructor")
+    
+    __table_args__ = (
+        UniqueConstraint('season_id', 'round_number', 'constructor_id', name='uq_constructor_standing_snapshots_season_round_constructor'),
+        Index('idx_constructor_standing_snapshot_constructor_season', 'constructor_id', 'season_id'),
+    )
+    
+    def __repr__(self):
+        return f"<ConstructorStandingSnapshot(season_id={self.season_id}, round={self.round_number}, constructor_id='{self.constructor_id}', points={self.points})>"
+
+
+class DriverStandingRead(Base):
+    """
+    车手积分榜读模型 - 由同步在写入积分榜后重建
+    冗余保存车手姓名、国籍和已解析的车队（官方指定车队优先），
+    积分榜接口只需按 (season_year, position) 一次索引扫描
+    """
+    __tablename__ = "driver_standings_read"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    season_id = Column(Integer, ForeignKey("seasons.id"), nullable=False)
+    season_year = Column(Integer, nullable=False)
+    driver_id = Column(String(50), ForeignKey("drivers.driver_id"), nullable=False)
+    constructor_id = Column(String(50), ForeignKey("constructors.constructor_id"), nullable=False)
+    
+    # 积分榜信息
+    position = Column(Integer, nullable=True)
+    points = Column(Float, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    
+    # 冗余字段
+    driver_name = Column(String(201), nullable=False)
+    nationality = Column(String(100), nullable=True)
+    constructor_name = Column(String(200), nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('season_id', 'driver_id', name='uq_driver_standings_read_season_driver'),
+        Index('idx_driver_standings_read_year_position', 'season_year', 'position'),
+        Index('idx_driver_standings_read_season_position', 'season_id', 'position'),
+    )
+    
+    def __repr__(self):
+        return f"<DriverStandingRead(season_year={self.season_year}, driver_id='{self.driver_id}', position={self.position})>"
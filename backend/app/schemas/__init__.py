@@ -48,6 +48,11 @@ from .standings import (
     DriverStandingList,
     ConstructorStandingList
 )
+from .batch import (
+    BatchRequestItem,
+    BatchRequest,
+    BatchResponseItem,
+)
 
 __all__ = [
     # Base schemas
@@ -97,4 +102,9 @@ __all__ = [
     "ConstructorStandingResponse",
     "DriverStandingList",
     "ConstructorStandingList",
+    
+    # Batch schemas
+    "BatchRequestItem",
+    "BatchRequest",
+    "BatchResponseItem",
 ] 
\ No newline at end of file
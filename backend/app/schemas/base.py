@@ -3,8 +3,8 @@
 包含通用的响应结构
 """
 from datetime import datetime
-from typing import Any, Optional, Generic, TypeVar
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, Dict, Optional, Generic, Sequence, Type, TypeVar, Union
+from pydantic import AfterValidator, BaseModel, Field, TypeAdapter
 
 # 泛型类型变量
 T = TypeVar('T')
@@ -24,6 +24,13 @@ class ApiResponse(BaseResponse, Generic[T]):
     data: Optional[T] = Field(default=None, description="响应数据")
 
 
+class PageResponse(ApiResponse[T], Generic[T]):
+    """游标分页响应模式 - 在 ApiResponse 基础上返回下一页游标"""
+    
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标，没有下一页时为空")
+    total: Optional[int] = Field(default=None, description="数据总数（请求 include_total 时返回）")
+
+
 class DataResponse(BaseResponse, Generic[T]):
     """数据响应模式"""
     
@@ -54,4 +61,26 @@ class BaseModelSchema(BaseModel):
     """基础模型模式 - 根据实际数据库结构调整"""
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+def sparse(schema: Type[BaseModel], exclude: Sequence[str] = ()) -> Any:
+    """
+    支持字段选择（fields=）的响应数据类型
+    包含全部字段的数据按 schema 校验；只包含部分字段的数据按 schema 中各字段的类型逐个校验，
+    不会补全未选择的字段
+
+    Args:
+        schema: 完整的响应模式
+        exclude: 接口不返回的 schema 字段
+    """
+    names = frozenset(name for name in schema.model_fields if name not in exclude)
+    adapters = {name: TypeAdapter(schema.model_fields[name].annotation) for name in names}
+
+    def validate_partial(value: Dict[str, Any]) -> Dict[str, Any]:
+        if not value.keys() < names:
+            raise ValueError("不是部分字段的数据")
+        return {key: adapters[key].validate_python(item) for key, item in value.items()}
+
+    partial = Annotated[Dict[str, Any], AfterValidator(validate_partial)]
+    return Annotated[Union[partial, schema], Field(union_mode="left_to_right")]
@@ -0,0 +1,31 @@
+"""
+批量请求相关的 Pydantic 模式
+"""
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, Field
+
+
+class BatchRequestItem(BaseModel):
+    """批量请求中的一个子请求（只支持 GET）"""
+    
+    id: str = Field(..., min_length=1, max_length=64, description="子请求标识，原样返回")
+    path: str = Field(..., description="接口路径，如 /api/v1/races/12")
+    params: Dict[str, Union[str, int, float, bool, List[Union[str, int, float, bool]]]] = Field(
+        default_factory=dict, description="查询参数"
+    )
+    etag: Optional[str] = Field(None, description="上次响应的 ETag，数据未变化时该项返回 304")
+
+
+class BatchRequest(BaseModel):
+    """批量请求"""
+    
+    requests: List[BatchRequestItem] = Field(..., min_length=1, description="子请求列表")
+
+
+class BatchResponseItem(BaseModel):
+    """子请求的结果"""
+    
+    id: str = Field(..., description="子请求标识")
+    status: int = Field(..., description="HTTP 状态码")
+    etag: Optional[str] = Field(None, description="响应的 ETag")
+    body: Optional[Any] = Field(None, description="响应体（JSON），304 时为空")
@@ -4,7 +4,7 @@
 from typing import Optional, List
 from pydantic import BaseModel, Field
 
-from .base import BaseModelSchema
+from .base import BaseModelSchema, sparse
 
 
 class CircuitBase(BaseModel):
@@ -71,5 +71,6 @@ class CircuitResponse(CircuitBase, BaseModelSchema):
 class CircuitListResponse(BaseModel):
     """赛道列表响应模式"""
     
-    circuits: List[CircuitResponse] = Field(description="赛道列表")
-    total: int = Field(description="总数") 
\ No newline at end of file
+    circuits: List[sparse(CircuitResponse)] = Field(description="赛道列表（选择字段时只包含所选字段）")
+    total: int = Field(description="总数")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标，没有下一页时为空") 
\ No newline at end of file
@@ -64,6 +64,23 @@ class StandingHistoryResponse(BaseModel):
     constructor_name: str
 
 
+class StandingProgressionSeries(BaseModel):
+    """单个车手/车队在一个赛季内的逐轮积分走势"""
+    id: str = Field(..., description="车手ID或车队ID")
+    name: str = Field(..., description="车手姓名或车队名称")
+    constructor_id: Optional[str] = Field(None, description="最近一轮所属车队ID（车手走势）")
+    rounds: List[int] = Field(..., description="轮次")
+    points: List[float] = Field(..., description="每轮结束后的累计积分")
+    positions: List[Optional[int]] = Field(..., description="每轮结束后的积分榜排名")
+
+
+class StandingProgressionResponse(BaseModel):
+    """赛季积分走势"""
+    season: int = Field(..., description="赛季年份")
+    rounds: List[int] = Field(..., description="已有快照的轮次")
+    series: List[StandingProgressionSeries]
+
+
 # Properties to return to client
 class ConstructorStanding(ConstructorStandingBase):
     constructor_id: str
@@ -0,0 +1,311 @@
+"""
+批量 UPSERT 引擎
+将整批记录转换为 PostgreSQL 的 INSERT ... ON CONFLICT DO UPDATE 语句，
+一个赛季的结果只需要少量 SQL 语句即可落库
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from sqlalchemy import delete, inspect, or_, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# 结果类表的冲突键：每场比赛每位车手一条记录
+RACE_DRIVER_CONFLICT_COLUMNS = ("race_id", "driver_id")
+
+# 积分榜的比较键：每个赛季每位车手/每支车队一条记录
+SEASON_DRIVER_KEY_COLUMNS = ("season_id", "driver_id")
+SEASON_CONSTRUCTOR_KEY_COLUMNS = ("season_id", "constructor_id")
+
+# 积分榜快照的冲突键：每个赛季每轮每位车手/每支车队一条记录
+SNAPSHOT_DRIVER_KEY_COLUMNS = ("season_id", "round_number", "driver_id")
+SNAPSHOT_CONSTRUCTOR_KEY_COLUMNS = ("season_id", "round_number", "constructor_id")
+
+# 单条 INSERT 语句的最大行数，避免超出 PostgreSQL 参数个数上限 (65535)
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class IncompleteSyncError(ValueError):
+    """上游数据不完整（为空或部分行无法写入），拒绝按其删除范围内的数据"""
+
+
+@dataclass
+class UpsertStats:
+    """批量UPSERT统计"""
+    table: str
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    statements: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def merge(self, other: "UpsertStats") -> "UpsertStats":
+        """合并另一份统计（同一张表）"""
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.statements += other.statements
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式用于日志和任务结果"""
+        return {
+            "table": self.table,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "statements": self.statements,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.table}: 新增 {self.inserted}, 更新 {self.updated}, "
+            f"未变化 {self.unchanged} ({self.statements} 条语句)"
+        )
+
+
+def _dedupe_by_conflict_key(
+    rows: Sequence[Dict[str, Any]],
+    conflict_columns: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """
+    按冲突键去重，保留最后一条
+    同一条 ON CONFLICT DO UPDATE 语句不能两次更新同一行
+    """
+    deduped: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        deduped[tuple(row[c] for c in conflict_columns)] = row
+    return list(deduped.values())
+
+
+def _to_column_keys(model: Type, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    将模型属性名转换为表列名
+    部分模型的属性名与列名不同（如 Driver.number -> driver_number）
+    """
+    mapper = inspect(model)
+    key_map = {attr.key: attr.columns[0].key for attr in mapper.column_attrs}
+    return [{key_map.get(k, k): v for k, v in row.items()} for row in rows]
+
+
+def _upsert_chunks(
+    db: Session,
+    model: Type,
+    rows: Sequence[Dict[str, Any]],
+    conflict_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]],
+    chunk_size: int,
+    stats: UpsertStats,
+) -> List[Any]:
+    """
+    执行 INSERT ... ON CONFLICT DO UPDATE，返回实际写入的行
+    （每行包含冲突键和 inserted 标记），统计结果累加到 stats
+    """
+    table = model.__table__
+    rows = _dedupe_by_conflict_key(_to_column_keys(model, rows), conflict_columns)
+
+    if update_columns is None:
+        primary_keys = {c.key for c in table.primary_key.columns}
+        update_columns = [
+            key for key in rows[0].keys()
+            if key not in conflict_columns and key not in primary_keys
+        ]
+
+    written: List[Any] = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+
+        stmt = pg_insert(table).values(chunk)
+        excluded = stmt.excluded
+
+        # 只有内容真正变化时才更新，未变化的行不会出现在 RETURNING 中
+        changed = or_(*[table.c[key].is_distinct_from(excluded[key]) for key in update_columns])
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_={key: excluded[key] for key in update_columns},
+            where=changed,
+        ).returning(
+            *[table.c[key] for key in conflict_columns],
+            # xmax = 0 表示该行由本次 INSERT 新建，否则为 UPDATE
+            literal_column("(xmax = 0)").label("inserted"),
+        )
+
+        returned = db.execute(stmt).all()
+        inserted = sum(1 for row in returned if row.inserted)
+
+        stats.inserted += inserted
+        stats.updated += len(returned) - inserted
+        stats.unchanged += len(chunk) - len(returned)
+        stats.statements += 1
+        written.extend(returned)
+
+    return written
+
+
+def bulk_upsert(
+    db: Session,
+    model: Type,
+    rows: Sequence[Dict[str, Any]],
+    conflict_columns: Sequence[str] = RACE_DRIVER_CONFLICT_COLUMNS,
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> UpsertStats:
+    """
+    批量写入记录，已存在则更新，内容未变化的行不会被改写
+
+    Args:
+        db: 数据库会话（由调用方负责提交）
+        model: SQLAlchemy 模型类
+        rows: 待写入的记录，键为模型属性名，所有记录的键必须一致
+        conflict_columns: 冲突键（必须有对应的唯一约束）
+        update_columns: 冲突时需要更新的列，默认为除主键和冲突键外的所有列
+        chunk_size: 每条语句的最大行数
+
+    Returns:
+        UpsertStats: 新增/更新/未变化的行数统计
+    """
+    stats = UpsertStats(table=model.__table__.name)
+
+    if not rows:
+        return stats
+
+    _upsert_chunks(db, model, rows, conflict_columns, update_columns, chunk_size, stats)
+
+    logger.info(f"📦 批量UPSERT完成 - {stats}")
+    return stats
+
+
+@dataclass
+class ChangeSet:
+    """
+    一次差异同步的变更集合
+    键为冲突键元组（如 (season_id, driver_id)），供下游缓存失效使用
+    """
+    table: str
+    key_columns: Tuple[str, ...]
+    inserted: List[tuple] = field(default_factory=list)
+    updated: List[tuple] = field(default_factory=list)
+    deleted: List[tuple] = field(default_factory=list)
+    unchanged: int = 0
+    statements: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+    @property
+    def changed_keys(self) -> Set[tuple]:
+        """所有新增、更新和删除的键"""
+        return set(self.inserted) | set(self.updated) | set(self.deleted)
+
+    def values(self, column: str) -> Set[Any]:
+        """变更行中某一键列的取值（如受影响的 season_id）"""
+        index = self.key_columns.index(column)
+        return {key[index] for key in self.changed_keys}
+
+    def merge(self, other: "ChangeSet") -> "ChangeSet":
+        """合并另一份变更集合（同一张表）"""
+        self.inserted.extend(other.inserted)
+        self.updated.extend(other.updated)
+        self.deleted.extend(other.deleted)
+        self.unchanged += other.unchanged
+        self.statements += other.statements
+        return self
+
+    @property
+    def stats(self) -> UpsertStats:
+        return UpsertStats(
+            table=self.table,
+            inserted=len(self.inserted),
+            updated=len(self.updated),
+            unchanged=self.unchanged,
+            statements=self.statements,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式用于日志和任务结果"""
+        return {
+            "table": self.table,
+            "key_columns": list(self.key_columns),
+            "inserted": [list(key) for key in self.inserted],
+            "updated": [list(key) for key in self.updated],
+            "deleted": [list(key) for key in self.deleted],
+            "unchanged": self.unchanged,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.table}: 新增 {len(self.inserted)}, 更新 {len(self.updated)}, "
+            f"删除 {len(self.deleted)}, 未变化 {self.unchanged}"
+        )
+
+
+def diff_upsert(
+    db: Session,
+    model: Type,
+    rows: Sequence[Dict[str, Any]],
+    key_columns: Sequence[str],
+    scope: Sequence[Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    expected: Optional[int] = None,
+) -> ChangeSet:
+    """
+    以 rows 为准同步 scope 范围内的数据：
+    新行插入、内容变化的行更新、范围内不再出现的行删除，未变化的行不会被改写
+
+    Args:
+        db: 数据库会话（由调用方负责提交，所有变更在同一事务内）
+        model: SQLAlchemy 模型类
+        rows: 范围内的完整数据，键为模型属性名
+        key_columns: 比较用的键（必须有对应的唯一约束），如 ("season_id", "driver_id")
+        scope: 限定同步范围的过滤条件，如 DriverStanding.season_id == 1
+        chunk_size: 每条语句的最大行数
+        expected: 上游数据的行数，rows 少于该数量说明有行无法关联（如车队创建失败）
+
+    Returns:
+        ChangeSet: 新增/更新/删除的键
+
+    Raises:
+        IncompleteSyncError: rows 为空或少于 expected，此时不做任何写入，由调用方回滚
+    """
+    table = model.__table__
+    # 不完整的数据会把范围内缺失的行当作过期数据删除
+    if not rows:
+        raise IncompleteSyncError(f"{table.name}: 上游数据为空，拒绝清空同步范围内的数据")
+    if expected is not None and len(rows) < expected:
+        raise IncompleteSyncError(
+            f"{table.name}: 上游 {expected} 行中只有 {len(rows)} 行可以写入，拒绝删除范围内的数据"
+        )
+
+    key_columns = tuple(key_columns)
+    stats = UpsertStats(table=table.name)
+    change_set = ChangeSet(table=table.name, key_columns=key_columns)
+
+    written = _upsert_chunks(db, model, rows, key_columns, None, chunk_size, stats)
+    for row in written:
+        key = tuple(row[:len(key_columns)])
+        (change_set.inserted if row.inserted else change_set.updated).append(key)
+    incoming = {tuple(row[c] for c in key_columns) for row in _to_column_keys(model, rows)}
+
+    # 范围内已不存在于上游的数据
+    key_attrs = [table.c[c] for c in key_columns]
+    existing = db.execute(select(*key_attrs).where(*scope)).all()
+    stale = [tuple(row) for row in existing if tuple(row) not in incoming]
+    if stale:
+        db.execute(delete(table).where(*scope).where(tuple_(*key_attrs).in_(stale)))
+        stats.statements += 1
+        change_set.deleted = stale
+
+    change_set.unchanged = stats.unchanged
+    change_set.statements = stats.statements + 1
+
+    logger.info(f"📦 差异同步完成 - {change_set}")
+    return change_set
@@ -0,0 +1,159 @@
+"""
+缓存预热
+比赛后同步完成并按标签失效缓存后，提前计算受影响赛季/轮次的热点接口响应并写入 Redis，
+同时重新生成赛季数据包，第一批访问的用户不再承担冷查询的开销
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models import Race, Season
+from .season_bundle import season_bundles
+
+logger = logging.getLogger(__name__)
+
+# 前端比赛列表页一次请求的数量
+RACE_LIST_PAGE_SIZE = 30
+
+
+@dataclass
+class WarmTarget:
+    """一个需要预热的接口响应"""
+    name: str
+    endpoint: Callable
+    params: Dict[str, Any]
+
+
+@dataclass
+class WarmResult:
+    name: str
+    success: bool
+    seconds: float
+    cache_key: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class WarmReport:
+    """一次预热的结果和耗时"""
+    season_year: int
+    race_round: Optional[int]
+    results: List[WarmResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return all(r.success for r in self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式用于任务结果"""
+        return {
+            "season_year": self.season_year,
+            "race_round": self.race_round,
+            "success": self.success,
+            "seconds": round(self.seconds, 3),
+            "targets": [asdict(r) for r in self.results],
+        }
+
+
+class CacheWarmer:
+    """按赛季/轮次预热热点接口缓存"""
+
+    def __init__(self, db: Session, concurrency: Optional[int] = None):
+        self.db = db
+        self.concurrency = concurrency or settings.cache_warm_concurrency
+
+    def targets(self, season_year: int, race_round: Optional[int] = None) -> List[WarmTarget]:
+        """受影响赛季/轮次的热点接口（参数与前端请求一致，保证命中同一个缓存键）"""
+        # 延迟导入，避免服务层在导入时依赖 API 层
+        from ..api.v1.endpoints import races, standings
+
+        targets = [
+            WarmTarget("driver_standings", standings.get_driver_standings, {"year": season_year}),
+            WarmTarget("constructor_standings", standings.get_constructor_standings, {"year": season_year}),
+            WarmTarget("races_upcoming", races.get_upcoming_races, {"limit": 5}),
+            WarmTarget(
+                "season_races", races.get_races,
+                {"season": season_year, "page": 1, "size": RACE_LIST_PAGE_SIZE},
+            ),
+        ]
+
+        if race_round is not None:
+            race = (
+                self.db.query(Race)
+                .join(Season)
+                .filter(Season.year == season_year, Race.round_number == race_round)
+                .first()
+            )
+            if race:
+                targets.append(WarmTarget("race_podium", races.get_race_podium, {"race_id": race.id}))
+            else:
+                logger.warning(f"未找到 {season_year} 赛季第 {race_round} 轮比赛，跳过领奖台预热")
+
+        return targets
+
+    def warm(self, season_year: int, race_round: Optional[int] = None) -> WarmReport:
+        """
+        并发预热，每个目标使用独立的数据库会话
+        单个目标失败不影响其他目标
+        """
+        report = WarmReport(season_year, race_round)
+        targets = self.targets(season_year, race_round)
+        logger.info(f"🔥 开始预热 {len(targets)} 个接口缓存 (并发 {self.concurrency})...")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="cache-warm") as pool:
+            bundle = pool.submit(self._refresh_bundle, season_year)
+            report.results = list(pool.map(self._warm_one, targets))
+            report.results.append(bundle.result())
+        report.seconds = time.perf_counter() - start
+
+        failed = [r.name for r in report.results if not r.success]
+        if failed:
+            logger.warning(f"⚠️ 缓存预热部分失败: {failed}，耗时 {report.seconds:.2f} 秒")
+        else:
+            logger.info(f"✅ 缓存预热完成，{len(report.results)} 个接口，耗时 {report.seconds:.2f} 秒")
+        return report
+
+    @staticmethod
+    def _refresh_bundle(season_year: int) -> WarmResult:
+        """重新生成赛季数据包"""
+        db = SessionLocal()
+        start = time.perf_counter()
+        try:
+            bundle = season_bundles.refresh(db, season_year)
+            seconds = time.perf_counter() - start
+            if bundle is None:
+                return WarmResult("season_bundle", False, seconds, error=f"{season_year} 赛季不存在")
+            logger.info(f"  📦 season_bundle: {seconds * 1000:.0f} ms")
+            return WarmResult("season_bundle", True, seconds)
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            logger.error(f"  ❌ season_bundle 生成失败: {e}")
+            return WarmResult("season_bundle", False, seconds, error=str(e))
+        finally:
+            db.close()
+
+    @staticmethod
+    def _warm_one(target: WarmTarget) -> WarmResult:
+        db = SessionLocal()
+        start = time.perf_counter()
+        try:
+            cache_key = asyncio.run(target.endpoint.warm(db=db, **target.params))
+            seconds = time.perf_counter() - start
+            logger.info(f"  🔥 {target.name}: {seconds * 1000:.0f} ms")
+            return WarmResult(target.name, True, seconds, cache_key=cache_key)
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            logger.error(f"  ❌ {target.name} 预热失败: {e}")
+            return WarmResult(target.name, False, seconds, error=str(e))
+        finally:
+            db.close()
@@ -15,6 +15,8 @@ from typing import List, Optional, Dict, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from ..core.cache import invalidate_cache_tags, circuit_tag
+from ..core.data_version import bump_data_version
 from ..core.database import get_db
 from ..models.circuit import Circuit
 from .f1_circuit_scraper_v2 import F1CircuitScraperV2, CircuitInfo
@@ -185,6 +187,8 @@ class CircuitSyncServiceV2:
                     # 提交数据库更改
                     self.db.commit()
                     self.db.refresh(circuit)
+                    invalidate_cache_tags(circuit_tag(circuit.circuit_id))
+                    bump_data_version(reference=True)
                     logger.info(f"✅ 成功同步赛道: {circuit.circuit_name}")
                     return True, "同步成功"
                 else:
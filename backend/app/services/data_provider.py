@@ -10,15 +10,18 @@ from datetime import datetime
 import logging
 import time
 
+from ..core.rate_limit import TokenBucketLimiter, get_ergast_limiter
+
 logger = logging.getLogger(__name__)
 
 
 class RateLimitHandler:
-    """API频率限制处理器"""
+    """API频率限制处理器，请求前从全局令牌桶获取配额"""
     
-    def __init__(self, delay_seconds: float = 1.0, max_retries: int = 3):
-        self.delay_seconds = delay_seconds
+    def __init__(self, backoff_seconds: float = 1.0, max_retries: int = 3, limiter: Optional[TokenBucketLimiter] = None):
+        self.backoff_seconds = backoff_seconds
         self.max_retries = max_retries
+        self.limiter = limiter or get_ergast_limiter()
         self.request_count = 0
         self.last_request_time = 0
         
@@ -26,27 +29,20 @@ class RateLimitHandler:
         """执行函数并处理频率限制"""
         for attempt in range(self.max_retries):
             try:
-                # 智能延迟：根据请求类型调整延迟
                 if attempt > 0:
-                    # 递增延迟策略
-                    delay = self.delay_seconds * (2 ** attempt)
+                    # 被上游限流后的递增退避
+                    delay = self.backoff_seconds * (2 ** attempt)
                     logger.info(f"等待 {delay} 秒后重试...")
                     time.sleep(delay)
-                else:
-                    # 基础延迟，避免过于频繁的请求
-                    if self.request_count > 0:
-                        time.sleep(self.delay_seconds * 0.5)
                 
+                # 预算充足时不等待
+                self.limiter.acquire()
                 result = func(*args, **kwargs)
                 
                 # 更新请求统计
                 self.request_count += 1
                 self.last_request_time = time.time()
                 
-                # 成功后添加基础延迟
-                if self.delay_seconds > 0:
-                    time.sleep(self.delay_seconds)
-                
                 return result
                 
             except Exception as e:
@@ -124,21 +120,22 @@ class FastF1Provider(DataProvider):
         import fastf1
         from fastf1.ergast import Ergast
         
-        if cache_dir:
-            fastf1.Cache.enable_cache(cache_dir)
-            logger.info(f"启用 FastF1 缓存目录: {cache_dir}")
+        from .ergast_response_cache import enable_fastf1_cache
+        
+        # 未指定时使用配置中的统一缓存目录
+        self.cache_dir = enable_fastf1_cache(cache_dir)
         
         self.fastf1 = fastf1
         self.ergast = Ergast()
         
-        # 为2025赛季优化频率限制配置
-        self.rate_limiter = RateLimitHandler(delay_seconds=1.0, max_retries=3)
+        # 请求通过全局令牌桶限流，被上游限流时退避重试
+        self.rate_limiter = RateLimitHandler(backoff_seconds=1.0, max_retries=3)
         
         # 设置FastF1配置
         fastf1.set_log_level('WARNING')  # 减少日志输出
         
         logger.info("初始化 FastF1 数据提供者，启用频率限制处理")
-        logger.info("当前配置: 延迟1.0秒，最大重试3次")
+        logger.info(f"当前配置: 令牌桶限流 {self.rate_limiter.limiter.name}，最大重试3次")
     
     def get_circuits(self, season: Optional[int] = None) -> pd.DataFrame:
         """获取赛道数据 - 使用 fastf1.ergast"""
@@ -282,257 +279,90 @@ class FastF1Provider(DataProvider):
             logger.error(f"获取比赛数据失败: {e}")
             return pd.DataFrame()
     
-    def get_race_results(self, season: int, round_number: Optional[int] = None) -> pd.DataFrame:
-        """获取比赛结果 - 正确处理 ErgastMultiResponse 数据结构并支持分页"""
+    def _get_session_results(self, endpoint: str, label: str, season: int, round_number: Optional[int] = None) -> pd.DataFrame:
+        """
+        获取比赛/排位赛/冲刺赛结果 - 正确处理 ErgastMultiResponse 数据结构并支持分页
+        指定 round_number 时只请求该轮数据，通常一页即可返回
+        """
+        def _tag_results(response, page_count: int) -> List[pd.DataFrame]:
+            """为每场比赛的结果数据添加比赛信息"""
+            tagged = []
+            for idx, result_df in enumerate(response.content):
+                if idx < len(response.description):
+                    race_info = response.description.iloc[idx]
+                    round_num = race_info['round']
+                    
+                    result_df = result_df.copy()
+                    result_df['season'] = season
+                    result_df['round'] = round_num
+                    result_df['raceName'] = race_info['raceName']
+                    result_df['circuitName'] = race_info['circuitName']
+                    result_df['country'] = race_info['country']
+                    
+                    tagged.append(result_df)
+                    logger.info(f"📊 处理第 {round_num} 轮{label}: {race_info['raceName']} (第{page_count}页)")
+            return tagged
+        
         try:
-            def _get_race_results():
-                return self.ergast.get_race_results(season=season, round=round_number)
+            def _fetch():
+                return getattr(self.ergast, endpoint)(season=season, round=round_number)
             
-            results = self.rate_limiter.execute_with_retry(_get_race_results)
+            results = self.rate_limiter.execute_with_retry(_fetch)
             
             if results is None:
                 return pd.DataFrame()
             
-            # 正确处理 ErgastMultiResponse 数据结构并支持分页
-            if hasattr(results, 'content') and results.content:
-                all_results = []
-                
-                # 处理第一页数据
-                for idx, result_df in enumerate(results.content):
-                    if idx < len(results.description):
-                        # 获取比赛描述信息
-                        race_info = results.description.iloc[idx]
-                        round_num = race_info['round']
-                        
-                        # 为结果数据添加比赛信息
-                        result_df = result_df.copy()
-                        result_df['season'] = season
-                        result_df['round'] = round_num
-                        result_df['raceName'] = race_info['raceName']
-                        result_df['circuitName'] = race_info['circuitName']
-                        result_df['country'] = race_info['country']
-                        
-                        all_results.append(result_df)
-                        logger.info(f"📊 处理第 {round_num} 轮比赛: {race_info['raceName']} (第1页)")
-                
-                # 如果数据不完整，继续获取下一页
-                current_results = results
-                page_count = 1
-                while hasattr(current_results, 'is_complete') and not current_results.is_complete:
-                    try:
-                        page_count += 1
-                        logger.info(f"📄 获取第 {page_count} 页比赛结果数据...")
-                        current_results = current_results.get_next_result_page()
-                        
-                        if hasattr(current_results, 'content') and current_results.content:
-                            for idx, result_df in enumerate(current_results.content):
-                                if idx < len(current_results.description):
-                                    # 获取比赛描述信息
-                                    race_info = current_results.description.iloc[idx]
-                                    round_num = race_info['round']
-                                    
-                                    # 为结果数据添加比赛信息
-                                    result_df = result_df.copy()
-                                    result_df['season'] = season
-                                    result_df['round'] = round_num
-                                    result_df['raceName'] = race_info['raceName']
-                                    result_df['circuitName'] = race_info['circuitName']
-                                    result_df['country'] = race_info['country']
-                                    
-                                    all_results.append(result_df)
-                                    logger.info(f"📊 处理第 {round_num} 轮比赛: {race_info['raceName']} (第{page_count}页)")
-                    except ValueError:
-                        # 没有更多页面了
-                        break
-                    except Exception as e:
-                        logger.warning(f"⚠️ 获取下一页数据时出错: {e}")
-                        break
-                
-                # 合并所有比赛的结果
-                if all_results:
-                    combined_results = pd.concat(all_results, ignore_index=True)
-                    unique_rounds = sorted(combined_results['round'].unique())
-                    logger.info(f"✅ 成功获取 {len(unique_rounds)} 场比赛的结果数据，共 {len(combined_results)} 条记录")
-                    logger.info(f"🎯 包含轮次: {unique_rounds}")
-                    return combined_results
-                else:
-                    logger.warning("⚠️ 没有比赛结果数据")
-                    return pd.DataFrame()
-            else:
+            if not (hasattr(results, 'content') and results.content):
                 logger.warning("⚠️ ErgastMultiResponse 没有内容数据")
                 return pd.DataFrame()
             
-        except Exception as e:
-            logger.error(f"获取比赛结果失败: {e}")
-            return pd.DataFrame()
-    
-    def get_qualifying_results(self, season: int, round_number: Optional[int] = None) -> pd.DataFrame:
-        """获取排位赛结果 - 正确处理 ErgastMultiResponse 数据结构并支持分页"""
-        try:
-            def _get_qualifying_results():
-                return self.ergast.get_qualifying_results(season=season, round=round_number)
+            # 处理第一页数据
+            all_results = _tag_results(results, 1)
             
-            results = self.rate_limiter.execute_with_retry(_get_qualifying_results)
+            # 如果数据不完整，继续获取下一页
+            current_results = results
+            page_count = 1
+            while hasattr(current_results, 'is_complete') and not current_results.is_complete:
+                try:
+                    page_count += 1
+                    logger.info(f"📄 获取第 {page_count} 页{label}数据...")
+                    current_results = self.rate_limiter.execute_with_retry(current_results.get_next_result_page)
+                    
+                    if hasattr(current_results, 'content') and current_results.content:
+                        all_results.extend(_tag_results(current_results, page_count))
+                except ValueError:
+                    # 没有更多页面了
+                    break
+                except Exception as e:
+                    logger.warning(f"⚠️ 获取下一页数据时出错: {e}")
+                    break
             
-            if results is None:
-                return pd.DataFrame()
+            # 合并所有比赛的结果
+            if all_results:
+                combined_results = pd.concat(all_results, ignore_index=True)
+                unique_rounds = sorted(combined_results['round'].unique())
+                logger.info(f"✅ 成功获取 {len(unique_rounds)} 场比赛的{label}数据，共 {len(combined_results)} 条记录 ({page_count} 页)")
+                logger.info(f"🎯 包含轮次: {unique_rounds}")
+                return combined_results
             
-            # 正确处理 ErgastMultiResponse 数据结构并支持分页
-            if hasattr(results, 'content') and results.content:
-                all_results = []
-                
-                # 处理第一页数据
-                for idx, result_df in enumerate(results.content):
-                    if idx < len(results.description):
-                        # 获取比赛描述信息
-                        race_info = results.description.iloc[idx]
-                        round_num = race_info['round']
-                        
-                        # 为结果数据添加比赛信息
-                        result_df = result_df.copy()
-                        result_df['season'] = season
-                        result_df['round'] = round_num
-                        result_df['raceName'] = race_info['raceName']
-                        result_df['circuitName'] = race_info['circuitName']
-                        result_df['country'] = race_info['country']
-                        
-                        all_results.append(result_df)
-                        logger.info(f"📊 处理第 {round_num} 轮排位赛: {race_info['raceName']} (第1页)")
-                
-                # 如果数据不完整，继续获取下一页
-                current_results = results
-                page_count = 1
-                while hasattr(current_results, 'is_complete') and not current_results.is_complete:
-                    try:
-                        page_count += 1
-                        logger.info(f"📄 获取第 {page_count} 页排位赛结果数据...")
-                        current_results = current_results.get_next_result_page()
-                        
-                        if hasattr(current_results, 'content') and current_results.content:
-                            for idx, result_df in enumerate(current_results.content):
-                                if idx < len(current_results.description):
-                                    # 获取比赛描述信息
-                                    race_info = current_results.description.iloc[idx]
-                                    round_num = race_info['round']
-                                    
-                                    # 为结果数据添加比赛信息
-                                    result_df = result_df.copy()
-                                    result_df['season'] = season
-                                    result_df['round'] = round_num
-                                    result_df['raceName'] = race_info['raceName']
-                                    result_df['circuitName'] = race_info['circuitName']
-                                    result_df['country'] = race_info['country']
-                                    
-                                    all_results.append(result_df)
-                                    logger.info(f"📊 处理第 {round_num} 轮排位赛: {race_info['raceName']} (第{page_count}页)")
-                    except ValueError:
-                        # 没有更多页面了
-                        break
-                    except Exception as e:
-                        logger.warning(f"⚠️ 获取下一页数据时出错: {e}")
-                        break
-                
-                # 合并所有比赛的结果
-                if all_results:
-                    combined_results = pd.concat(all_results, ignore_index=True)
-                    unique_rounds = sorted(combined_results['round'].unique())
-                    logger.info(f"✅ 成功获取 {len(unique_rounds)} 场比赛的排位赛数据，共 {len(combined_results)} 条记录")
-                    logger.info(f"🎯 包含轮次: {unique_rounds}")
-                    return combined_results
-                else:
-                    logger.warning("⚠️ 没有排位赛结果数据")
-                    return pd.DataFrame()
-            else:
-                logger.warning("⚠️ ErgastMultiResponse 没有内容数据")
-                return pd.DataFrame()
+            logger.warning(f"⚠️ 没有{label}数据")
+            return pd.DataFrame()
             
         except Exception as e:
-            logger.error(f"获取排位赛结果失败: {e}")
+            logger.error(f"获取{label}失败: {e}")
             return pd.DataFrame()
     
+    def get_race_results(self, season: int, round_number: Optional[int] = None) -> pd.DataFrame:
+        """获取比赛结果，指定 round_number 时只获取该轮"""
+        return self._get_session_results('get_race_results', '比赛结果', season, round_number)
+    
+    def get_qualifying_results(self, season: int, round_number: Optional[int] = None) -> pd.DataFrame:
+        """获取排位赛结果，指定 round_number 时只获取该轮"""
+        return self._get_session_results('get_qualifying_results', '排位赛结果', season, round_number)
+    
     def get_sprint_results(self, season: int, round_number: Optional[int] = None) -> pd.DataFrame:
-        """获取冲刺赛结果 - 正确处理 ErgastMultiResponse 数据结构并支持分页"""
-        try:
-            def _get_sprint_results():
-                return self.ergast.get_sprint_results(season=season, round=round_number)
-            
-            results = self.rate_limiter.execute_with_retry(_get_sprint_results)
-            
-            if results is None:
-                return pd.DataFrame()
-            
-            # 正确处理 ErgastMultiResponse 数据结构并支持分页
-            if hasattr(results, 'content') and results.content:
-                all_results = []
-                
-                # 处理第一页数据
-                for idx, result_df in enumerate(results.content):
-                    if idx < len(results.description):
-                        # 获取比赛描述信息
-                        race_info = results.description.iloc[idx]
-                        round_num = race_info['round']
-                        
-                        # 为结果数据添加比赛信息
-                        result_df = result_df.copy()
-                        result_df['season'] = season
-                        result_df['round'] = round_num
-                        result_df['raceName'] = race_info['raceName']
-                        result_df['circuitName'] = race_info['circuitName']
-                        result_df['country'] = race_info['country']
-                        
-                        all_results.append(result_df)
-                        logger.info(f"📊 处理第 {round_num} 轮冲刺赛: {race_info['raceName']} (第1页)")
-                
-                # 如果数据不完整，继续获取下一页
-                current_results = results
-                page_count = 1
-                while hasattr(current_results, 'is_complete') and not current_results.is_complete:
-                    try:
-                        page_count += 1
-                        logger.info(f"📄 获取第 {page_count} 页冲刺赛结果数据...")
-                        current_results = current_results.get_next_result_page()
-                        
-                        if hasattr(current_results, 'content') and current_results.content:
-                            for idx, result_df in enumerate(current_results.content):
-                                if idx < len(current_results.description):
-                                    # 获取比赛描述信息
-                                    race_info = current_results.description.iloc[idx]
-                                    round_num = race_info['round']
-                                    
-                                    # 为结果数据添加比赛信息
-                                    result_df = result_df.copy()
-                                    result_df['season'] = season
-                                    result_df['round'] = round_num
-                                    result_df['raceName'] = race_info['raceName']
-                                    result_df['circuitName'] = race_info['circuitName']
-                                    result_df['country'] = race_info['country']
-                                    
-                                    all_results.append(result_df)
-                                    logger.info(f"📊 处理第 {round_num} 轮冲刺赛: {race_info['raceName']} (第{page_count}页)")
-                    except ValueError:
-                        # 没有更多页面了
-                        break
-                    except Exception as e:
-                        logger.warning(f"⚠️ 获取下一页数据时出错: {e}")
-                        break
-                
-                # 合并所有比赛的结果
-                if all_results:
-                    combined_results = pd.concat(all_results, ignore_index=True)
-                    unique_rounds = sorted(combined_results['round'].unique())
-                    logger.info(f"✅ 成功获取 {len(unique_rounds)} 场比赛的冲刺赛数据，共 {len(combined_results)} 条记录")
-                    logger.info(f"🎯 包含轮次: {unique_rounds}")
-                    return combined_results
-                else:
-                    logger.warning("⚠️ 没有冲刺赛结果数据")
-                    return pd.DataFrame()
-            else:
-                logger.warning("⚠️ ErgastMultiResponse 没有内容数据")
-                return pd.DataFrame()
-            
-        except Exception as e:
-            logger.error(f"获取冲刺赛结果失败: {e}")
-            return pd.DataFrame()
+        """获取冲刺赛结果，指定 round_number 时只获取该轮"""
+        return self._get_session_results('get_sprint_results', '冲刺赛结果', season, round_number)
     
     def get_driver_standings(self, season: int, round_number: Optional[int] = None) -> pd.DataFrame:
         """获取车手积分榜 - 使用 fastf1.ergast"""
@@ -0,0 +1,210 @@
+"""
+Ergast 响应缓存
+把分页合并后的 DataFrame 以 Parquet 格式按内容哈希存储在本地，
+清单记录每个 (接口, 赛季, 轮次) 最新的内容哈希和已写入数据库的哈希，
+上游数据未变化时同步可以跳过数据库写入。
+多个进程（API、Celery worker、脚本）共用同一清单，读取-修改-替换期间持有清单旁的文件锁
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_LOCK_FILE = "manifest.json.lock"
+OBJECTS_DIR = "objects"
+
+
+def resolve_cache_dir(cache_dir: Optional[str] = None) -> Path:
+    """统一的缓存目录：未指定时使用配置中的 FASTF1_CACHE_DIR"""
+    path = Path(cache_dir or settings.fastf1_cache_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def enable_fastf1_cache(cache_dir: Optional[str] = None) -> Path:
+    """启用 FastF1 HTTP 缓存，所有调用方共用同一目录"""
+    import fastf1
+
+    path = resolve_cache_dir(cache_dir)
+    fastf1.Cache.enable_cache(str(path))
+    logger.info(f"启用 FastF1 缓存目录: {path}")
+    return path
+
+
+def _hashable(series: pd.Series) -> pd.Series:
+    """列表等不可哈希的值转为字符串后再计算哈希"""
+    if series.dtype == object and series.map(lambda v: isinstance(v, (list, tuple, dict, np.ndarray))).any():
+        return series.map(repr)
+    return series
+
+
+def content_hash(df: pd.DataFrame) -> str:
+    """计算 DataFrame 的内容哈希（列名、类型和所有值）"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    if not df.empty:
+        normalized = df.apply(_hashable) if len(df.columns) else df
+        digest.update(pd.util.hash_pandas_object(normalized, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """清单中的一条记录"""
+    endpoint: str
+    season: int
+    round: Optional[int]
+    content_hash: str
+    pages: int
+    rows: int
+    fetched_at: str
+    applied_hash: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return ErgastResponseCache.make_key(self.endpoint, self.season, self.round)
+
+    @property
+    def is_applied(self) -> bool:
+        """当前内容是否已写入数据库"""
+        return self.applied_hash == self.content_hash
+
+
+class ErgastResponseCache:
+    """按内容寻址的 Ergast 响应存储"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.root = resolve_cache_dir(cache_dir) / "ergast_responses"
+        self.objects_dir = self.root / OBJECTS_DIR
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root / MANIFEST_FILE
+        self.lock_path = self.root / MANIFEST_LOCK_FILE
+        self._lock = threading.Lock()
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+
+    @staticmethod
+    def make_key(endpoint: str, season: int, round_number: Optional[int] = None) -> str:
+        return f"{endpoint}:{season}:{'all' if round_number is None else round_number}"
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ 响应缓存清单损坏，将重新建立: {e}")
+            return {}
+
+    @contextmanager
+    def _manifest_update(self):
+        """
+        更新清单：线程锁 + 跨进程文件锁，进入时重新读取清单（其他进程可能已更新）
+        锁加在单独的锁文件上，清单本身通过 os.replace 替换，不能直接加锁
+        """
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._manifest = self._load_manifest()
+                yield self._manifest
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save_manifest(self):
+        """原子写入清单（调用方持有 _manifest_update 的锁）"""
+        tmp_path = self.manifest_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(self._manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / f"{digest}.parquet"
+
+    def get_entry(self, endpoint: str, season: int, round_number: Optional[int] = None) -> Optional[CacheEntry]:
+        with self._lock:
+            data = self._manifest.get(self.make_key(endpoint, season, round_number))
+        return CacheEntry(**data) if data else None
+
+    def entries(self) -> Dict[str, CacheEntry]:
+        """清单中的所有记录"""
+        with self._lock:
+            return {key: CacheEntry(**data) for key, data in self._manifest.items()}
+
+    def load(self, endpoint: str, season: int, round_number: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """读取已缓存的 DataFrame"""
+        entry = self.get_entry(endpoint, season, round_number)
+        if entry is None:
+            return None
+        path = self._object_path(entry.content_hash)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path)
+
+    def store(
+        self,
+        endpoint: str,
+        season: int,
+        round_number: Optional[int],
+        df: pd.DataFrame,
+        pages: int = 1,
+    ) -> CacheEntry:
+        """
+        保存一次请求的合并结果
+
+        Returns:
+            CacheEntry: 最新记录，内容未变化时保留之前的 applied_hash
+        """
+        digest = content_hash(df)
+        path = self._object_path(digest)
+        if not path.exists():
+            try:
+                tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                df.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                # 无法列式存储的数据只记录哈希
+                logger.warning(f"⚠️ 响应无法写入 Parquet ({endpoint} {season}/{round_number}): {e}")
+
+        key = self.make_key(endpoint, season, round_number)
+        with self._manifest_update() as manifest:
+            previous = manifest.get(key, {})
+            entry = CacheEntry(
+                endpoint=endpoint,
+                season=season,
+                round=round_number,
+                content_hash=digest,
+                pages=pages,
+                rows=len(df),
+                fetched_at=datetime.now(timezone.utc).isoformat(),
+                applied_hash=previous.get("applied_hash"),
+            )
+            manifest[key] = asdict(entry)
+            self._save_manifest()
+
+        if previous.get("content_hash") == digest:
+            logger.info(f"🗃️ 响应未变化: {key} ({digest[:12]})")
+        else:
+            logger.info(f"🗃️ 响应已缓存: {key} ({digest[:12]}, {len(df)} 行, {pages} 页)")
+        return entry
+
+    def mark_applied(self, endpoint: str, season: int, round_number: Optional[int], digest: str):
+        """记录该内容已成功写入数据库"""
+        key = self.make_key(endpoint, season, round_number)
+        with self._manifest_update() as manifest:
+            if key in manifest:
+                manifest[key]["applied_hash"] = digest
+                self._save_manifest()
@@ -6,6 +6,7 @@
 3. 冲刺赛结果 (sprint results)
 4. 车手积分榜 (driver standings)
 5. 车队积分榜 (constructor standings)
+同步成功后预热受影响的接口缓存，预热报告（含耗时）记录在该次尝试中
 """
 
 import logging
@@ -19,6 +20,7 @@ from sqlalchemy.orm import Session
 from ..core.redis import get_redis_client
 from ..models import Race, Season
 from .unified_sync_service import UnifiedSyncService
+from .cache_warmer import CacheWarmer
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +44,7 @@ class SyncAttempt:
     status: SyncStatus = SyncStatus.PENDING
     results: Optional[Dict[str, bool]] = None
     error_message: Optional[str] = None
+    cache_warming: Optional[Dict[str, Any]] = None  # 同步成功后的缓存预热报告（含耗时）
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式用于存储"""
@@ -51,7 +54,8 @@ class SyncAttempt:
             "executed_time": self.executed_time.isoformat() if self.executed_time else None,
             "status": self.status.value,
             "results": self.results or {},
-            "error_message": self.error_message
+            "error_message": self.error_message,
+            "cache_warming": self.cache_warming
         }
     
     @classmethod
@@ -73,7 +77,8 @@ class SyncAttempt:
             executed_time=executed_time,
             status=SyncStatus(data["status"]),
             results=data.get("results", {}),
-            error_message=data.get("error_message")
+            error_message=data.get("error_message"),
+            cache_warming=data.get("cache_warming")
         )
 
 
@@ -329,23 +334,23 @@ class PostRaceSyncService:
         attempt.executed_time = datetime.now(timezone.utc)
         self._save_schedule(schedule)
         
-        # 执行同步
+        # 执行同步（只请求本轮数据）
         sync_results = {}
         try:
             # 1. 同步比赛结果
-            sync_results["race_results"] = self.sync_service.sync_race_results(season_year)
+            sync_results["race_results"] = self.sync_service.sync_race_results(season_year, race_round)
             
             # 2. 同步排位赛结果
-            sync_results["qualifying_results"] = self.sync_service.sync_qualifying_results(season_year)
+            sync_results["qualifying_results"] = self.sync_service.sync_qualifying_results(season_year, race_round)
             
             # 3. 同步冲刺赛结果（如果有的话）
-            sync_results["sprint_results"] = self.sync_service.sync_sprint_results(season_year)
+            sync_results["sprint_results"] = self.sync_service.sync_sprint_results(season_year, race_round)
             
             # 4. 同步车手积分榜
-            sync_results["driver_standings"] = self.sync_service.sync_driver_standings(season_year)
+            sync_results["driver_standings"] = self.sync_service.sync_driver_standings(season_year, race_round)
             
             # 5. 同步车队积分榜
-            sync_results["constructor_standings"] = self.sync_service.sync_constructor_standings(season_year)
+            sync_results["constructor_standings"] = self.sync_service.sync_constructor_standings(season_year, race_round)
             
             # 判断整体状态
             successful_count = sum(1 for success in sync_results.values() if success)
@@ -368,6 +373,10 @@ class PostRaceSyncService:
                 f"   详细结果: {sync_results}"
             )
             
+            # 6. 预热受影响的接口缓存（失败不影响同步结果）
+            if overall_status != SyncStatus.FAILED:
+                attempt.cache_warming = self._warm_cache(season_year, race_round)
+            
         except Exception as e:
             logger.error(f"❌ 第 {attempt_number} 次同步失败: {e}")
             attempt.status = SyncStatus.FAILED
@@ -380,6 +389,15 @@ class PostRaceSyncService:
         
         return overall_status, sync_results
     
+    def _warm_cache(self, season_year: int, race_round: int) -> Dict[str, Any]:
+        """预热本轮同步影响的接口缓存，返回预热报告"""
+        logger.info("🔥 预热接口缓存...")
+        try:
+            return CacheWarmer(self.db).warm(season_year, race_round).to_dict()
+        except Exception as e:
+            logger.error(f"缓存预热失败: {e}")
+            return {"success": False, "error": str(e)}
+    
     def get_pending_syncs(self) -> List[Tuple[int, int, int, datetime]]:
         """
         获取所有待执行的同步任务
@@ -0,0 +1,254 @@
+"""
+结果数据转换层
+以列为单位把 Ergast DataFrame 转换为可直接写入数据库的记录，
+数值转换、缺失值处理和时间差转换都是整列的向量化操作
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnSpec(NamedTuple):
+    """单列映射：模型属性名 <- DataFrame 列名"""
+    attr: str
+    source: str
+    kind: str  # int / float / str / millis
+
+
+# 比赛结果
+RESULT_COLUMNS: Sequence[ColumnSpec] = (
+    ColumnSpec('number', 'number', 'int'),
+    ColumnSpec('position', 'position', 'int'),
+    ColumnSpec('position_text', 'positionText', 'str'),
+    ColumnSpec('points', 'points', 'float'),
+    ColumnSpec('grid', 'grid', 'int'),
+    ColumnSpec('laps', 'laps', 'int'),
+    ColumnSpec('status', 'status', 'str'),
+    ColumnSpec('total_race_time_millis', 'totalRaceTimeMillis', 'millis'),
+    ColumnSpec('total_race_time', 'totalRaceTime', 'str'),
+    ColumnSpec('fastest_lap_rank', 'fastestLapRank', 'int'),
+    ColumnSpec('fastest_lap_number', 'fastestLapNumber', 'int'),
+    ColumnSpec('fastest_lap_time', 'fastestLapTime', 'str'),
+)
+
+# 冲刺赛结果与正赛结果字段相同
+SPRINT_RESULT_COLUMNS: Sequence[ColumnSpec] = RESULT_COLUMNS
+
+# 排位赛结果
+QUALIFYING_RESULT_COLUMNS: Sequence[ColumnSpec] = (
+    ColumnSpec('number', 'number', 'int'),
+    ColumnSpec('position', 'position', 'int'),
+    ColumnSpec('q1_time', 'Q1', 'str'),
+    ColumnSpec('q2_time', 'Q2', 'str'),
+    ColumnSpec('q3_time', 'Q3', 'str'),
+)
+
+# 车手/车队积分榜
+STANDING_COLUMNS: Sequence[ColumnSpec] = (
+    ColumnSpec('position', 'position', 'int'),
+    ColumnSpec('position_text', 'positionText', 'str'),
+    ColumnSpec('points', 'points', 'float'),
+    ColumnSpec('wins', 'wins', 'int'),
+)
+DRIVER_STANDING_COLUMNS = STANDING_COLUMNS
+CONSTRUCTOR_STANDING_COLUMNS = STANDING_COLUMNS
+
+
+def _none_array(length: int) -> np.ndarray:
+    return np.full(length, None, dtype=object)
+
+
+def _numeric(series: pd.Series) -> np.ndarray:
+    """数值化整列，无法解析的值为 NaN"""
+    if pd.api.types.is_timedelta64_dtype(series):
+        return series.dt.total_seconds().to_numpy(dtype=float) * 1000
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+
+
+def to_int(series: pd.Series) -> np.ndarray:
+    """整列转换为 Python int，缺失值为 None"""
+    values = _numeric(series)
+    missing = np.isnan(values)
+    result = np.where(missing, 0, values).astype(np.int64).astype(object)
+    result[missing] = None
+    return result
+
+
+def to_float(series: pd.Series) -> np.ndarray:
+    """整列转换为 Python float，缺失值为 None"""
+    values = _numeric(series)
+    result = values.astype(object)
+    result[np.isnan(values)] = None
+    return result
+
+
+def _format_timedelta(series: pd.Series) -> np.ndarray:
+    """
+    按 str(Timedelta) 的格式批量格式化时间差（如 "0 days 01:42:06.304000"）
+    直接从纳秒整数拆分各部分，避免逐个构造 Timedelta 对象
+    """
+    missing = series.isna().to_numpy()
+    nanos = series.to_numpy(dtype='timedelta64[ns]').view(np.int64)
+    present = nanos[~missing]
+
+    # 负数和纳秒精度的时间差格式不同，交给 pandas 处理
+    if (present < 0).any() or (present % 1000).any():
+        return series.astype(str).to_numpy(dtype=object)
+
+    micros = np.where(missing, 0, nanos) // 1000
+    days, micros = np.divmod(micros, 86_400_000_000)
+    hours, micros = np.divmod(micros, 3_600_000_000)
+    minutes, micros = np.divmod(micros, 60_000_000)
+    seconds, micros = np.divmod(micros, 1_000_000)
+
+    return np.array([
+        f"{d} days {h:02d}:{m:02d}:{s:02d}" + (f".{us:06d}" if us else "")
+        for d, h, m, s, us in zip(
+            days.tolist(), hours.tolist(), minutes.tolist(), seconds.tolist(), micros.tolist()
+        )
+    ], dtype=object)
+
+
+def to_str(series: pd.Series) -> np.ndarray:
+    """
+    整列转换为字符串，缺失值为 None
+    时间差列保持 str(Timedelta) 格式（如 "0 days 01:42:06.304000"）
+    """
+    if pd.api.types.is_timedelta64_dtype(series):
+        result = _format_timedelta(series)
+    else:
+        result = series.astype(str).to_numpy(dtype=object)
+    result[series.isna().to_numpy()] = None
+    return result
+
+
+def to_millis(series: pd.Series) -> np.ndarray:
+    """时间差或毫秒数转换为整数毫秒，缺失值为 None"""
+    values = _numeric(series)
+    missing = np.isnan(values)
+    result = np.where(missing, 0, np.round(values)).astype(np.int64).astype(object)
+    result[missing] = None
+    return result
+
+
+_CONVERTERS = {
+    'int': to_int,
+    'float': to_float,
+    'str': to_str,
+    'millis': to_millis,
+}
+
+
+def constructor_ids(df: pd.DataFrame) -> pd.Series:
+    """
+    车队ID列
+    积分榜数据只有 constructorIds 列表，取第一个车队
+    """
+    result = pd.Series(None, index=df.index, dtype=object)
+    if 'constructorId' in df.columns:
+        result = df['constructorId'].astype(object)
+    if 'constructorIds' in df.columns:
+        first = df['constructorIds'].map(
+            lambda ids: ids[0] if isinstance(ids, (list, tuple)) and len(ids) > 0 else None
+        )
+        result = result.where(result.notna(), first)
+    return result
+
+
+def transform(
+    df: pd.DataFrame,
+    columns: Sequence[ColumnSpec],
+    keys: Optional[Mapping[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    将 DataFrame 按列映射转换为记录列表
+
+    Args:
+        df: Ergast 返回的 DataFrame
+        columns: 列映射
+        keys: 额外的键列（如 race_id、driver_id），值为与 df 对齐的 Series/数组或标量
+
+    Returns:
+        List[Dict]: 每行一个字典，值均为 Python 原生类型或 None
+    """
+    length = len(df)
+    if length == 0:
+        return []
+
+    names: List[str] = []
+    arrays: List[Any] = []
+
+    for name, value in (keys or {}).items():
+        names.append(name)
+        if isinstance(value, (pd.Series, np.ndarray, list)):
+            arrays.append(np.asarray(value, dtype=object))
+        else:
+            arrays.append([value] * length)
+
+    for spec in columns:
+        names.append(spec.attr)
+        if spec.source in df.columns:
+            arrays.append(_CONVERTERS[spec.kind](df[spec.source]))
+        else:
+            arrays.append(_none_array(length))
+
+    return [dict(zip(names, row)) for row in zip(*arrays)]
+
+
+@dataclass
+class PreparedFrame:
+    """
+    已完成字段转换的 DataFrame
+    不依赖数据库，可以在工作线程中生成，写入时再附加 race_id 等关联键
+    """
+    frame: pd.DataFrame
+    records: List[Dict[str, Any]]
+    constructor_ids: pd.Series
+    # 响应缓存中的记录（含内容哈希），用于跳过未变化数据的写入
+    cache_entry: Optional[Any] = None
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    def select(self, mask: Any, keys: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """
+        按掩码筛选记录并附加关联键
+
+        Args:
+            mask: 与 frame 对齐的布尔掩码
+            keys: 关联键，值为与 frame 对齐的 Series/数组或标量
+        """
+        positions = np.flatnonzero(np.asarray(mask, dtype=bool))
+        names = list(keys)
+        arrays = []
+        for value in keys.values():
+            if isinstance(value, (pd.Series, np.ndarray, list)):
+                arrays.append(np.asarray(value, dtype=object)[positions])
+            else:
+                arrays.append([value] * len(positions))
+
+        return [
+            {**dict(zip(names, key_values)), **self.records[position]}
+            for position, key_values in zip(positions.tolist(), zip(*arrays))
+        ]
+
+
+def prepare(
+    df: Optional[pd.DataFrame],
+    columns: Sequence[ColumnSpec],
+    cache_entry: Optional[Any] = None,
+) -> Optional[PreparedFrame]:
+    """转换整个 DataFrame，空数据返回 None"""
+    if df is None or df.empty:
+        return None
+    df = df.reset_index(drop=True)
+    return PreparedFrame(
+        frame=df,
+        records=transform(df, columns),
+        constructor_ids=constructor_ids(df),
+        cache_entry=cache_entry,
+    )
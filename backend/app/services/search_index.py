@@ -0,0 +1,219 @@
+"""
+车手/车队搜索索引
+进程内的前缀索引 + 三元组索引，替代无法使用索引的 ilike('%q%') 查询：
+- 名称去除重音并统一大小写（Pérez -> perez、Hülkenberg -> hulkenberg）
+- 前缀匹配用于输入联想，三元组候选 + 编辑距离用于容错（verstapen -> verstappen）
+- 结果按匹配程度排序：完全匹配 > 前缀匹配 > 容错匹配
+
+索引随参考数据版本失效：车手、车队写入后版本更新，各进程在下一次搜索时各自重建，
+查询本身只访问内存，不访问数据库
+"""
+
+import logging
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.data_version import REFERENCE_SCOPE, get_data_versions
+
+logger = logging.getLogger(__name__)
+
+# NFKD 分解后仍不是 ASCII 的常见字母
+_SPECIAL_LETTERS = str.maketrans({
+    "ø": "o", "æ": "ae", "œ": "oe", "ß": "ss", "ð": "d", "þ": "th", "ł": "l", "đ": "d", "ı": "i",
+})
+
+# 匹配得分
+EXACT_SCORE = 4.0
+PREFIX_SCORE = 3.0
+TYPO_SCORES = {1: 2.0, 2: 1.0}
+
+# 容错匹配的最短关键词长度
+MIN_TYPO_LENGTH = 3
+
+
+def fold(text: Optional[str]) -> str:
+    """去除重音、统一小写，并把标点替换为空格"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.casefold().translate(_SPECIAL_LETTERS))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return "".join(c if c.isalnum() else " " for c in stripped)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return fold(text).split()
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_distance(token: str) -> int:
+    """允许的编辑距离：短关键词只容忍一个错误"""
+    if len(token) < MIN_TYPO_LENGTH:
+        return 0
+    return 1 if len(token) <= 5 else 2
+
+
+def _prefix_distance(query: str, token: str, limit: int) -> int:
+    """
+    关键词与名称或名称前缀（输入联想时用户还没有输入完整）之间的最小编辑距离，含相邻字母交换
+    只计算一次动态规划：最后一行即关键词与名称各个前缀的距离；超过 limit 时提前返回 limit + 1
+    """
+    target = token[:len(query) + limit]
+    if len(target) < len(query) - limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(query) + 1):
+        current = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = 0 if query[i - 1] == target[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and query[i - 1] == target[j - 2] and query[i - 2] == target[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[min(len(query), len(target)):])
+
+
+@dataclass
+class SearchDocument:
+    """索引中的一条记录：texts 为参与搜索的名称，payload 为直接返回的响应数据"""
+    key: str
+    texts: Sequence[Optional[str]]
+    payload: Dict[str, Any]
+    tokens: Tuple[str, ...] = field(default=(), init=False)
+
+    def __post_init__(self):
+        tokens: List[str] = []
+        for text in self.texts:
+            for token in tokenize(text):
+                if token not in tokens:
+                    tokens.append(token)
+        self.tokens = tuple(tokens)
+
+
+class _Index:
+    """某个数据版本下不可变的索引，重建时整体替换"""
+
+    def __init__(self, documents: Iterable[SearchDocument], version: Optional[int]):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.documents: List[SearchDocument] = list(documents)
+        # 名称词 -> 文档下标
+        self.postings: Dict[str, List[int]] = {}
+        # 名称词的所有前缀 -> 名称词
+        self.prefixes: Dict[str, Set[str]] = {}
+        # 三元组 -> 名称词（容错匹配的候选）
+        self.trigrams: Dict[str, Set[str]] = {}
+        for position, document in enumerate(self.documents):
+            for token in document.tokens:
+                self.postings.setdefault(token, []).append(position)
+        for token in self.postings:
+            for length in range(1, len(token) + 1):
+                self.prefixes.setdefault(token[:length], set()).add(token)
+            for gram in _trigrams(token):
+                self.trigrams.setdefault(gram, set()).add(token)
+
+    def match(self, query: str, typo: bool) -> Dict[str, float]:
+        """单个关键词匹配到的名称词及得分"""
+        matches = {token: PREFIX_SCORE for token in self.prefixes.get(query, ())}
+        if query in self.postings:
+            matches[query] = EXACT_SCORE
+        limit = _max_distance(query)
+        if not typo or not limit:
+            return matches
+        # 至少共享一个三元组的名称词才计算编辑距离
+        candidates: Set[str] = set()
+        for gram in _trigrams(query):
+            candidates.update(self.trigrams.get(gram, ()))
+        for token in candidates - matches.keys():
+            distance = _prefix_distance(query, token, limit)
+            if distance <= limit:
+                matches[token] = TYPO_SCORES[distance]
+        return matches
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scored = self._score(terms, typo=False)
+        if len(scored) < limit:
+            # 精确和前缀匹配不足时才做容错匹配
+            scored = self._score(terms, typo=True)
+        ranked = sorted(
+            scored.items(),
+            key=lambda item: (-item[1], len(self.documents[item[0]].tokens), self.documents[item[0]].key),
+        )
+        return [self.documents[position].payload for position, _ in ranked[:limit]]
+
+    def _score(self, terms: List[str], typo: bool) -> Dict[int, float]:
+        """每个关键词都要匹配文档中的某个名称词，文档得分为各关键词最高得分之和"""
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            term_scores: Dict[int, float] = {}
+            for token, score in self.match(term, typo).items():
+                for position in self.postings[token]:
+                    if score > term_scores.get(position, 0):
+                        term_scores[position] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {p: s + term_scores[p] for p, s in scores.items() if p in term_scores}
+            if not scores:
+                return {}
+        return scores or {}
+
+
+class SearchIndex:
+    """
+    按数据版本重建的搜索索引
+    loader 从数据库读取全部记录并转换为 SearchDocument
+    """
+
+    def __init__(self, name: str, loader: Callable[[Session], Iterable[SearchDocument]]):
+        self.name = name
+        self.loader = loader
+        self._index: Optional[_Index] = None
+        self._lock = threading.Lock()
+
+    def search(self, db: Session, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """搜索并返回排序后的前 limit 条记录的响应数据"""
+        return self._current(db).search(query, limit)
+
+    def invalidate(self):
+        self._index = None
+
+    def _current(self, db: Session) -> _Index:
+        version = get_data_versions([REFERENCE_SCOPE]).get(REFERENCE_SCOPE)
+        index = self._index
+        if index is not None and not self._stale(index, version):
+            return index
+        with self._lock:
+            # 等待锁期间其他线程可能已经重建
+            index = self._index
+            if index is None or self._stale(index, version):
+                start = time.perf_counter()
+                index = _Index(self.loader(db), version)
+                self._index = index
+                logger.info(
+                    f"🔎 {self.name} 搜索索引已重建: {len(index.documents)} 条记录，"
+                    f"{len(index.postings)} 个名称词，耗时 {(time.perf_counter() - start) * 1000:.1f} ms"
+                )
+            return index
+
+    @staticmethod
+    def _stale(index: _Index, version: Optional[int]) -> bool:
+        if version is None:
+            # Redis 不可用时无法判断数据是否变化，按时间重建
+            return time.monotonic() - index.built_at > settings.search_index_ttl
+        return index.version != version
@@ -0,0 +1,259 @@
+"""
+赛季数据包
+把一个赛季页面需要的比赛、赛道、比赛结果、领奖台和两张积分榜预先生成为一份 gzip 压缩的 JSON，
+以内容哈希作为 ETag：
+- 同步后的缓存预热会重新生成数据包并写入 Redis
+- 数据包记录生成时的赛季和参考数据版本（赛道、车手、车队数据写入只更新参考数据版本），
+  任一版本变化后（包括未经过预热的写入）在下一次请求时重新生成，其他赛季的写入不影响该赛季
+- 各进程在内存中保留当前版本的数据包，请求只需读取数据版本，不访问数据库；
+  每个赛季单独加锁，一个赛季重新生成时不阻塞其他赛季的请求
+"""
+
+import gzip
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.data_version import get_data_versions, season_scopes
+from ..core.redis import get_redis_binary_client
+from ..models import Circuit, Constructor, Driver, Result, Season
+from ..schemas.circuit import CircuitResponse
+
+logger = logging.getLogger(__name__)
+
+# 数据包格式版本，修改内容结构后递增，旧的数据包不再使用
+BUNDLE_SCHEMA_VERSION = 1
+
+# Redis 中的数据包保留时间（秒），数据版本变化后会被覆盖
+BUNDLE_TTL = 7 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class SeasonBundle:
+    """一个赛季数据版本下生成的数据包"""
+    year: int
+    version: Optional[str]  # 生成时的数据版本，见 _current_version
+    content_hash: str
+    generated_at: float
+    body: bytes  # gzip 压缩的 JSON
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.content_hash}"'
+
+    def decompressed(self) -> bytes:
+        return gzip.decompress(self.body)
+
+
+def _current_version(year: int) -> Optional[str]:
+    """赛季和参考数据版本组成的版本标识（见 season_scopes），Redis 不可用时返回 None"""
+    scopes = season_scopes(year)
+    versions = get_data_versions(scopes)
+    if any(scope not in versions for scope in scopes):
+        return None
+    return ":".join(str(versions[scope]) for scope in scopes)
+
+
+def _redis_key(year: int) -> str:
+    return f"{settings.cache_prefix}:bundle:v{BUNDLE_SCHEMA_VERSION}:season:{year}"
+
+
+def _season_results(db: Session, race_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """赛季所有比赛的完整成绩，一次查询按比赛分组"""
+    rows = (
+        db.query(Result, Driver, Constructor)
+        .join(Driver, Result.driver_id == Driver.driver_id)
+        .join(Constructor, Result.constructor_id == Constructor.constructor_id)
+        .filter(Result.race_id.in_(race_ids))
+        .order_by(Result.race_id, Result.position.asc().nulls_last())
+        .all()
+    )
+    results: Dict[int, List[Dict[str, Any]]] = {race_id: [] for race_id in race_ids}
+    for result, driver, constructor in rows:
+        results[result.race_id].append({
+            "position": result.position,
+            "position_text": result.position_text,
+            "driver_id": driver.driver_id,
+            "driver_code": driver.code,
+            "driver_name": f"{driver.forename} {driver.surname}",
+            "constructor_id": constructor.constructor_id,
+            "constructor_name": constructor.name,
+            "number": result.number,
+            "grid": result.grid,
+            "laps": result.laps,
+            "status": result.status,
+            "points": result.points,
+            "total_race_time": result.total_race_time,
+            "fastest_lap_rank": result.fastest_lap_rank,
+            "fastest_lap_time": result.fastest_lap_time,
+        })
+    return results
+
+
+def build_season_bundle(db: Session, year: int) -> Optional[Dict[str, Any]]:
+    """
+    生成赛季数据包的内容，赛季不存在时返回 None
+    比赛列表、领奖台和积分榜直接调用对应接口的原函数，与单独请求的数据一致
+    """
+    # 延迟导入，避免服务层在导入时依赖 API 层
+    from ..api.v1.endpoints import races, standings
+
+    season = db.query(Season).filter(Season.year == year).first()
+    if not season:
+        return None
+
+    race_list = races.get_races.__wrapped__(
+        season=year, page=1, size=100, cursor=None, include_total=False, fields=None, db=db
+    ).data
+    race_ids = [race["id"] for race in race_list]
+    circuit_ids = {race["circuit_id"] for race in race_list}
+    circuits = (
+        db.query(Circuit).filter(Circuit.circuit_id.in_(circuit_ids)).order_by(Circuit.circuit_id).all()
+        if circuit_ids else []
+    )
+
+    return {
+        "schema_version": BUNDLE_SCHEMA_VERSION,
+        "season": {
+            "id": season.id,
+            "year": season.year,
+            "name": season.name,
+            "description": season.description,
+            "start_date": season.start_date,
+            "end_date": season.end_date,
+        },
+        "races": race_list,
+        "circuits": [CircuitResponse.model_validate(circuit) for circuit in circuits],
+        "results": _season_results(db, race_ids) if race_ids else {},
+        "podiums": {
+            race_id: races.get_race_podium.__wrapped__(race_id=race_id, db=db).data for race_id in race_ids
+        },
+        "driver_standings": standings.get_driver_standings.__wrapped__(
+            season_id=season.id, year=None, db=db
+        ).data,
+        "constructor_standings": standings.get_constructor_standings.__wrapped__(
+            season_id=season.id, year=None, db=db
+        ).data,
+    }
+
+
+def _encode(year: int, version: Optional[str], content: Dict[str, Any]) -> SeasonBundle:
+    """排序键后编码，内容相同的数据包得到相同的哈希"""
+    raw = orjson.dumps(jsonable_encoder(content), option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return SeasonBundle(
+        year=year,
+        version=version,
+        content_hash=hashlib.sha256(raw).hexdigest()[:32],
+        generated_at=time.time(),
+        body=gzip.compress(raw, compresslevel=9, mtime=0),
+    )
+
+
+def _load(year: int) -> Optional[SeasonBundle]:
+    try:
+        fields = get_redis_binary_client().hgetall(_redis_key(year))
+    except Exception as e:
+        logger.error(f"❌ 读取 {year} 赛季数据包失败: {e}")
+        return None
+    if not fields or b"body" not in fields:
+        return None
+    version = fields.get(b"version")
+    return SeasonBundle(
+        year=year,
+        version=version.decode() if version else None,
+        content_hash=fields[b"hash"].decode(),
+        generated_at=float(fields[b"generated_at"]),
+        body=fields[b"body"],
+    )
+
+
+def _save(bundle: SeasonBundle):
+    key = _redis_key(bundle.year)
+    try:
+        pipe = get_redis_binary_client().pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping={
+            "version": bundle.version or "",
+            "hash": bundle.content_hash,
+            "generated_at": str(bundle.generated_at),
+            "body": bundle.body,
+        })
+        pipe.expire(key, BUNDLE_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"❌ 写入 {bundle.year} 赛季数据包失败: {e}")
+
+
+class SeasonBundleStore:
+    """按赛季数据版本生成和缓存数据包：进程内存 -> Redis -> 重新生成"""
+
+    def __init__(self):
+        self._bundles: Dict[int, SeasonBundle] = {}
+        # 每个赛季一把生成锁，_locks_guard 只保护锁字典本身
+        self._locks: Dict[int, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, year: int) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(year, threading.Lock())
+
+    def get(self, db: Session, year: int) -> Optional[SeasonBundle]:
+        """获取当前数据版本的数据包，赛季不存在时返回 None"""
+        version = _current_version(year)
+        bundle = self._bundles.get(year)
+        if bundle is not None and self._fresh(bundle, version):
+            return bundle
+
+        with self._lock(year):
+            # 等待锁期间其他线程可能已经生成
+            bundle = self._bundles.get(year)
+            if bundle is None or not self._fresh(bundle, version):
+                bundle = _load(year)
+                if bundle is not None and self._fresh(bundle, version):
+                    self._bundles[year] = bundle
+                else:
+                    bundle = self._generate(db, year, version)
+            return bundle
+
+    def refresh(self, db: Session, year: int) -> Optional[SeasonBundle]:
+        """重新生成数据包并写入 Redis（同步后的缓存预热），与同一赛季的请求共用生成锁"""
+        with self._lock(year):
+            return self._generate(db, year, _current_version(year))
+
+    def _generate(self, db: Session, year: int, version: Optional[str]) -> Optional[SeasonBundle]:
+        """
+        生成数据包并写入 Redis，调用方持有该赛季的锁
+        版本需要在查询数据之前读取：生成期间有新的写入时，数据包记录的是旧版本，下一次请求会再次生成
+        """
+        start = time.perf_counter()
+        content = build_season_bundle(db, year)
+        if content is None:
+            self._bundles.pop(year, None)
+            return None
+        bundle = _encode(year, version, content)
+        if version is not None:
+            _save(bundle)
+        self._bundles[year] = bundle
+        logger.info(
+            f"📦 {year} 赛季数据包已生成: {len(bundle.body) / 1024:.1f} KB (gzip)，"
+            f"哈希 {bundle.content_hash[:12]}，耗时 {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        return bundle
+
+    @staticmethod
+    def _fresh(bundle: SeasonBundle, version: Optional[str]) -> bool:
+        if version is None:
+            # Redis 不可用时无法判断数据是否变化，按时间重新生成
+            return time.time() - bundle.generated_at < settings.season_bundle_max_age
+        return bundle.version == version
+
+
+season_bundles = SeasonBundleStore()
@@ -0,0 +1,97 @@
+"""
+积分榜读模型维护
+用一条 INSERT ... SELECT 重建赛季的车手积分榜读模型：
+关联车手、官方指定车队（driver_seasons，同一车手取最新一条）和积分榜中的车队，
+接口不再需要多次 joinedload 和在 Python 中合并车队
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import (
+    Constructor, Driver, DriverSeason, DriverStanding, DriverStandingRead, Season,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def driver_standings_read_select(season_id: Optional[int] = None):
+    """
+    读模型的数据来源查询（与原接口的车队覆盖规则一致）
+    原接口把赛季的 driver_seasons 按查询返回的顺序放入字典，同一车手有多条时后出现的覆盖前面的；
+    该查询没有 ORDER BY，顺序由 PostgreSQL 的扫描方式决定，无法在 SQL 中复现，
+    这里固定取 ID 最大（最后插入）的一条。唯一的写入方 correct_driver_teams_2025 对同一车手和赛季
+    只更新已有记录，正常数据中每个车手每个赛季只有一条，两种规则结果相同
+    """
+    # 每个车手每个赛季的官方指定车队（多条时取 ID 最大的一条）
+    latest_override = (
+        select(func.max(DriverSeason.id).label("id"))
+        .group_by(DriverSeason.driver_id, DriverSeason.season_id)
+    )
+    if season_id is not None:
+        latest_override = latest_override.where(DriverSeason.season_id == season_id)
+    latest_override = latest_override.subquery()
+
+    override = (
+        select(DriverSeason.driver_id, DriverSeason.season_id, DriverSeason.constructor_id)
+        .join(latest_override, latest_override.c.id == DriverSeason.id)
+        .subquery()
+    )
+    constructor_id = func.coalesce(override.c.constructor_id, DriverStanding.constructor_id)
+
+    query = (
+        select(
+            DriverStanding.season_id,
+            Season.year,
+            DriverStanding.driver_id,
+            Constructor.constructor_id,
+            DriverStanding.position,
+            DriverStanding.points,
+            DriverStanding.wins,
+            func.concat(Driver.forename, " ", Driver.surname),
+            Driver.nationality,
+            Constructor.name,
+        )
+        .join(Season, Season.id == DriverStanding.season_id)
+        .join(Driver, Driver.driver_id == DriverStanding.driver_id)
+        .outerjoin(
+            override,
+            (override.c.driver_id == DriverStanding.driver_id)
+            & (override.c.season_id == DriverStanding.season_id),
+        )
+        .join(Constructor, Constructor.constructor_id == constructor_id)
+    )
+    if season_id is not None:
+        query = query.where(DriverStanding.season_id == season_id)
+    return query
+
+
+def refresh_driver_standings_read(db: Session, season_id: Optional[int] = None) -> int:
+    """
+    重建车手积分榜读模型（不提交，由调用方与积分榜写入放在同一事务中）
+
+    Args:
+        db: 数据库会话
+        season_id: 只重建该赛季，None 表示全部赛季
+
+    Returns:
+        int: 写入的行数
+    """
+    clear = delete(DriverStandingRead)
+    if season_id is not None:
+        clear = clear.where(DriverStandingRead.season_id == season_id)
+    db.execute(clear)
+
+    columns = [
+        "season_id", "season_year", "driver_id", "constructor_id",
+        "position", "points", "wins", "driver_name", "nationality", "constructor_name",
+    ]
+    result = db.execute(
+        insert(DriverStandingRead).from_select(columns, driver_standings_read_select(season_id))
+    )
+    scope = f"赛季 {season_id}" if season_id is not None else "全部赛季"
+    logger.info(f"📖 车手积分榜读模型已重建 ({scope}): {result.rowcount} 行")
+    return result.rowcount
@@ -0,0 +1,324 @@
+"""
+同步过程的实体身份映射
+在一次同步运行内缓存车手、车队、赛道和赛季的主键，
+每张表只预加载一次，缺失的实体按批次创建
+"""
+
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from ..models import Season, Circuit, Constructor, Driver
+
+logger = logging.getLogger(__name__)
+
+
+def _clean(value: Any) -> Any:
+    """将 pandas 缺失值转换为 None，numpy 标量转换为 Python 原生类型"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return value
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _safe_int(value: Any) -> Optional[int]:
+    value = _clean(value)
+    try:
+        return int(value) if value is not None else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _safe_date(value: Any):
+    value = _clean(value)
+    if value is None:
+        return None
+    try:
+        return pd.to_datetime(value).date()
+    except (ValueError, TypeError):
+        return None
+
+
+def constructor_id_from_row(row: pd.Series) -> Optional[str]:
+    """
+    从结果行中取车队ID
+    积分榜数据使用 constructorIds 列表，取第一个车队
+    """
+    constructor_id = row.get('constructorId')
+    if constructor_id is None or (not isinstance(constructor_id, list) and pd.isna(constructor_id)):
+        constructor_id = row.get('constructorIds')
+
+    if isinstance(constructor_id, (list, tuple)):
+        constructor_id = constructor_id[0] if len(constructor_id) > 0 else None
+
+    constructor_id = _clean(constructor_id)
+    return str(constructor_id) if constructor_id else None
+
+
+def _first(value: Any) -> Any:
+    """积分榜中车队相关字段为列表，取第一个元素"""
+    if isinstance(value, (list, tuple)):
+        return value[0] if len(value) > 0 else None
+    return _clean(value)
+
+
+def _driver_values(row: pd.Series) -> Dict[str, Any]:
+    """车手资料（上游缺失的字段为 None）"""
+    return {
+        'number': _safe_int(row.get('driverNumber')),
+        'code': _clean(row.get('driverCode')),
+        'driver_url': _clean(row.get('driverUrl')),
+        'forename': _clean(row.get('givenName')),
+        'surname': _clean(row.get('familyName')),
+        'date_of_birth': _safe_date(row.get('dateOfBirth')),
+        'nationality': _clean(row.get('driverNationality')),
+    }
+
+
+def _constructor_values(row: pd.Series) -> Dict[str, Any]:
+    """车队资料（上游缺失的字段为 None，积分榜数据取第一个车队）"""
+    return {
+        'constructor_url': _first(row.get('constructorUrl', row.get('constructorUrls'))),
+        'name': _first(row.get('constructorName', row.get('constructorNames'))),
+        'nationality': _first(row.get('constructorNationality', row.get('constructorNationalities'))),
+    }
+
+
+class SyncIdentityMap:
+    """同步运行内的实体身份映射"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.driver_ids: Set[str] = set()
+        self.constructor_ids: Set[str] = set()
+        self.circuit_ids: Set[str] = set()
+        self.circuits_by_location: Dict[Tuple[str, str], str] = {}
+        self.season_ids: Dict[int, int] = {}
+        # 尚未通知下游（更新参考数据版本）的新建车手/车队数量
+        self.created = 0
+        self._loaded = False
+
+    def load(self, force: bool = False) -> "SyncIdentityMap":
+        """预加载所有实体主键，每张表一次查询"""
+        if self._loaded and not force:
+            return self
+
+        self.driver_ids = {driver_id for (driver_id,) in self.db.query(Driver.driver_id)}
+        self.constructor_ids = {
+            constructor_id for (constructor_id,) in self.db.query(Constructor.constructor_id)
+        }
+
+        self.circuit_ids = set()
+        self.circuits_by_location = {}
+        for circuit_id, locality, country in self.db.query(
+            Circuit.circuit_id, Circuit.locality, Circuit.country
+        ):
+            self.circuit_ids.add(circuit_id)
+            if locality and country:
+                self.circuits_by_location[(locality, country)] = circuit_id
+
+        self.season_ids = {year: season_id for season_id, year in self.db.query(Season.id, Season.year)}
+
+        self._loaded = True
+        logger.info(
+            f"🗂️ 身份映射已加载: 车手 {len(self.driver_ids)}, 车队 {len(self.constructor_ids)}, "
+            f"赛道 {len(self.circuit_ids)}, 赛季 {len(self.season_ids)}"
+        )
+        return self
+
+    def reset(self):
+        """
+        丢弃已加载的主键（事务回滚后调用）
+        新建实体只 flush 不提交，回滚后映射中可能有不存在的主键，下次使用时重新加载
+        """
+        self._loaded = False
+        self.created = 0
+
+    def take_created(self) -> int:
+        """取出并清零新建实体的数量，提交后据此决定是否更新参考数据版本"""
+        created, self.created = self.created, 0
+        return created
+
+    # ====== 查询 ======
+
+    def season_id(self, year: int) -> Optional[int]:
+        return self.load().season_ids.get(year)
+
+    def has_driver(self, driver_id: Optional[str]) -> bool:
+        return bool(driver_id) and driver_id in self.load().driver_ids
+
+    def has_constructor(self, constructor_id: Optional[str]) -> bool:
+        return bool(constructor_id) and constructor_id in self.load().constructor_ids
+
+    def has_circuit(self, circuit_id: Optional[str]) -> bool:
+        return bool(circuit_id) and circuit_id in self.load().circuit_ids
+
+    def find_circuit_id(self, locality: str, country: str) -> Optional[str]:
+        """通过城市和国家查找赛道ID"""
+        return self.load().circuits_by_location.get((locality, country))
+
+    # ====== 注册（由调用方创建实体后登记） ======
+
+    def register_driver(self, driver_id: str):
+        self.driver_ids.add(driver_id)
+
+    def register_constructor(self, constructor_id: str):
+        self.constructor_ids.add(constructor_id)
+
+    def register_circuit(self, circuit_id: str, locality: Optional[str] = None, country: Optional[str] = None):
+        self.circuit_ids.add(circuit_id)
+        if locality and country:
+            self.circuits_by_location[(locality, country)] = circuit_id
+
+    def register_season(self, year: int, season_id: int):
+        self.season_ids[year] = season_id
+
+    # ====== 批量创建缺失实体 ======
+
+    def ensure_drivers(self, df: pd.DataFrame) -> int:
+        """
+        批量创建 DataFrame 中缺失的车手
+        只 flush 不提交，由调用方的同步方法与业务数据在同一事务内提交
+
+        Returns:
+            int: 新建的车手数量
+        """
+        self.load()
+        if df is None or df.empty or 'driverId' not in df.columns:
+            return 0
+
+        missing = df[~df['driverId'].isin(self.driver_ids) & df['driverId'].notna()]
+        missing = missing.drop_duplicates(subset='driverId')
+        if missing.empty:
+            return 0
+
+        drivers = []
+        for _, row in missing.iterrows():
+            values = _driver_values(row)
+            drivers.append(Driver(
+                driver_id=str(row['driverId']),
+                number=values['number'],
+                code=values['code'],
+                driver_url=values['driver_url'] or '',
+                forename=values['forename'] or '',
+                surname=values['surname'] or '',
+                date_of_birth=values['date_of_birth'],
+                nationality=values['nationality'] or ''
+            ))
+        self.db.add_all(drivers)
+        self.db.flush()
+
+        self.created += len(drivers)
+        for driver in missing['driverId']:
+            self.register_driver(str(driver))
+        logger.info(f"✅ 批量创建车手 {len(drivers)} 名: {list(missing['driverId'])}")
+        return len(drivers)
+
+    def ensure_constructors(self, df: pd.DataFrame, season_id: Optional[int]) -> int:
+        """
+        批量创建 DataFrame 中缺失的车队，关联到正在同步的赛季 season_id
+        只 flush 不提交，由调用方的同步方法与业务数据在同一事务内提交
+
+        Returns:
+            int: 新建的车队数量
+        """
+        self.load()
+        if df is None or df.empty:
+            return 0
+        if 'constructorId' not in df.columns and 'constructorIds' not in df.columns:
+            return 0
+
+        new_rows: Dict[str, pd.Series] = {}
+        for _, row in df.iterrows():
+            constructor_id = constructor_id_from_row(row)
+            if constructor_id and constructor_id not in self.constructor_ids and constructor_id not in new_rows:
+                new_rows[constructor_id] = row
+
+        if not new_rows:
+            return 0
+
+        if not season_id:
+            logger.error(f"没有正在同步的赛季，无法创建车队: {list(new_rows)}")
+            return 0
+
+        constructors = []
+        for constructor_id, row in new_rows.items():
+            values = _constructor_values(row)
+            constructors.append(Constructor(
+                constructor_id=constructor_id,
+                constructor_url=values['constructor_url'] or '',
+                name=values['name'] or constructor_id,
+                nationality=values['nationality'] or '',
+                season_id=season_id
+            ))
+        self.db.add_all(constructors)
+        self.db.flush()
+
+        self.created += len(constructors)
+        for constructor_id in new_rows:
+            self.register_constructor(constructor_id)
+        logger.info(f"✅ 批量创建车队 {len(constructors)} 支: {list(new_rows)}")
+        return len(constructors)
+
+    # ====== 更新已有实体的资料 ======
+
+    def update_drivers(self, df: pd.DataFrame) -> Set[str]:
+        """
+        用上游数据更新已有车手的资料（姓名、国籍等），上游缺失的字段保持不变
+        只 flush 不提交
+
+        Returns:
+            Set[str]: 资料有变化的车手ID
+        """
+        if df is None or df.empty or 'driverId' not in df.columns:
+            return set()
+        rows = {
+            str(row['driverId']): _driver_values(row)
+            for _, row in df[df['driverId'].notna()].iterrows()
+        }
+        return self._update_existing(Driver, Driver.driver_id, rows)
+
+    def update_constructors(self, df: pd.DataFrame) -> Set[str]:
+        """
+        用上游数据更新已有车队的资料（名称、国籍等），上游缺失的字段保持不变
+        只 flush 不提交
+
+        Returns:
+            Set[str]: 资料有变化的车队ID
+        """
+        if df is None or df.empty:
+            return set()
+        rows = {}
+        for _, row in df.iterrows():
+            constructor_id = constructor_id_from_row(row)
+            if constructor_id:
+                rows[constructor_id] = _constructor_values(row)
+        return self._update_existing(Constructor, Constructor.constructor_id, rows)
+
+    def _update_existing(self, model, key, rows: Dict[str, Dict[str, Any]]) -> Set[str]:
+        """按主键加载已有实体，只改写与上游不同的字段"""
+        changed: Set[str] = set()
+        if not rows:
+            return changed
+        for entity in self.db.query(model).filter(key.in_(list(rows))):
+            entity_id = getattr(entity, key.key)
+            for name, value in rows[entity_id].items():
+                if value not in (None, '') and getattr(entity, name) != value:
+                    setattr(entity, name, value)
+                    changed.add(entity_id)
+        if changed:
+            self.db.flush()
+            logger.info(f"✏️ 更新{model.__tablename__}资料 {len(changed)} 条: {sorted(changed)}")
+        return changed
+
+    def ensure_entities(self, df: pd.DataFrame, season_id: Optional[int]) -> Dict[str, int]:
+        """为结果/积分榜 DataFrame 批量补齐车手和车队（新车队关联到 season_id）"""
+        return {
+            "drivers": self.ensure_drivers(df),
+            "constructors": self.ensure_constructors(df, season_id),
+        }
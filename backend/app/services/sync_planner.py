@@ -0,0 +1,298 @@
+"""
+同步计划（dry-run）
+只读取数据库和本地响应缓存清单，不发起任何上游请求，估算一次同步：
+- 哪些赛季/轮次/表需要写入
+- 预计请求多少页 Ergast 数据
+- 在当前限流预算下大约需要多长时间
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.rate_limit import get_ergast_limiter
+from ..models import (
+    Season, Circuit, Driver, Race, Result, QualifyingResult, SprintResult,
+    DriverStandingSnapshot, ConstructorStandingSnapshot,
+)
+from .ergast_response_cache import ErgastResponseCache, CacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Ergast 每页默认返回 30 条结果
+ERGAST_PAGE_SIZE = 30
+
+# 数据库中没有可参考的数据时使用的估计值
+DEFAULT_DRIVERS_PER_RACE = 20
+DEFAULT_CONSTRUCTORS = 10
+DEFAULT_CIRCUITS = 80
+
+# 单次请求的平均耗时（不含限流等待）
+AVERAGE_REQUEST_SECONDS = 0.5
+
+# 结果类阶段：(阶段名, Ergast 接口, 模型, 是否只包含冲刺赛)
+RESULT_STAGES = (
+    ("race_results", "get_race_results", Result, False),
+    ("qualifying_results", "get_qualifying_results", QualifyingResult, False),
+    ("sprint_results", "get_sprint_results", SprintResult, True),
+)
+
+# 积分榜阶段：(阶段名, Ergast 接口, 快照模型)
+STANDING_STAGES = (
+    ("driver_standings", "get_driver_standings", DriverStandingSnapshot),
+    ("constructor_standings", "get_constructor_standings", ConstructorStandingSnapshot),
+)
+
+
+@dataclass
+class PlannedStage:
+    """一个赛季中一类数据的同步计划"""
+    season: Optional[int]
+    stage: str
+    endpoint: str
+    pages: int
+    expected_rows: int
+    write: bool
+    reason: str
+    rounds: List[int] = field(default_factory=list)  # 需要写入的轮次
+    ergast: bool = True  # 是否消耗 Ergast 配额
+
+    @property
+    def expected_writes(self) -> int:
+        return self.expected_rows if self.write else 0
+
+
+@dataclass
+class SyncPlan:
+    """一次同步的完整计划"""
+    seasons: List[int]
+    stages: List[PlannedStage]
+    workers: int
+    budget: Dict[str, float]
+    estimated_seconds: float
+    created_at: str
+
+    @property
+    def api_pages(self) -> int:
+        return sum(stage.pages for stage in self.stages if stage.ergast)
+
+    @property
+    def expected_writes(self) -> int:
+        return sum(stage.expected_writes for stage in self.stages)
+
+    @property
+    def stale_stages(self) -> List[PlannedStage]:
+        return [stage for stage in self.stages if stage.write]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式用于 JSON 输出"""
+        return {
+            "seasons": self.seasons,
+            "workers": self.workers,
+            "api_pages": self.api_pages,
+            "expected_writes": self.expected_writes,
+            "budget": {name: round(tokens, 1) for name, tokens in self.budget.items()},
+            "estimated_seconds": round(self.estimated_seconds, 1),
+            "created_at": self.created_at,
+            "stages": [asdict(stage) for stage in self.stages],
+        }
+
+    def format(self) -> str:
+        """人类可读的计划摘要"""
+        lines = [f"📋 同步计划: 赛季 {self.seasons}"]
+        for stage in self.stages:
+            scope = f"{stage.season} " if stage.season else ""
+            mark = "✏️ " if stage.write else "✅"
+            rounds = f" 轮次 {stage.rounds}" if stage.rounds else ""
+            lines.append(
+                f"  {mark} {scope}{stage.stage}: {stage.pages} 页, "
+                f"预计写入 {stage.expected_writes} 行{rounds} - {stage.reason}"
+            )
+        budget = ", ".join(f"{name} {tokens:.0f}" for name, tokens in self.budget.items())
+        lines.append(
+            f"📊 共 {self.api_pages} 页 Ergast 请求，预计写入 {self.expected_writes} 行，"
+            f"需要写入的阶段 {len(self.stale_stages)}/{len(self.stages)}"
+        )
+        lines.append(
+            f"⏱️ 当前可用配额: {budget}；预计耗时约 {self.estimated_seconds:.0f} 秒"
+            f"（{self.workers} 个获取线程）"
+        )
+        return "\n".join(lines)
+
+
+def _pages(rows: int) -> int:
+    return max(1, math.ceil(rows / ERGAST_PAGE_SIZE))
+
+
+def _fetched_before(entry: CacheEntry, day: Optional[date]) -> bool:
+    """响应是否在该日期（比赛日）结束前获取"""
+    if day is None:
+        return False
+    fetched_at = datetime.fromisoformat(entry.fetched_at)
+    return fetched_at.date() <= day
+
+
+class SyncPlanner:
+    """根据数据库和响应缓存清单生成同步计划"""
+
+    def __init__(
+        self,
+        db: Session,
+        response_cache: Optional[ErgastResponseCache] = None,
+        today: Optional[date] = None,
+    ):
+        self.db = db
+        self.response_cache = response_cache or ErgastResponseCache()
+        self.today = today or datetime.now(timezone.utc).date()
+
+    def plan(self, target_seasons: Sequence[int], workers: Optional[int] = None) -> SyncPlan:
+        """生成与 sync_all_data 相同范围的同步计划"""
+        workers = workers or settings.sync_pipeline_workers
+        stages = self._static_stages()
+        for season_year in target_seasons:
+            stages.extend(self._season_stages(season_year))
+
+        limiter = get_ergast_limiter()
+        budget = limiter.peek()
+        pages = sum(stage.pages for stage in stages if stage.ergast)
+
+        plan = SyncPlan(
+            seasons=list(target_seasons),
+            stages=stages,
+            workers=workers,
+            budget=budget,
+            estimated_seconds=self.estimate_seconds(pages, budget, limiter.buckets, workers),
+            created_at=datetime.now(timezone.utc).isoformat(),
+        )
+        logger.info(f"📋 同步计划已生成: {plan.api_pages} 页请求，预计 {plan.estimated_seconds:.0f} 秒")
+        return plan
+
+    @staticmethod
+    def estimate_seconds(pages: int, budget: Dict[str, float], buckets, workers: int) -> float:
+        """
+        估算耗时：取限流等待时间和请求本身耗时中的较大值
+        每个桶在用完当前可用令牌后按补充速率放行
+        """
+        wait = 0.0
+        for bucket in buckets:
+            deficit = pages - budget.get(bucket.name, bucket.capacity)
+            if deficit > 0:
+                wait = max(wait, deficit / bucket.refill_per_second)
+        latency = pages * AVERAGE_REQUEST_SECONDS / max(1, workers)
+        return max(wait, latency)
+
+    def _static_stages(self) -> List[PlannedStage]:
+        """赛季、赛道、车队、车手等基础数据（每次同步都会请求）"""
+        circuits = self.db.query(func.count(Circuit.circuit_id)).scalar() or DEFAULT_CIRCUITS
+        drivers = self.db.query(func.count(Driver.driver_id)).scalar() or DEFAULT_DRIVERS_PER_RACE
+        return [
+            PlannedStage(None, "circuits", "get_circuits", _pages(circuits), circuits, True, "每次同步更新"),
+            PlannedStage(None, "constructors", "get_constructor_info", 1, DEFAULT_CONSTRUCTORS, True, "每次同步更新"),
+            PlannedStage(None, "drivers", "get_driver_info", _pages(drivers), drivers, True, "每次同步更新"),
+        ]
+
+    def _season_stages(self, season_year: int) -> List[PlannedStage]:
+        season = self.db.query(Season).filter(Season.year == season_year).first()
+        races: List[Race] = []
+        if season:
+            races = self.db.query(Race).filter(Race.season_id == season.id).order_by(Race.round_number).all()
+
+        # 赛程由 FastF1 获取（失败时才请求 Ergast）
+        stages = [PlannedStage(
+            season_year, "races", "get_event_schedule", 1, len(races) or 24,
+            write=not races, reason="数据库中没有赛程" if not races else "赛程已存在，只更新变化字段",
+            ergast=False,
+        )]
+
+        completed = [r for r in races if r.event_date and r.event_date < self.today]
+        drivers_per_race = self._drivers_per_race(season)
+        last_race_day = completed[-1].event_date if completed else None
+
+        for stage, endpoint, model, sprint_only in RESULT_STAGES:
+            expected = [r for r in completed if r.is_sprint] if sprint_only else completed
+            expected_rounds = [r.round_number for r in expected]
+            present = self._result_rounds(model, season) if season else set()
+            missing = [r for r in expected_rounds if r not in present]
+
+            entry = self.response_cache.get_entry(endpoint, season_year)
+            write, reason, rounds = self._staleness(entry, missing, expected_rounds, last_race_day)
+            rows = len(expected) * drivers_per_race
+            stages.append(PlannedStage(
+                season_year, stage, endpoint, _pages(rows),
+                len(rounds) * drivers_per_race if write else 0,
+                write, reason, rounds,
+            ))
+
+        for stage, endpoint, model in STANDING_STAGES:
+            present = self._snapshot_rounds(model, season) if season else set()
+            latest = [completed[-1].round_number] if completed else []
+            missing = [r for r in latest if r not in present]
+
+            entry = self.response_cache.get_entry(endpoint, season_year)
+            write, reason, rounds = self._staleness(entry, missing, latest, last_race_day)
+            rows = drivers_per_race if stage == "driver_standings" else DEFAULT_CONSTRUCTORS
+            stages.append(PlannedStage(
+                season_year, stage, endpoint, _pages(rows),
+                rows if write else 0, write, reason, rounds,
+            ))
+
+        return stages
+
+    def _staleness(
+        self,
+        entry: Optional[CacheEntry],
+        missing: List[int],
+        expected_rounds: List[int],
+        last_race_day: Optional[date],
+    ):
+        """
+        判断一类数据是否需要写入
+
+        Returns:
+            (是否写入, 原因, 需要写入的轮次)
+        """
+        if not expected_rounds:
+            return False, "还没有已完成的轮次", []
+        if missing:
+            return True, f"数据库缺少 {len(missing)} 个轮次", missing
+        if entry is None:
+            return True, "本地响应缓存中没有记录，内容未知", expected_rounds[-1:]
+        if not entry.is_applied:
+            return True, "缓存的最新响应尚未写入数据库", expected_rounds[-1:]
+        if _fetched_before(entry, last_race_day):
+            # 最近一场比赛当天或之前获取的数据可能还会修正
+            return True, f"上次获取于 {entry.fetched_at[:10]}，早于最近一场比赛结束", expected_rounds[-1:]
+        return False, f"已是最新（上次获取于 {entry.fetched_at[:10]}，内容未变化时跳过写入）", []
+
+    def _drivers_per_race(self, season: Optional[Season]) -> int:
+        """每场比赛的参赛车手数（取该赛季已有结果的最大值）"""
+        if season is None:
+            return DEFAULT_DRIVERS_PER_RACE
+        counts = (
+            self.db.query(func.count(Result.id))
+            .join(Race, Race.id == Result.race_id)
+            .filter(Race.season_id == season.id)
+            .group_by(Result.race_id)
+            .all()
+        )
+        return max((c[0] for c in counts), default=DEFAULT_DRIVERS_PER_RACE)
+
+    def _result_rounds(self, model, season: Season) -> Set[int]:
+        rows = (
+            self.db.query(Race.round_number)
+            .join(model, model.race_id == Race.id)
+            .filter(Race.season_id == season.id)
+            .distinct()
+            .all()
+        )
+        return {row.round_number for row in rows}
+
+    def _snapshot_rounds(self, model, season: Season) -> Set[int]:
+        rows = self.db.query(model.round_number).filter(model.season_id == season.id).distinct().all()
+        return {row.round_number for row in rows}
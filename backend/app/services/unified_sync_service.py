@@ -4,19 +4,40 @@
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
 import pandas as pd
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from fastf1.ergast import Ergast
 import fastf1
 
+from ..core.cache import invalidate_cache_tags, season_tag, driver_tag, constructor_tag, race_tag
+from ..core.data_version import bump_data_version
+from ..core.config import settings
+from ..core.rate_limit import get_ergast_limiter
 from ..models import (
     Season, Circuit, Constructor, Driver, DriverSeason,
     Race, Result, QualifyingResult, SprintResult,
-    DriverStanding, ConstructorStanding
+    DriverStanding, ConstructorStanding,
+    DriverStandingSnapshot, ConstructorStandingSnapshot,
+)
+from .bulk_upsert import (
+    bulk_upsert, diff_upsert, UpsertStats, ChangeSet,
+    SEASON_DRIVER_KEY_COLUMNS, SEASON_CONSTRUCTOR_KEY_COLUMNS,
+    SNAPSHOT_DRIVER_KEY_COLUMNS, SNAPSHOT_CONSTRUCTOR_KEY_COLUMNS,
+)
+from .ergast_response_cache import ErgastResponseCache, enable_fastf1_cache
+from .sync_identity_map import SyncIdentityMap
+from .sync_planner import SyncPlanner, SyncPlan
+from .standings_read_model import refresh_driver_standings_read
+from .result_transformer import (
+    PreparedFrame, ColumnSpec, prepare, to_int,
+    RESULT_COLUMNS, QUALIFYING_RESULT_COLUMNS, SPRINT_RESULT_COLUMNS,
+    DRIVER_STANDING_COLUMNS, CONSTRUCTOR_STANDING_COLUMNS,
 )
 
 logger = logging.getLogger(__name__)
@@ -24,6 +45,31 @@ logger = logging.getLogger(__name__)
 # 目标赛季
 TARGET_SEASONS = [2023, 2024, 2025]
 
+# 流水线模式中每个赛季的同步阶段，写入按此顺序进行（比赛日程必须先于结果）
+PIPELINE_STAGES = (
+    "races",
+    "race_results",
+    "qualifying_results",
+    "sprint_results",
+    "driver_standings",
+    "constructor_standings",
+)
+
+# 各阶段对应的 Ergast 接口和列映射
+PIPELINE_FETCHERS = {
+    "race_results": ("get_race_results", RESULT_COLUMNS),
+    "qualifying_results": ("get_qualifying_results", QUALIFYING_RESULT_COLUMNS),
+    "sprint_results": ("get_sprint_results", SPRINT_RESULT_COLUMNS),
+    "driver_standings": ("get_driver_standings", DRIVER_STANDING_COLUMNS),
+    "constructor_standings": ("get_constructor_standings", CONSTRUCTOR_STANDING_COLUMNS),
+}
+
+# 变更集合的键列对应的缓存标签
+CACHE_TAGS_BY_KEY_COLUMN = {
+    "driver_id": driver_tag,
+    "constructor_id": constructor_tag,
+}
+
 
 class UnifiedSyncService:
     """统一数据同步服务"""
@@ -32,32 +78,32 @@ class UnifiedSyncService:
         self.db = db
         self.ergast = Ergast()
         
-        # 设置FastF1缓存
-        if cache_dir:
-            fastf1.Cache.enable_cache(cache_dir)
-            logger.info(f"启用 FastF1 缓存目录: {cache_dir}")
-        
-        # 频率限制配置
-        self.delays = {
-            'basic': 0.5,      # 基础数据延迟
-            'results': 1.0,    # 比赛结果延迟
-            'standings': 1.5,  # 积分榜延迟
-            'session': 2.0     # 会话数据延迟
-        }
+        # 设置FastF1缓存，未指定时使用配置中的统一目录
+        self.cache_dir = enable_fastf1_cache(cache_dir)
+        
+        # 分页合并后的响应缓存，内容未变化时跳过数据库写入
+        self.response_cache = ErgastResponseCache(str(self.cache_dir))
+        self.skip_unchanged = True
+        
+        # 所有进程共享的 Ergast 令牌桶，预算充足时请求不等待
+        self.rate_limiter = get_ergast_limiter()
+        
+        # 最近一次批量写入的统计，按表名索引
+        self.upsert_stats: Dict[str, UpsertStats] = {}
+        # 本次运行各表的变更键（如积分榜的 (season_id, driver_id)），供下游缓存失效使用
+        self.change_sets: Dict[str, ChangeSet] = {}
+        
+        # 本次同步运行的实体身份映射（首次使用时加载）
+        self.identity_map = SyncIdentityMap(db)
         
         logger.info("🚀 初始化统一数据同步服务")
     
-    def _smart_delay(self, data_type: str = 'basic'):
-        """智能延迟"""
-        delay = self.delays.get(data_type, 1.0)
-        time.sleep(delay)
-    
     def _handle_api_call(self, func, *args, max_retries=3, **kwargs):
         """处理API调用的通用方法，支持分页获取完整数据并添加轮次信息"""
         for attempt in range(max_retries):
             try:
+                self.rate_limiter.acquire()
                 result = func(*args, **kwargs)
-                self._smart_delay('basic')
                 
                 # 区分并处理 SimpleResponse 和 MultiResponse 的分页
                 if hasattr(result, 'get_next_result_page'):
@@ -95,6 +141,7 @@ class UnifiedSyncService:
                             if hasattr(current_response, 'is_complete') and current_response.is_complete:
                                 logger.info("✅ API响应已包含所有结果，无需翻页")
                                 break
+                            self.rate_limiter.acquire()
                             current_response = current_response.get_next_result_page()
                             page_num += 1
                         except ValueError:
@@ -103,7 +150,9 @@ class UnifiedSyncService:
                     
                     # 如果有多个 DataFrame，合并它们
                     if all_dataframes:
-                        return pd.concat(all_dataframes, ignore_index=True)
+                        merged_df = pd.concat(all_dataframes, ignore_index=True)
+                        merged_df.attrs['pages'] = page_num
+                        return merged_df
                     else:
                         return pd.DataFrame()
                 
@@ -132,10 +181,8 @@ class UnifiedSyncService:
         seasons = []
         for year in TARGET_SEASONS:
             # 检查是否已存在
-            existing = self.db.query(Season).filter(Season.year == year).first()
-            if existing:
+            if self.identity_map.season_id(year):
                 logger.info(f"✅ 赛季 {year} 已存在，跳过")
-                seasons.append(existing)
                 continue
             
             # 创建新赛季
@@ -144,9 +191,7 @@ class UnifiedSyncService:
                 name=f"{year} Formula 1 World Championship",
                 description=f"第{year}赛季F1世界锦标赛",
                 start_date=datetime(year, 3, 1).date(),
-                end_date=datetime(year, 11, 30).date(),
-                is_current=(year == 2025),
-                is_active=True
+                end_date=datetime(year, 11, 30).date()
             )
             
             self.db.add(season)
@@ -154,6 +199,12 @@ class UnifiedSyncService:
             logger.info(f"✅ 创建赛季 {year}")
         
         self.db.commit()
+        for season in seasons:
+            self.identity_map.register_season(season.year, season.id)
+        # 新赛季只影响自身的版本
+        bump_data_version(*(season.year for season in seasons))
+        
+        seasons = self.db.query(Season).filter(Season.year.in_(TARGET_SEASONS)).all()
         logger.info(f"✅ 赛季数据同步完成，共 {len(seasons)} 个赛季")
         return seasons
     
@@ -171,14 +222,8 @@ class UnifiedSyncService:
             
             circuits = []
             for _, row in circuits_df.iterrows():
-                # 检查是否已存在
-                existing = self.db.query(Circuit).filter(
-                    Circuit.circuit_id == row['circuitId']
-                ).first()
-                
-                if existing:
-                    # 更新已有赛道的 is_active 状态，但不在这里设为 True
-                    circuits.append(existing)
+                # 检查是否已存在（已有赛道的 is_active 状态不在这里修改）
+                if self.identity_map.has_circuit(row['circuitId']):
                     continue
                 
                 # 创建新赛道，is_active 默认为 False
@@ -195,15 +240,18 @@ class UnifiedSyncService:
                 
                 self.db.add(circuit)
                 circuits.append(circuit)
+                self.identity_map.register_circuit(row['circuitId'], row['locality'], row['country'])
                 logger.info(f"✅ 创建新赛道: {row['circuitName']}")
             
             self.db.commit()
-            logger.info(f"✅ 赛道数据同步完成，共处理 {len(circuits)} 个赛道")
+            if circuits:
+                bump_data_version(reference=True)
+            logger.info(f"✅ 赛道数据同步完成，共处理 {len(circuits_df)} 个赛道，新建 {len(circuits)} 个")
             return circuits
             
         except Exception as e:
             logger.error(f"❌ 赛道数据同步失败: {e}")
-            self.db.rollback()
+            self._rollback()
             raise
     
     def sync_constructors(self) -> List[Constructor]:
@@ -219,42 +267,51 @@ class UnifiedSyncService:
                 return []
             
             # 获取2025赛季
-            season_2025 = self.db.query(Season).filter(Season.year == 2025).first()
-            if not season_2025:
+            season_2025_id = self.identity_map.season_id(2025)
+            if not season_2025_id:
                 raise ValueError("2025赛季不存在，请先同步赛季数据")
             
+            # 已有车队只更新变化的资料
+            changed = self.identity_map.update_constructors(constructors_df)
+            
             constructors = []
             for _, row in constructors_df.iterrows():
                 # 检查是否已存在
-                existing = self.db.query(Constructor).filter(
-                    Constructor.constructor_id == row['constructorId']
-                ).first()
-                
-                if existing:
-                    logger.info(f"✅ 车队 {row['constructorName']} 已存在，跳过")
-                    constructors.append(existing)
+                if self.identity_map.has_constructor(row['constructorId']):
                     continue
                 
                 # 创建新车队
                 constructor = Constructor(
                     constructor_id=row['constructorId'],
                     constructor_url=row['constructorUrl'],
-                    constructor_name=row['constructorName'],
-                    constructor_nationality=row['constructorNationality'],
-                    season_id=season_2025.id
+                    name=row['constructorName'],
+                    nationality=row['constructorNationality'],
+                    season_id=season_2025_id
                 )
                 
                 self.db.add(constructor)
                 constructors.append(constructor)
+                self.identity_map.register_constructor(row['constructorId'])
                 logger.info(f"✅ 创建车队 {row['constructorName']}")
             
+            # 读模型中的车队名称与资料更新在同一事务内重建
+            season_years = self._refresh_standings_read(constructor_ids=changed)
             self.db.commit()
-            logger.info(f"✅ 车队数据同步完成，共 {len(constructors)} 个车队")
+            if changed:
+                invalidate_cache_tags(
+                    *(constructor_tag(c) for c in changed), *(season_tag(year) for year in season_years)
+                )
+            if constructors or changed:
+                bump_data_version(*season_years, reference=True)
+            logger.info(
+                f"✅ 车队数据同步完成，共 {len(constructors_df)} 个车队，"
+                f"新建 {len(constructors)} 个，更新 {len(changed)} 个"
+            )
             return constructors
             
         except Exception as e:
             logger.error(f"❌ 车队数据同步失败: {e}")
-            self.db.rollback()
+            self._rollback()
             raise
     
     def sync_drivers(self) -> List[Driver]:
@@ -269,53 +326,95 @@ class UnifiedSyncService:
                 logger.warning("没有获取到车手数据")
                 return []
             
-            drivers = []
-            for _, row in drivers_df.iterrows():
-                # 检查是否已存在
-                existing = self.db.query(Driver).filter(
-                    Driver.driver_id == row['driverId']
-                ).first()
-                
-                if existing:
-                    logger.info(f"✅ 车手 {row['givenName']} {row['familyName']} 已存在，跳过")
-                    drivers.append(existing)
-                    continue
-                
-                # 处理出生日期
-                date_of_birth = None
-                if pd.notna(row['dateOfBirth']):
-                    try:
-                        date_of_birth = pd.to_datetime(row['dateOfBirth']).date()
-                    except:
-                        logger.warning(f"⚠️  无法解析车手 {row['givenName']} {row['familyName']} 的出生日期: {row['dateOfBirth']}")
-                
-                # 创建新车手
-                driver = Driver(
-                    driver_id=row['driverId'],
-                    driver_number=row['driverNumber'],
-                    driver_code=row['driverCode'],
-                    driver_url=row['driverUrl'],
-                    given_name=row['givenName'],
-                    family_name=row['familyName'],
-                    date_of_birth=date_of_birth,
-                    driver_nationality=row['driverNationality']
+            # 已有车手只更新变化的资料，缺失的车手一次性批量创建
+            changed = self.identity_map.update_drivers(drivers_df)
+            created = self.identity_map.ensure_drivers(drivers_df)
+            # 读模型中的车手姓名和国籍与资料更新在同一事务内重建
+            season_years = self._refresh_standings_read(driver_ids=changed)
+            self.db.commit()
+            if changed:
+                invalidate_cache_tags(
+                    *(driver_tag(d) for d in changed), *(season_tag(year) for year in season_years)
                 )
-                
-                self.db.add(driver)
-                drivers.append(driver)
-                logger.info(f"✅ 创建车手 {row['givenName']} {row['familyName']}")
+            if self.identity_map.take_created() or changed:
+                bump_data_version(*season_years, reference=True)
             
-            self.db.commit()
-            logger.info(f"✅ 车手数据同步完成，共 {len(drivers)} 个车手")
+            drivers = self.db.query(Driver).filter(
+                Driver.driver_id.in_(drivers_df['driverId'].dropna().tolist())
+            ).all()
+            logger.info(f"✅ 车手数据同步完成，共 {len(drivers)} 个车手，新建 {created} 个，更新 {len(changed)} 个")
             return drivers
             
         except Exception as e:
             logger.error(f"❌ 车手数据同步失败: {e}")
-            self.db.rollback()
+            self._rollback()
             raise
     
-    def sync_races(self, season_year: int) -> List[Race]:
-        """同步指定赛季的比赛数据"""
+    def _refresh_standings_read(
+        self,
+        driver_ids: Sequence[str] = (),
+        constructor_ids: Sequence[str] = ()
+    ) -> List[int]:
+        """
+        车手/车队资料变化后，重建引用它们的赛季的车手积分榜读模型（不提交）
+        车队可能只通过官方指定车队（driver_seasons）出现在读模型中
+
+        Returns:
+            List[int]: 重建的赛季年份
+        """
+        season_ids = set()
+        if driver_ids:
+            season_ids.update(
+                season_id for (season_id,) in self.db.query(DriverStanding.season_id)
+                .filter(DriverStanding.driver_id.in_(driver_ids)).distinct()
+            )
+        if constructor_ids:
+            for model in (DriverStanding, DriverSeason):
+                season_ids.update(
+                    season_id for (season_id,) in self.db.query(model.season_id)
+                    .filter(model.constructor_id.in_(constructor_ids)).distinct()
+                )
+        if not season_ids:
+            return []
+        
+        season_years = []
+        for season_id, year in self.db.query(Season.id, Season.year).filter(Season.id.in_(season_ids)):
+            refresh_driver_standings_read(self.db, season_id)
+            season_years.append(year)
+        return sorted(season_years)
+    
+    def _fetch_schedule(self, season_year: int) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        获取赛程（不访问数据库，可在工作线程中执行）
+        
+        Returns:
+            Tuple[pd.DataFrame, Optional[str]]: (赛程数据, 数据来源 'fastf1'/'ergast')
+        """
+        # 优先使用 FastF1 获取详细日程
+        try:
+            logger.info(f"🏎️ 尝试使用 FastF1 获取 {season_year} 赛程...")
+            schedule_df = fastf1.get_event_schedule(season_year, include_testing=False)
+            if schedule_df.empty:
+                raise ValueError("FastF1 返回空赛程")
+            logger.info("✅ FastF1 获取成功")
+            return schedule_df, 'fastf1'
+        except Exception as e:
+            logger.warning(f"⚠️ FastF1 获取失败 ({e})，降级到 Ergast...")
+            schedule_df = self._handle_api_call(self.ergast.get_race_schedule, season=season_year)
+            if schedule_df is None or schedule_df.empty:
+                logger.error(f"❌ Ergast 也无法获取 {season_year} 赛程")
+                return pd.DataFrame(), None
+            return schedule_df, 'ergast'
+    
+    def sync_races(
+        self,
+        season_year: int,
+        schedule: Optional[Tuple[pd.DataFrame, Optional[str]]] = None
+    ) -> List[Race]:
+        """
+        同步指定赛季的比赛数据
+        传入 schedule 时直接写入已获取的赛程（流水线模式）
+        """
         logger.info(f"🔄 开始同步 {season_year} 赛季的比赛数据...")
         
         # 获取赛季对象
@@ -325,21 +424,16 @@ class UnifiedSyncService:
             return []
 
         try:
-            # 优先使用 FastF1 获取详细日程
-            try:
-                logger.info(f"🏎️ 尝试使用 FastF1 获取 {season_year} 赛程...")
-                schedule_df = fastf1.get_event_schedule(season_year, include_testing=False)
-                if schedule_df.empty:
-                    raise ValueError("FastF1 返回空赛程")
-                logger.info("✅ FastF1 获取成功")
-                source = 'fastf1'
-            except Exception as e:
-                logger.warning(f"⚠️ FastF1 获取失败 ({e})，降级到 Ergast...")
-                schedule_df = self._handle_api_call(self.ergast.get_race_schedule, season=season_year)
-                if schedule_df.empty:
-                    logger.error(f"❌ Ergast 也无法获取 {season_year} 赛程")
-                    return []
-                source = 'ergast'
+            schedule_df, source = schedule if schedule is not None else self._fetch_schedule(season_year)
+            if source is None:
+                return []
+
+            # 预加载本赛季已有比赛，按轮次索引
+            existing_races = {
+                race.round_number: race
+                for race in self.db.query(Race).filter(Race.season_id == season.id)
+            }
+            active_circuit_ids = set()
 
             races = []
             for _, row in schedule_df.iterrows():
@@ -355,12 +449,9 @@ class UnifiedSyncService:
                     race_date = pd.to_datetime(row['EventDate']).date()
                     
                     # 通过位置和国家查找赛道
-                    circuit = self.db.query(Circuit).filter(
-                        Circuit.locality == location,
-                        Circuit.country == country
-                    ).first()
+                    circuit_id = self.identity_map.find_circuit_id(location, country)
                     
-                    if not circuit:
+                    if not circuit_id:
                         logger.warning(f"⚠️ 找不到赛道 {location}, {country}，跳过此比赛")
                         continue
                     
@@ -394,25 +485,21 @@ class UnifiedSyncService:
                     fp1_date, fp2_date, fp3_date, qualifying_date, session5_date = None, None, None, None, None
 
                     # 查找赛道，并将其激活
-                    circuit = self.db.query(Circuit).filter(Circuit.circuit_id == circuit_id).first()
-                    if not circuit:
+                    if not self.identity_map.has_circuit(circuit_id):
                         logger.warning(f"⚠️ 赛道 (ID: {circuit_id}) 不在数据库中，跳过此比赛")
                         continue
                 
-                # 激活赛道
-                circuit.is_active = True
+                # 激活赛道（循环结束后统一更新）
+                active_circuit_ids.add(circuit_id)
 
                 # 检查比赛是否已存在
-                existing_race = self.db.query(Race).filter(
-                    Race.season_id == season.id,
-                    Race.round_number == round_number
-                ).first()
+                existing_race = existing_races.get(int(round_number))
 
                 if existing_race:
                     # 更新已有比赛信息
                     logger.info(f"  - 更新比赛: 第 {round_number} 轮 - {race_name}")
                     existing_race.official_event_name = race_name
-                    existing_race.circuit_id = circuit.circuit_id if hasattr(circuit, 'circuit_id') else circuit.id
+                    existing_race.circuit_id = circuit_id
                     existing_race.country = country if source == 'fastf1' else row.get('country')
                     existing_race.location = location if source == 'fastf1' else row.get('locality')
                     existing_race.event_date = race_date
@@ -431,7 +518,7 @@ class UnifiedSyncService:
                         season_id=season.id,
                         round_number=round_number,
                         official_event_name=race_name,
-                        circuit_id=circuit.circuit_id if hasattr(circuit, 'circuit_id') else circuit.id,
+                        circuit_id=circuit_id,
                         country=country if source == 'fastf1' else row.get('country'),
                         location=location if source == 'fastf1' else row.get('locality'),
                         event_date=race_date,
@@ -446,383 +533,691 @@ class UnifiedSyncService:
                     self.db.add(new_race)
                     races.append(new_race)
 
+            activated = 0
+            if active_circuit_ids:
+                activated = self.db.query(Circuit).filter(
+                    Circuit.circuit_id.in_(active_circuit_ids),
+                    Circuit.is_active.isnot(True)
+                ).update({"is_active": True}, synchronize_session=False)
+
             self.db.commit()
+            # 赛道的激活状态属于参考数据，只有状态变化时才更新参考数据版本
+            self._invalidate_cache(season_year, reference=activated > 0)
             logger.info(f"✅ {season_year} 赛季比赛数据同步完成，共 {len(races)} 场比赛")
             return races
         except Exception as e:
             logger.error(f"❌ {season_year} 赛季比赛数据同步失败: {e}", exc_info=True)
-            self.db.rollback()
+            self._rollback()
             return []
     
-    def sync_race_results(self, season_year: int) -> bool:
-        """同步指定赛季的比赛结果"""
-        logger.info(f"🔄 开始同步 {season_year} 赛季的比赛结果...")
+    def sync_race_results(
+        self,
+        season_year: int,
+        round_number: Optional[int] = None,
+        prepared: Optional[PreparedFrame] = None
+    ) -> bool:
+        """
+        同步指定赛季的比赛结果
+        指定 round_number 时只请求该轮数据（赛后增量同步）；
+        传入 prepared 时直接写入已获取并转换的数据（流水线模式）
+        """
+        scope = self._scope_label(season_year, round_number)
+        logger.info(f"🔄 开始同步 {scope}的比赛结果...")
         
-        races = self.db.query(Race).join(Season).filter(Season.year == season_year).all()
+        races = self._season_races(season_year, round_number)
         if not races:
-            logger.warning(f"没有为 {season_year} 赛季找到比赛记录，跳过比赛结果同步")
+            logger.warning(f"没有为 {scope}找到比赛记录，跳过比赛结果同步")
             return True
 
         try:
-            all_results_df = self._handle_api_call(
-                self.ergast.get_race_results,
-                season=season_year,
-                round=None
-            )
+            if prepared is None:
+                prepared = self._fetch_prepared(
+                    self.ergast.get_race_results, RESULT_COLUMNS, season_year, round_number
+                )
             
-            if all_results_df is None or all_results_df.empty:
-                logger.warning(f"Ergast API 未返回 {season_year} 赛季的比赛结果")
+            if prepared is None or prepared.empty:
+                logger.warning(f"Ergast API 未返回 {scope}的比赛结果")
                 return True
             
-            for round_number, group_df in all_results_df.groupby('round'):
-                race = next((r for r in races if r.round_number == round_number), None)
-                if not race:
-                    logger.warning(f"⚠️ 未找到赛季 {season_year} 第 {round_number} 轮的比赛记录，跳过结果同步")
-                    continue
-                
-                existing_count = self.db.query(Result).filter(Result.race_id == race.id).count()
-                if existing_count > 0:
-                    logger.info(f"  - 第 {race.round_number} 轮比赛结果已存在 {existing_count} 条，跳过")
-                    continue
-
-                logger.info(f"🔄 处理第 {round_number} 轮比赛结果: {race.official_event_name} ({len(group_df)}条记录)")
-
-                for _, row in group_df.iterrows():
-                    driver = self._get_or_create_driver_from_result(row)
-                    constructor = self._get_or_create_constructor_from_result(row)
-                    
-                    if not driver or not constructor:
-                        continue
-
-                    def safe_int(value):
-                        try: return int(value)
-                        except (ValueError, TypeError): return None
-
-                    def safe_float(value):
-                        try: return float(value)
-                        except (ValueError, TypeError): return None
-
-                    def safe_str(value):
-                        return str(value) if pd.notna(value) else None
-
-                    result = Result(
-                        race_id=race.id, driver_id=driver.driver_id, constructor_id=constructor.constructor_id,
-                        number=safe_int(row.get('number')), position=safe_int(row.get('position')),
-                        position_text=safe_str(row.get('positionText')), points=safe_float(row.get('points')),
-                        grid=safe_int(row.get('grid')), laps=safe_int(row.get('laps')),
-                        status=safe_str(row.get('status')),
-                        total_race_time_millis=safe_int(row.get('totalRaceTimeMillis')),
-                        total_race_time=safe_str(row.get('totalRaceTime')),
-                        fastest_lap_rank=safe_int(row.get('fastestLapRank')),
-                        fastest_lap_number=safe_int(row.get('fastestLapNumber')),
-                        fastest_lap_time=safe_str(row.get('fastestLapTime'))
-                    )
-                    self.db.add(result)
+            if self._is_unchanged(prepared, Result, Result.race_id.in_([r.id for r in races])):
+                logger.info(f"⏭️ {scope}比赛结果未变化，跳过数据库写入")
+                return True
+            
+            records = self._select_results(prepared, races, season_year, "比赛结果")
             
+            # 整个赛季的结果通过一条 INSERT ... ON CONFLICT DO UPDATE 写入
+            stats = bulk_upsert(self.db, Result, records)
+            self.upsert_stats[stats.table] = stats
             self.db.commit()
-            logger.info(f"✅ {season_year} 赛季比赛结果同步完成")
+            self._invalidate_cache(season_year, races=races)
+            self._mark_applied(prepared)
+            logger.info(f"✅ {scope}比赛结果同步完成 - {stats}")
             return True
         except Exception as e:
             logger.error(f"❌ 比赛结果同步失败 (赛季: {season_year}): {e}", exc_info=True)
-            self.db.rollback()
+            self._rollback()
             return False
     
-    def sync_qualifying_results(self, season_year: int) -> bool:
-        """同步指定赛季的排位赛结果"""
-        logger.info(f"🔄 开始同步 {season_year} 赛季的排位赛结果...")
+    def sync_qualifying_results(
+        self,
+        season_year: int,
+        round_number: Optional[int] = None,
+        prepared: Optional[PreparedFrame] = None
+    ) -> bool:
+        """
+        同步指定赛季的排位赛结果
+        指定 round_number 时只请求该轮数据（赛后增量同步）；
+        传入 prepared 时直接写入已获取并转换的数据（流水线模式）
+        """
+        scope = self._scope_label(season_year, round_number)
+        logger.info(f"🔄 开始同步 {scope}的排位赛结果...")
         
-        races = self.db.query(Race).join(Season).filter(Season.year == season_year).all()
+        races = self._season_races(season_year, round_number)
         if not races:
-            logger.warning(f"没有为 {season_year} 赛季找到比赛记录，跳过排位赛结果同步")
+            logger.warning(f"没有为 {scope}找到比赛记录，跳过排位赛结果同步")
             return True
 
         try:
-            all_results_df = self._handle_api_call(
-                self.ergast.get_qualifying_results,
-                season=season_year,
-                round=None
-            )
+            if prepared is None:
+                prepared = self._fetch_prepared(
+                    self.ergast.get_qualifying_results, QUALIFYING_RESULT_COLUMNS, season_year, round_number
+                )
             
-            if all_results_df is None or all_results_df.empty:
-                logger.warning(f"Ergast API 未返回 {season_year} 赛季的排位赛结果")
+            if prepared is None or prepared.empty:
+                logger.warning(f"Ergast API 未返回 {scope}的排位赛结果")
                 return True
 
-            for round_number, group_df in all_results_df.groupby('round'):
-                race = next((r for r in races if r.round_number == round_number), None)
-                if not race:
-                    logger.warning(f"⚠️ 未找到赛季 {season_year} 第 {round_number} 轮的比赛记录，跳过排位赛结果同步")
-                    continue
-                
-                existing_count = self.db.query(QualifyingResult).filter(QualifyingResult.race_id == race.id).count()
-                if existing_count > 0:
-                    logger.info(f"  - 第 {race.round_number} 轮排位赛结果已存在 {existing_count} 条，跳过")
-                    continue
-                
-                logger.info(f"🔄 处理第 {round_number} 轮排位赛: {race.official_event_name} ({len(group_df)}条记录)")
-
-                for _, row in group_df.iterrows():
-                    driver = self._get_or_create_driver_from_result(row)
-                    constructor = self._get_or_create_constructor_from_result(row)
-
-                    if not driver or not constructor:
-                        continue
-                    
-                    def safe_str(value):
-                        return str(value) if pd.notna(value) else None
-
-                    qualifying_result = QualifyingResult(
-                        race_id=race.id, driver_id=driver.driver_id, constructor_id=constructor.constructor_id,
-                        number=int(row['number']), position=int(row['position']),
-                        q1_time=safe_str(row.get('Q1')), q2_time=safe_str(row.get('Q2')), q3_time=safe_str(row.get('Q3'))
-                    )
-                    self.db.add(qualifying_result)
+            if self._is_unchanged(prepared, QualifyingResult, QualifyingResult.race_id.in_([r.id for r in races])):
+                logger.info(f"⏭️ {scope}排位赛结果未变化，跳过数据库写入")
+                return True
+            
+            records = self._select_results(prepared, races, season_year, "排位赛结果")
 
+            stats = bulk_upsert(self.db, QualifyingResult, records)
+            self.upsert_stats[stats.table] = stats
             self.db.commit()
-            logger.info(f"✅ {season_year} 赛季排位赛结果同步完成")
+            self._invalidate_cache(season_year, races=races)
+            self._mark_applied(prepared)
+            logger.info(f"✅ {scope}排位赛结果同步完成 - {stats}")
             return True
         except Exception as e:
             logger.error(f"❌ 排位赛结果同步失败 (赛季: {season_year}): {e}", exc_info=True)
-            self.db.rollback()
+            self._rollback()
             return False
     
-    def sync_sprint_results(self, season_year: int) -> bool:
-        """同步指定赛季的冲刺赛结果"""
-        logger.info(f"🔄 开始同步 {season_year} 赛季的冲刺赛结果...")
+    def sync_sprint_results(
+        self,
+        season_year: int,
+        round_number: Optional[int] = None,
+        prepared: Optional[PreparedFrame] = None
+    ) -> bool:
+        """
+        同步指定赛季的冲刺赛结果
+        指定 round_number 时只请求该轮数据，非冲刺赛周末不会发起请求；
+        传入 prepared 时直接写入已获取并转换的数据（流水线模式）
+        """
+        scope = self._scope_label(season_year, round_number)
+        logger.info(f"🔄 开始同步 {scope}的冲刺赛结果...")
 
-        races_with_sprint = self.db.query(Race).join(Season).filter(Season.year == season_year, Race.is_sprint == True).all()
+        races_with_sprint = self._season_races(season_year, round_number, sprint_only=True)
         if not races_with_sprint:
-            logger.info(f"{season_year} 赛季没有冲刺赛，跳过")
+            logger.info(f"{scope}没有冲刺赛，跳过")
             return True
 
         try:
-            all_results_df = self._handle_api_call(
-                self.ergast.get_sprint_results,
-                season=season_year,
-                round=None
-            )
+            if prepared is None:
+                prepared = self._fetch_prepared(
+                    self.ergast.get_sprint_results, SPRINT_RESULT_COLUMNS, season_year, round_number
+                )
             
-            if all_results_df is None or all_results_df.empty:
-                logger.warning(f"Ergast API 未返回 {season_year} 赛季的冲刺赛结果")
+            if prepared is None or prepared.empty:
+                logger.warning(f"Ergast API 未返回 {scope}的冲刺赛结果")
                 return True
             
-            sprint_rounds = {r.round_number for r in races_with_sprint}
-            for round_number, group_df in all_results_df.groupby('round'):
-                if round_number not in sprint_rounds:
-                    continue
-
-                race = next((r for r in races_with_sprint if r.round_number == round_number), None)
-                if not race:
-                    continue
-
-                existing_count = self.db.query(SprintResult).filter(SprintResult.race_id == race.id).count()
-                if existing_count > 0:
-                    logger.info(f"  - 第 {race.round_number} 轮冲刺赛结果已存在 {existing_count} 条，跳过")
-                    continue
-                
-                logger.info(f"🔄 处理第 {round_number} 轮冲刺赛: {race.official_event_name} ({len(group_df)}条记录)")
-                
-                for _, row in group_df.iterrows():
-                    driver = self._get_or_create_driver_from_result(row)
-                    constructor = self._get_or_create_constructor_from_result(row)
-                    
-                    if not driver or not constructor:
-                        continue
-
-                    def safe_int(value):
-                        try: return int(value)
-                        except (ValueError, TypeError): return None
-                    
-                    def safe_float(value):
-                        try: return float(value)
-                        except (ValueError, TypeError): return None
-
-                    def safe_str(value):
-                        return str(value) if pd.notna(value) else None
-
-                    sprint_result = SprintResult(
-                        race_id=race.id, driver_id=driver.driver_id, constructor_id=constructor.constructor_id,
-                        number=safe_int(row.get('number')), position=safe_int(row.get('position')),
-                        position_text=safe_str(row.get('positionText')), points=safe_float(row.get('points')),
-                        grid=safe_int(row.get('grid')), laps=safe_int(row.get('laps')),
-                        status=safe_str(row.get('status')),
-                        total_race_time=safe_str(row.get('totalRaceTime')),
-                        total_race_time_millis=safe_int(row.get('totalRaceTimeMillis')),
-                        fastest_lap_rank=safe_int(row.get('fastestLapRank')),
-                        fastest_lap_number=safe_int(row.get('fastestLapNumber')),
-                        fastest_lap_time=safe_str(row.get('fastestLapTime'))
-                    )
-                    self.db.add(sprint_result)
+            if self._is_unchanged(prepared, SprintResult, SprintResult.race_id.in_([r.id for r in races_with_sprint])):
+                logger.info(f"⏭️ {scope}冲刺赛结果未变化，跳过数据库写入")
+                return True
+            
+            records = self._select_results(prepared, races_with_sprint, season_year, "冲刺赛结果")
             
+            stats = bulk_upsert(self.db, SprintResult, records)
+            self.upsert_stats[stats.table] = stats
             self.db.commit()
-            logger.info(f"✅ {season_year} 赛季冲刺赛结果同步完成")
+            self._invalidate_cache(season_year, races=races_with_sprint)
+            self._mark_applied(prepared)
+            logger.info(f"✅ {scope}冲刺赛结果同步完成 - {stats}")
             return True
         except Exception as e:
             logger.error(f"❌ 冲刺赛结果同步失败 (赛季: {season_year}): {e}", exc_info=True)
-            self.db.rollback()
+            self._rollback()
             return False
     
-    def sync_driver_standings(self, season_year: int) -> bool:
-        """同步指定赛季的车手积分榜"""
-        logger.info(f"🔄 开始同步 {season_year} 赛季的车手积分榜...")
+    def sync_driver_standings(
+        self,
+        season_year: int,
+        round_number: Optional[int] = None,
+        prepared: Optional[PreparedFrame] = None
+    ) -> bool:
+        """
+        同步指定赛季的车手积分榜
+        指定 round_number 时请求该轮结束后的积分榜（只有一页），
+        该轮早于已同步的最新轮次时只写入快照，实时积分榜不会回退；
+        传入 prepared 时直接写入已获取并转换的数据（流水线模式）
+        """
+        logger.info(f"🔄 开始同步 {self._scope_label(season_year, round_number)}的车手积分榜...")
         
         try:
-            standings_df = self._handle_api_call(
-                self.ergast.get_driver_standings,
-                season=season_year,
-                round=None
-            )
+            if prepared is None:
+                prepared = self._fetch_prepared(
+                    self.ergast.get_driver_standings, DRIVER_STANDING_COLUMNS, season_year, round_number
+                )
             
-            if standings_df is None or standings_df.empty:
+            if prepared is None or prepared.empty:
                 logger.warning(f"Ergast API 未返回 {season_year} 赛季的车手积分榜")
                 return True
 
-            self.db.query(DriverStanding).filter(DriverStanding.season.has(year=season_year)).delete()
-            
-            season = self.db.query(Season).filter(Season.year == season_year).first()
-            if not season:
+            season_id = self.identity_map.season_id(season_year)
+            if not season_id:
                 logger.error(f"无法找到赛季 {season_year} 用于同步车手积分榜")
                 return False
 
-            for _, row in standings_df.iterrows():
-                driver = self._get_or_create_driver_from_result(row)
-                constructor = self._get_or_create_constructor_from_result(row)
+            if self._is_stale_round(DriverStandingSnapshot, season_id, round_number):
+                return self._sync_stale_round_snapshot(
+                    prepared, DriverStandingSnapshot, self._driver_standing_keys,
+                    SNAPSHOT_DRIVER_KEY_COLUMNS, season_year, season_id, round_number,
+                )
 
-                if not driver or not constructor:
-                    continue
+            if self._is_unchanged(prepared, DriverStanding, DriverStanding.season_id == season_id):
+                logger.info(f"⏭️ {season_year} 赛季车手积分榜未变化，跳过数据库写入")
+                return True
 
-                standing = DriverStanding(
-                    season_id=season.id,
-                    driver_id=driver.driver_id,
-                    constructor_id=constructor.constructor_id,
-                    position=int(row['position']),
-                    position_text=str(row.get('positionText', '')),
-                    points=float(row['points']),
-                    wins=int(row['wins'])
-                )
-                self.db.add(standing)
-            
+            valid, keys = self._driver_standing_keys(prepared, season_id)
+            records = prepared.select(valid, keys)
+
+            # 只改写变化的行，整个赛季在同一事务内完成，读取方不会看到空表；
+            # 有行无法关联时 diff_upsert 会拒绝删除并抛出异常，整个事务回滚
+            change_set = diff_upsert(
+                self.db, DriverStanding, records, SEASON_DRIVER_KEY_COLUMNS,
+                scope=[DriverStanding.season_id == season_id],
+                expected=len(prepared.frame),
+            )
+            # 同时记录该轮结束后的积分榜快照
+            bulk_upsert(
+                self.db, DriverStandingSnapshot,
+                self._snapshot_records(prepared, valid, keys), SNAPSHOT_DRIVER_KEY_COLUMNS,
+            )
+            # 在同一事务内重建读模型，接口不会读到与积分榜不一致的数据
+            refresh_driver_standings_read(self.db, season_id)
             self.db.commit()
-            logger.info(f"✅ {season_year} 赛季车手积分榜同步完成")
+            self._record_change_set(change_set)
+            self._invalidate_cache(season_year, change_set)
+            self._mark_applied(prepared)
+            logger.info(f"✅ {season_year} 赛季车手积分榜同步完成 - {change_set}")
             return True
         except Exception as e:
             logger.error(f"❌ 车手积分榜同步失败 (赛季: {season_year}): {e}", exc_info=True)
-            self.db.rollback()
+            self._rollback()
             return False
     
-    def sync_constructor_standings(self, season_year: int) -> bool:
-        """同步指定赛季的车队积分榜"""
-        logger.info(f"🔄 开始同步 {season_year} 赛季的车队积分榜...")
+    def sync_constructor_standings(
+        self,
+        season_year: int,
+        round_number: Optional[int] = None,
+        prepared: Optional[PreparedFrame] = None
+    ) -> bool:
+        """
+        同步指定赛季的车队积分榜
+        指定 round_number 时请求该轮结束后的积分榜（只有一页），
+        该轮早于已同步的最新轮次时只写入快照，实时积分榜不会回退；
+        传入 prepared 时直接写入已获取并转换的数据（流水线模式）
+        """
+        logger.info(f"🔄 开始同步 {self._scope_label(season_year, round_number)}的车队积分榜...")
         
         try:
-            standings_df = self._handle_api_call(
-                self.ergast.get_constructor_standings,
-                season=season_year,
-                round=None
-            )
+            if prepared is None:
+                prepared = self._fetch_prepared(
+                    self.ergast.get_constructor_standings, CONSTRUCTOR_STANDING_COLUMNS, season_year, round_number
+                )
             
-            if standings_df is None or standings_df.empty:
+            if prepared is None or prepared.empty:
                 logger.warning(f"Ergast API 未返回 {season_year} 赛季的车队积分榜")
                 return True
             
-            self.db.query(ConstructorStanding).filter(ConstructorStanding.season.has(year=season_year)).delete()
-
-            season = self.db.query(Season).filter(Season.year == season_year).first()
-            if not season:
+            season_id = self.identity_map.season_id(season_year)
+            if not season_id:
                 logger.error(f"无法找到赛季 {season_year} 用于同步车队积分榜")
                 return False
 
-            for _, row in standings_df.iterrows():
-                constructor = self._get_or_create_constructor_from_result(row)
-                if not constructor:
-                    continue
-                
-                standing = ConstructorStanding(
-                    season_id=season.id,
-                    constructor_id=constructor.constructor_id,
-                    position=int(row['position']),
-                    position_text=str(row.get('positionText', '')),
-                    points=float(row['points']),
-                    wins=int(row['wins'])
+            if self._is_stale_round(ConstructorStandingSnapshot, season_id, round_number):
+                return self._sync_stale_round_snapshot(
+                    prepared, ConstructorStandingSnapshot, self._constructor_standing_keys,
+                    SNAPSHOT_CONSTRUCTOR_KEY_COLUMNS, season_year, season_id, round_number,
                 )
-                self.db.add(standing)
 
+            if self._is_unchanged(prepared, ConstructorStanding, ConstructorStanding.season_id == season_id):
+                logger.info(f"⏭️ {season_year} 赛季车队积分榜未变化，跳过数据库写入")
+                return True
+
+            valid, keys = self._constructor_standing_keys(prepared, season_id)
+            records = prepared.select(valid, keys)
+
+            change_set = diff_upsert(
+                self.db, ConstructorStanding, records, SEASON_CONSTRUCTOR_KEY_COLUMNS,
+                scope=[ConstructorStanding.season_id == season_id],
+                expected=len(prepared.frame),
+            )
+            bulk_upsert(
+                self.db, ConstructorStandingSnapshot,
+                self._snapshot_records(prepared, valid, keys), SNAPSHOT_CONSTRUCTOR_KEY_COLUMNS,
+            )
             self.db.commit()
-            logger.info(f"✅ {season_year} 赛季车队积分榜同步完成")
+            self._record_change_set(change_set)
+            self._invalidate_cache(season_year, change_set)
+            self._mark_applied(prepared)
+            logger.info(f"✅ {season_year} 赛季车队积分榜同步完成 - {change_set}")
             return True
         except Exception as e:
             logger.error(f"❌ 车队积分榜同步失败 (赛季: {season_year}): {e}", exc_info=True)
-            self.db.rollback()
+            self._rollback()
             return False
     
-    def _get_or_create_driver_from_result(self, row: pd.Series) -> Optional[Driver]:
-        """从比赛结果行中获取或创建车手"""
-        driver_id = row.get('driverId')
-        if not driver_id:
-            return None
+    def _driver_standing_keys(self, prepared: PreparedFrame, season_id: int) -> Tuple[pd.Series, Dict[str, Any]]:
+        """车手积分榜的有效行掩码和关联键（缺失的车手/车队会先创建）"""
+        self.identity_map.ensure_entities(prepared.frame, season_id)
         
-        driver = self.db.query(Driver).filter(Driver.driver_id == driver_id).first()
-        if not driver:
-            # 创建新车手
-            driver = Driver(
-                driver_id=driver_id,
-                number=row.get('driverNumber'),
-                code=row.get('driverCode'),
-                driver_url=row.get('driverUrl', ''),
-                forename=row.get('givenName', ''),
-                surname=row.get('familyName', ''),
-                date_of_birth=row.get('dateOfBirth'),
-                nationality=row.get('driverNationality', '')
-            )
-            self.db.add(driver)
-            self.db.commit()
+        driver_ids = prepared.frame['driverId']
+        valid = (
+            driver_ids.isin(self.identity_map.driver_ids)
+            & prepared.constructor_ids.isin(self.identity_map.constructor_ids)
+        )
+        return valid, {
+            'season_id': season_id,
+            'driver_id': driver_ids,
+            'constructor_id': prepared.constructor_ids,
+        }
+    
+    def _constructor_standing_keys(self, prepared: PreparedFrame, season_id: int) -> Tuple[pd.Series, Dict[str, Any]]:
+        """车队积分榜的有效行掩码和关联键（缺失的车队会先创建）"""
+        self.identity_map.ensure_constructors(prepared.frame, season_id)
+        
+        valid = prepared.constructor_ids.isin(self.identity_map.constructor_ids)
+        return valid, {
+            'season_id': season_id,
+            'constructor_id': prepared.constructor_ids,
+        }
+    
+    def _snapshot_records(
+        self,
+        prepared: PreparedFrame,
+        valid: pd.Series,
+        keys: Dict[str, Any],
+        round_number: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """积分榜快照记录：在积分榜记录上附加轮次（默认取 Ergast 响应中的 round 列）"""
+        if round_number is not None:
+            return prepared.select(valid, {**keys, 'round_number': round_number})
         
-        return driver
+        if 'round' not in prepared.frame.columns:
+            return []
+        rounds = prepared.frame['round']
+        return prepared.select(valid & rounds.notna(), {**keys, 'round_number': to_int(rounds)})
+    
+    def _is_stale_round(self, snapshot_model, season_id: int, round_number: Optional[int]) -> bool:
+        """指定的轮次早于该赛季已有的最新快照轮次（如延迟执行的赛后同步重试）"""
+        if round_number is None:
+            return False
+        latest = (
+            self.db.query(func.max(snapshot_model.round_number))
+            .filter(snapshot_model.season_id == season_id)
+            .scalar()
+        )
+        return latest is not None and round_number < latest
     
-    def _get_or_create_constructor_from_result(self, row: pd.Series) -> Optional[Constructor]:
-        """从比赛结果行中获取或创建车队"""
-        # 尝试多个可能的字段名
-        constructor_id = row.get('constructorId') or row.get('constructorIds')
-        if not constructor_id:
+    def _sync_stale_round_snapshot(
+        self,
+        prepared: PreparedFrame,
+        model,
+        resolve_keys,
+        conflict_columns: Sequence[str],
+        season_year: int,
+        season_id: int,
+        round_number: int
+    ) -> bool:
+        """
+        旧轮次的积分榜只写入该轮快照
+        实时积分榜和读模型已是更新轮次的数据，不能被旧轮次覆盖
+        """
+        valid, keys = resolve_keys(prepared, season_id)
+        stats = bulk_upsert(
+            self.db, model, self._snapshot_records(prepared, valid, keys, round_number), conflict_columns
+        )
+        self.db.commit()
+        self._invalidate_cache(season_year)
+        self._mark_applied(prepared)
+        logger.info(
+            f"⏭️ {self._scope_label(season_year, round_number)}早于已同步的最新轮次，"
+            f"只更新积分榜快照 - {stats}"
+        )
+        return True
+    
+    def _completed_rounds(self, season_id: int) -> List[int]:
+        """已有比赛结果的轮次"""
+        rows = (
+            self.db.query(Race.round_number)
+            .join(Result, Result.race_id == Race.id)
+            .filter(Race.season_id == season_id)
+            .distinct()
+            .all()
+        )
+        return sorted(row.round_number for row in rows)
+    
+    def backfill_standings_snapshots(
+        self,
+        season_year: int,
+        rounds: Optional[List[int]] = None,
+        force: bool = False,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, UpsertStats]:
+        """
+        回填赛季每一轮结束后的车手/车队积分榜快照
+        逐轮请求 Ergast 积分榜（线程池并发获取，由全局令牌桶限流），
+        每类积分榜整个赛季只执行一次批量写入
+        
+        Args:
+            season_year: 赛季年份
+            rounds: 需要回填的轮次，默认为已有比赛结果的所有轮次
+            force: 重新获取已存在快照的轮次
+            max_workers: 获取线程数，默认读取配置
+        
+        Returns:
+            Dict[str, UpsertStats]: 各快照表的写入统计
+        """
+        logger.info(f"🔄 开始回填 {season_year} 赛季的积分榜快照...")
+        stats: Dict[str, UpsertStats] = {}
+        
+        season_id = self.identity_map.season_id(season_year)
+        if not season_id:
+            logger.error(f"无法找到赛季 {season_year} 用于回填积分榜快照")
+            return stats
+        
+        if rounds is None:
+            rounds = self._completed_rounds(season_id)
+        
+        # (快照模型, Ergast 接口, 列映射, 关联键解析, 冲突键)
+        targets = [
+            (
+                DriverStandingSnapshot, self.ergast.get_driver_standings, DRIVER_STANDING_COLUMNS,
+                self._driver_standing_keys, SNAPSHOT_DRIVER_KEY_COLUMNS,
+            ),
+            (
+                ConstructorStandingSnapshot, self.ergast.get_constructor_standings, CONSTRUCTOR_STANDING_COLUMNS,
+                self._constructor_standing_keys, SNAPSHOT_CONSTRUCTOR_KEY_COLUMNS,
+            ),
+        ]
+        
+        # 已有快照的轮次无需再次请求
+        pending: Dict[Any, List[int]] = {}
+        for model, *_ in targets:
+            existing = set()
+            if not force:
+                existing = {
+                    row.round_number for row in
+                    self.db.query(model.round_number).filter(model.season_id == season_id).distinct()
+                }
+            pending[model] = [r for r in rounds if r not in existing]
+        
+        if not any(pending.values()):
+            logger.info(f"⏭️ {season_year} 赛季积分榜快照已完整，无需回填")
+            return stats
+        
+        workers = max_workers or settings.sync_pipeline_workers
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshot-fetch") as pool:
+            futures = {
+                (model, round_number): pool.submit(self._fetch_prepared, func, columns, season_year, round_number)
+                for model, func, columns, _, _ in targets
+                for round_number in pending[model]
+            }
+            
+            try:
+                for model, _, _, resolve_keys, conflict_columns in targets:
+                    records: List[Dict[str, Any]] = []
+                    for round_number in pending[model]:
+                        prepared = futures[(model, round_number)].result()
+                        if prepared is None or prepared.empty:
+                            logger.warning(f"Ergast API 未返回 {season_year} 赛季第 {round_number} 轮的积分榜")
+                            continue
+                        
+                        valid, keys = resolve_keys(prepared, season_id)
+                        records.extend(self._snapshot_records(prepared, valid, keys, round_number))
+                    
+                    stats[model.__tablename__] = bulk_upsert(self.db, model, records, conflict_columns)
+                
+                self.db.commit()
+                self._invalidate_cache(season_year)
+            except Exception as e:
+                logger.error(f"❌ 积分榜快照回填失败 (赛季: {season_year}): {e}", exc_info=True)
+                self._rollback()
+                return {}
+        
+        self.upsert_stats.update(stats)
+        logger.info(f"✅ {season_year} 赛季积分榜快照回填完成 - {', '.join(str(s) for s in stats.values())}")
+        return stats
+    
+    def _record_change_set(self, change_set: ChangeSet):
+        """累计本次运行的变更集合（多赛季同步时同一张表会多次写入）"""
+        self.upsert_stats[change_set.table] = change_set.stats
+        if change_set.table not in self.change_sets:
+            self.change_sets[change_set.table] = ChangeSet(change_set.table, change_set.key_columns)
+        self.change_sets[change_set.table].merge(change_set)
+    
+    def _invalidate_cache(
+        self,
+        season_year: int,
+        change_set: Optional[ChangeSet] = None,
+        races: Sequence[Race] = (),
+        reference: bool = False,
+    ):
+        """
+        写入提交后按标签失效接口缓存（Redis 和各进程本地缓存），并更新数据版本
+        赛季标签总是失效；有变更集合时再失效其中变化的车手/车队
+        缓存先失效再更新版本，客户端拿到新 ETag 时不会再读到旧的缓存
+        本次写入新建了车手/车队或 reference 为 True 时同时更新参考数据版本
+        """
+        tags = [season_tag(season_year)]
+        tags.extend(race_tag(race.id) for race in races)
+        if change_set is not None:
+            for column, make_tag in CACHE_TAGS_BY_KEY_COLUMN.items():
+                if column in change_set.key_columns:
+                    tags.extend(make_tag(value) for value in change_set.values(column))
+        invalidate_cache_tags(*tags)
+        created = self.identity_map.take_created()
+        bump_data_version(season_year, reference=reference or created > 0)
+    
+    def _rollback(self):
+        """回滚事务，身份映射中未提交的登记一并丢弃"""
+        self.db.rollback()
+        self.identity_map.reset()
+    
+    def _scope_label(self, season_year: int, round_number: Optional[int] = None) -> str:
+        """日志中使用的同步范围描述"""
+        if round_number is None:
+            return f"{season_year} 赛季"
+        return f"{season_year} 赛季第 {round_number} 轮"
+    
+    def _season_races(
+        self,
+        season_year: int,
+        round_number: Optional[int] = None,
+        sprint_only: bool = False
+    ) -> List[Race]:
+        """获取赛季（或其中一轮）的比赛记录"""
+        query = self.db.query(Race).join(Season).filter(Season.year == season_year)
+        if round_number is not None:
+            query = query.filter(Race.round_number == round_number)
+        if sprint_only:
+            query = query.filter(Race.is_sprint == True)
+        return query.all()
+    
+    def _fetch_prepared(
+        self,
+        func,
+        columns: Sequence[ColumnSpec],
+        season_year: int,
+        round_number: Optional[int] = None
+    ) -> Optional[PreparedFrame]:
+        """获取 Ergast 数据并完成字段转换（不访问数据库，可在工作线程中执行）"""
+        df = self._handle_api_call(func, season=season_year, round=round_number)
+        if df is None or df.empty:
             return None
         
-        # 处理 constructorId 可能是列表的情况（如积分榜数据）
-        if isinstance(constructor_id, list):
-            if len(constructor_id) > 0:
-                constructor_id = constructor_id[0]  # 取第一个车队
-            else:
-                return None
-        
-        constructor = self.db.query(Constructor).filter(Constructor.constructor_id == constructor_id).first()
-        if not constructor:
-            # 获取2025赛季作为默认赛季
-            season_2025 = self.db.query(Season).filter(Season.year == 2025).first()
-            if not season_2025:
-                logger.error("找不到2025赛季记录")
-                return None
-            
-            # 创建新车队
-            constructor = Constructor(
-                constructor_id=constructor_id,
-                constructor_url=row.get('constructorUrl', ''),
-                constructor_name=row.get('constructorName', ''),
-                constructor_nationality=row.get('constructorNationality', ''),
-                season_id=season_2025.id
-            )
-            self.db.add(constructor)
-            self.db.commit()
+        cache_entry = self.response_cache.store(
+            func.__name__, season_year, round_number, df, pages=df.attrs.get('pages', 1)
+        )
+        return prepare(df, columns, cache_entry)
+    
+    def _is_unchanged(self, prepared: PreparedFrame, model, *criteria) -> bool:
+        """
+        上游数据与上次写入数据库时相同，且数据库中已有对应记录
+        （数据库被清空后即使哈希相同也会重新写入）
+        """
+        entry = prepared.cache_entry
+        if not self.skip_unchanged or entry is None or not entry.is_applied:
+            return False
+        return self.db.query(model.id).filter(*criteria).first() is not None
+    
+    def _mark_applied(self, prepared: PreparedFrame):
+        """记录该响应内容已写入数据库"""
+        entry = prepared.cache_entry
+        if entry is not None:
+            self.response_cache.mark_applied(entry.endpoint, entry.season, entry.round, entry.content_hash)
+    
+    def _select_results(
+        self,
+        prepared: PreparedFrame,
+        races: List[Race],
+        season_year: int,
+        label: str
+    ) -> List[Dict[str, Any]]:
+        """
+        为整个结果数据解析 race_id/driver_id/constructor_id
+        缺失的车手和车队一次性批量创建，无法关联到比赛的行会被丢弃
+        """
+        self.identity_map.ensure_entities(prepared.frame, self.identity_map.season_id(season_year))
+        
+        race_ids = {r.round_number: r.id for r in races}
+        rounds = pd.to_numeric(prepared.frame['round'], errors='coerce')
+        race_id = rounds.map(race_ids)
+        
+        missing_rounds = sorted(rounds[race_id.isna()].dropna().astype(int).unique())
+        if missing_rounds:
+            rounds_text = ", ".join(str(r) for r in missing_rounds)
+            logger.warning(f"⚠️ 未找到赛季 {season_year} 第 {rounds_text} 轮的比赛记录，跳过{label}同步")
+        
+        driver_id = prepared.frame['driverId']
+        valid = (
+            race_id.notna()
+            & driver_id.isin(self.identity_map.driver_ids)
+            & prepared.constructor_ids.isin(self.identity_map.constructor_ids)
+        )
+        
+        logger.info(f"🔄 处理{label}: {rounds[valid].nunique()} 轮, {int(valid.sum())} 条记录")
+        return prepared.select(valid, {
+            'race_id': to_int(race_id),
+            'driver_id': driver_id,
+            'constructor_id': prepared.constructor_ids,
+        })
+    
+    def _pipeline_fetch(self, stage: str, season_year: int) -> Any:
+        """流水线获取阶段：请求并转换一个赛季的一类数据（工作线程中执行，不访问数据库）"""
+        if stage == "races":
+            return self._fetch_schedule(season_year)
+        
+        func_name, columns = PIPELINE_FETCHERS[stage]
+        return self._fetch_prepared(getattr(self.ergast, func_name), columns, season_year)
+    
+    def _pipeline_write(self, stage: str, season_year: int, data: Any) -> bool:
+        """流水线写入阶段：在主线程中按顺序写入数据库"""
+        if stage == "races":
+            return bool(self.sync_races(season_year, schedule=data))
         
-        return constructor
+        sync_method = getattr(self, f"sync_{stage}")
+        return sync_method(season_year, prepared=data)
     
-    def sync_all_data(self, target_seasons: Optional[List[int]] = None):
+    def _sync_seasons_pipeline(self, target_seasons: List[int], max_workers: int) -> Dict[int, Dict[str, bool]]:
+        """
+        流水线模式同步多个赛季的动态数据
+        - 获取和转换：线程池并发执行，并发度由全局令牌桶限流
+        - 写入：主线程按赛季、按数据类型顺序执行（比赛日程先于结果写入）
+        """
+        results: Dict[int, Dict[str, bool]] = {year: {} for year in target_seasons}
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync-fetch") as pool:
+            # 按赛季顺序提交，靠前赛季的数据优先获取
+            futures = {
+                (year, stage): pool.submit(self._pipeline_fetch, stage, year)
+                for year in target_seasons
+                for stage in PIPELINE_STAGES
+            }
+            
+            for year in target_seasons:
+                logger.info(f"▶️ 开始写入赛季: {year}")
+                for stage in PIPELINE_STAGES:
+                    try:
+                        data = futures[(year, stage)].result()
+                    except Exception as e:
+                        logger.error(f"❌ 获取 {year} 赛季 {stage} 数据失败: {e}", exc_info=True)
+                        results[year][stage] = False
+                        continue
+                    
+                    results[year][stage] = self._pipeline_write(stage, year, data)
+                
+                logger.info(f"✅ 赛季 {year} 处理完成: {results[year]}")
+        
+        return results
+    
+    def plan_sync(
+        self,
+        target_seasons: Optional[List[int]] = None,
+        max_workers: Optional[int] = None
+    ) -> SyncPlan:
+        """
+        生成同步计划（dry-run）
+        只读取数据库和本地响应缓存清单，不请求上游 API
+        """
+        planner = SyncPlanner(self.db, self.response_cache)
+        return planner.plan(target_seasons or TARGET_SEASONS, max_workers)
+    
+    def sync_all_data(
+        self,
+        target_seasons: Optional[List[int]] = None,
+        pipeline: bool = True,
+        max_workers: Optional[int] = None,
+        dry_run: bool = False
+    ) -> Optional[SyncPlan]:
         """
         完整数据同步流程
         1. 同步核心静态数据（赛季、赛道、车队、车手）
         2. 遍历指定赛季，同步动态数据（比赛、结果、积分榜）
+        
+        Args:
+            target_seasons: 目标赛季，默认为 TARGET_SEASONS
+            pipeline: 使用流水线模式（并发获取和转换，按赛季顺序写入）
+            max_workers: 流水线获取阶段的线程数，默认读取配置
+            dry_run: 只输出同步计划，不请求 API、不写入数据库
+        
+        Returns:
+            Optional[SyncPlan]: dry_run 时返回同步计划
         """
         if target_seasons is None:
             target_seasons = TARGET_SEASONS
         
+        if dry_run:
+            plan = self.plan_sync(target_seasons, max_workers)
+            logger.info(plan.format())
+            return plan
+        
         logger.info(f"🚀 统一数据同步流程启动，目标赛季: {target_seasons}")
+        start_time = time.monotonic()
 
         try:
             # 步骤 1: 同步核心静态数据
@@ -837,26 +1232,31 @@ class UnifiedSyncService:
             self.db.commit()
             
             # 步骤 3: 遍历赛季，同步动态数据
-            for year in target_seasons:
-                logger.info(f"▶️ 开始处理赛季: {year}")
-                
-                # 同步比赛日程，这将激活赛道
-                self.sync_races(year)
-                
-                # 同步各类比赛结果和积分榜
-                self.sync_race_results(year)
-                self.sync_qualifying_results(year)
-                self.sync_sprint_results(year)
-                self.sync_driver_standings(year)
-                self.sync_constructor_standings(year)
-                
-                logger.info(f"✅ 赛季 {year} 处理完成")
+            if pipeline:
+                workers = max_workers or settings.sync_pipeline_workers
+                logger.info(f"⚡ 使用流水线模式，获取线程数: {workers}")
+                self._sync_seasons_pipeline(target_seasons, workers)
+            else:
+                for year in target_seasons:
+                    logger.info(f"▶️ 开始处理赛季: {year}")
+                    
+                    # 同步比赛日程，这将激活赛道
+                    self.sync_races(year)
+                    
+                    # 同步各类比赛结果和积分榜
+                    self.sync_race_results(year)
+                    self.sync_qualifying_results(year)
+                    self.sync_sprint_results(year)
+                    self.sync_driver_standings(year)
+                    self.sync_constructor_standings(year)
+                    
+                    logger.info(f"✅ 赛季 {year} 处理完成")
 
-            logger.info("🎉 恭喜！所有指定赛季的数据同步成功！")
+            logger.info(f"🎉 恭喜！所有指定赛季的数据同步成功！耗时 {time.monotonic() - start_time:.1f} 秒")
 
         except Exception as e:
             logger.error(f"❌ 统一数据同步流程失败: {e}", exc_info=True)
-            self.db.rollback()
+            self._rollback()
         finally:
             self.db.close()
-            logger.info("🔒 数据库会话已关闭") 
\ No newline at end of file
+            logger.info("🔒 数据库会话已关闭")
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 from .celery_app import celery_app
 from ..core.database import get_db
 from ..services.unified_sync_service import UnifiedSyncService
+from ..services.cache_warmer import CacheWarmer
 from ..models import Race, Season
 
 logger = logging.getLogger(__name__)
@@ -42,10 +43,10 @@ def sync_race_results_task(self, season_year: int, race_round: int) -> Dict[str,
         db = next(get_db())
         
         # 创建同步服务
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
         # 同步比赛结果
-        success = sync_service.sync_race_results(season_year)
+        success = sync_service.sync_race_results(season_year, race_round)
         
         result = {
             "task": "sync_race_results",
@@ -78,9 +79,9 @@ def sync_qualifying_results_task(self, season_year: int, race_round: int) -> Dic
     
     try:
         db = next(get_db())
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
-        success = sync_service.sync_qualifying_results(season_year)
+        success = sync_service.sync_qualifying_results(season_year, race_round)
         
         result = {
             "task": "sync_qualifying_results",
@@ -113,9 +114,9 @@ def sync_sprint_results_task(self, season_year: int, race_round: int) -> Dict[st
     
     try:
         db = next(get_db())
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
-        success = sync_service.sync_sprint_results(season_year)
+        success = sync_service.sync_sprint_results(season_year, race_round)
         
         result = {
             "task": "sync_sprint_results",
@@ -148,9 +149,9 @@ def sync_driver_standings_task(self, season_year: int, race_round: int) -> Dict[
     
     try:
         db = next(get_db())
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
-        success = sync_service.sync_driver_standings(season_year)
+        success = sync_service.sync_driver_standings(season_year, race_round)
         
         result = {
             "task": "sync_driver_standings", 
@@ -183,9 +184,9 @@ def sync_constructor_standings_task(self, season_year: int, race_round: int) ->
     
     try:
         db = next(get_db())
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
-        success = sync_service.sync_constructor_standings(season_year)
+        success = sync_service.sync_constructor_standings(season_year, race_round)
         
         result = {
             "task": "sync_constructor_standings",
@@ -209,6 +210,33 @@ def sync_constructor_standings_task(self, season_year: int, race_round: int) ->
         db.close()
 
 
+@celery_app.task(bind=True, base=CallbackTask, queue="data_sync")
+def backfill_standings_snapshots_task(self, season_year: int, force: bool = False) -> Dict[str, Any]:
+    """
+    回填赛季每轮积分榜快照任务
+    """
+    logger.info(f"开始回填 {season_year} 赛季积分榜快照...")
+    
+    try:
+        db = next(get_db())
+        sync_service = UnifiedSyncService(db)
+        
+        stats = sync_service.backfill_standings_snapshots(season_year, force=force)
+        
+        return {
+            "task": "backfill_standings_snapshots",
+            "season_year": season_year,
+            "stats": {table: s.to_dict() for table, s in stats.items()},
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ 回填积分榜快照时发生错误: {e}")
+        raise self.retry(exc=e, countdown=300, max_retries=3)
+    finally:
+        db.close()
+
+
 @celery_app.task(bind=True, base=CallbackTask, queue="data_sync")
 def sync_all_post_race_data_task(self, season_year: int, race_round: int) -> Dict[str, Any]:
     """
@@ -229,12 +257,12 @@ def sync_all_post_race_data_task(self, season_year: int, race_round: int) -> Dic
     
     try:
         db = next(get_db())
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
         # 1. 同步比赛结果
         logger.info("1️⃣ 同步比赛结果...")
         try:
-            race_success = sync_service.sync_race_results(season_year)
+            race_success = sync_service.sync_race_results(season_year, race_round)
             results["subtasks"]["race_results"] = {
                 "success": race_success,
                 "timestamp": datetime.utcnow().isoformat()
@@ -249,7 +277,7 @@ def sync_all_post_race_data_task(self, season_year: int, race_round: int) -> Dic
         # 2. 同步排位赛结果
         logger.info("2️⃣ 同步排位赛结果...")
         try:
-            quali_success = sync_service.sync_qualifying_results(season_year)
+            quali_success = sync_service.sync_qualifying_results(season_year, race_round)
             results["subtasks"]["qualifying_results"] = {
                 "success": quali_success,
                 "timestamp": datetime.utcnow().isoformat()
@@ -270,7 +298,7 @@ def sync_all_post_race_data_task(self, season_year: int, race_round: int) -> Dic
             
             if race and race.is_sprint:
                 logger.info("3️⃣ 检测到冲刺赛，同步冲刺赛结果...")
-                sprint_success = sync_service.sync_sprint_results(season_year)
+                sprint_success = sync_service.sync_sprint_results(season_year, race_round)
                 results["subtasks"]["sprint_results"] = {
                     "success": sprint_success,
                     "timestamp": datetime.utcnow().isoformat()
@@ -288,7 +316,7 @@ def sync_all_post_race_data_task(self, season_year: int, race_round: int) -> Dic
         # 4. 同步车手积分榜
         logger.info("4️⃣ 同步车手积分榜...")
         try:
-            driver_standings_success = sync_service.sync_driver_standings(season_year)
+            driver_standings_success = sync_service.sync_driver_standings(season_year, race_round)
             results["subtasks"]["driver_standings"] = {
                 "success": driver_standings_success,
                 "timestamp": datetime.utcnow().isoformat()
@@ -303,7 +331,7 @@ def sync_all_post_race_data_task(self, season_year: int, race_round: int) -> Dic
         # 5. 同步车队积分榜
         logger.info("5️⃣ 同步车队积分榜...")
         try:
-            constructor_standings_success = sync_service.sync_constructor_standings(season_year)
+            constructor_standings_success = sync_service.sync_constructor_standings(season_year, race_round)
             results["subtasks"]["constructor_standings"] = {
                 "success": constructor_standings_success,
                 "timestamp": datetime.utcnow().isoformat()
@@ -315,6 +343,15 @@ def sync_all_post_race_data_task(self, season_year: int, race_round: int) -> Dic
             results["subtasks"]["constructor_standings"] = {"success": False, "error": str(e)}
             results["overall_success"] = False
         
+        # 6. 预热受影响的接口缓存（失败不影响同步结果）
+        if results["overall_success"]:
+            logger.info("6️⃣ 预热接口缓存...")
+            try:
+                results["cache_warming"] = CacheWarmer(db).warm(season_year, race_round).to_dict()
+            except Exception as e:
+                logger.error(f"缓存预热失败: {e}")
+                results["cache_warming"] = {"success": False, "error": str(e)}
+        
         # 完成时间
         end_time = datetime.utcnow()
         results["end_time"] = end_time.isoformat()
@@ -354,7 +391,7 @@ def sync_post_race_data(self, season_year: int, race_round: int = None):
         # 1. 排位赛结果
         logger.info("🚥 同步排位赛结果...")
         try:
-            results['qualifying'] = service.sync_qualifying_results(season_year)
+            results['qualifying'] = service.sync_qualifying_results(season_year, race_round)
             logger.info(f"   排位赛结果: {'✅ 成功' if results['qualifying'] else '⏳ 暂无数据'}")
         except Exception as e:
             results['qualifying'] = False
@@ -363,7 +400,7 @@ def sync_post_race_data(self, season_year: int, race_round: int = None):
         # 2. 比赛结果
         logger.info("🏁 同步比赛结果...")
         try:
-            results['race'] = service.sync_race_results(season_year)
+            results['race'] = service.sync_race_results(season_year, race_round)
             logger.info(f"   比赛结果: {'✅ 成功' if results['race'] else '⏳ 暂无数据'}")
         except Exception as e:
             results['race'] = False
@@ -372,7 +409,7 @@ def sync_post_race_data(self, season_year: int, race_round: int = None):
         # 3. 冲刺赛结果
         logger.info("🏃 同步冲刺赛结果...")
         try:
-            results['sprint'] = service.sync_sprint_results(season_year)
+            results['sprint'] = service.sync_sprint_results(season_year, race_round)
             logger.info(f"   冲刺赛结果: {'✅ 成功' if results['sprint'] else '⏳ 暂无数据'}")
         except Exception as e:
             results['sprint'] = False
@@ -381,7 +418,7 @@ def sync_post_race_data(self, season_year: int, race_round: int = None):
         # 4. 车手积分榜
         logger.info("🏆 同步车手积分榜...")
         try:
-            results['driver_standings'] = service.sync_driver_standings(season_year)
+            results['driver_standings'] = service.sync_driver_standings(season_year, race_round)
             logger.info(f"   车手积分榜: {'✅ 成功' if results['driver_standings'] else '⏳ 暂无数据'}")
         except Exception as e:
             results['driver_standings'] = False
@@ -390,7 +427,7 @@ def sync_post_race_data(self, season_year: int, race_round: int = None):
         # 5. 车队积分榜
         logger.info("🏁 同步车队积分榜...")
         try:
-            results['constructor_standings'] = service.sync_constructor_standings(season_year)
+            results['constructor_standings'] = service.sync_constructor_standings(season_year, race_round)
             logger.info(f"   车队积分榜: {'✅ 成功' if results['constructor_standings'] else '⏳ 暂无数据'}")
         except Exception as e:
             results['constructor_standings'] = False
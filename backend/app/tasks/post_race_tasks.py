@@ -56,7 +56,7 @@ def execute_post_race_sync(
         db = next(get_db())
         
         # 创建同步服务
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         
         # 执行同步尝试
         status, results = sync_service.execute_sync_attempt(
@@ -136,7 +136,7 @@ def schedule_race_post_sync(
             }
         
         # 创建同步服务
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         
         # 安排同步计划
         schedule = sync_service.schedule_post_race_sync(race, retry_intervals)
@@ -208,7 +208,7 @@ def monitor_pending_syncs(self) -> Dict[str, Any]:
         db = next(get_db())
         
         # 创建同步服务
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         
         # 获取待执行的同步任务
         pending_syncs = sync_service.get_pending_syncs()
@@ -272,7 +272,7 @@ def cleanup_expired_schedules(self) -> Dict[str, Any]:
         db = next(get_db())
         
         # 创建同步服务
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         
         # 清理过期计划
         cleaned_count = sync_service.cleanup_expired_schedules()
@@ -324,7 +324,7 @@ def batch_schedule_upcoming_races(
         db = next(get_db())
         
         # 创建同步服务
-        sync_service = PostRaceSyncService(db, cache_dir="./cache")
+        sync_service = PostRaceSyncService(db)
         
         # 查找即将到来的比赛
         from datetime import timedelta
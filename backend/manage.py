@@ -172,6 +172,88 @@ def sync_circuit_details():
         raise typer.Exit(1)
 
 
+@sync_app.command("plan")
+def plan_sync(
+    seasons: Optional[List[int]] = typer.Option(
+        None, "--season", help="指定要同步的赛季年份"
+    ),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", help="获取线程数"
+    ),
+    as_json: bool = typer.Option(
+        False, "--json", help="以 JSON 格式输出"
+    )
+):
+    """查看同步计划（dry-run，不请求 API、不写入数据库）"""
+    try:
+        from scripts.plan_sync import main as plan_main
+
+        args = []
+        if seasons:
+            args.extend(["--seasons"] + [str(s) for s in seasons])
+        if workers:
+            args.extend(["--workers", str(workers)])
+        if as_json:
+            args.append("--json")
+
+        plan_main(args)
+    except Exception as e:
+        typer.echo(f"❌ 生成同步计划失败: {e}", err=True)
+        raise typer.Exit(1)
+
+
+@sync_app.command("snapshots")
+def backfill_standings_snapshots(
+    seasons: Optional[List[int]] = typer.Option(
+        None, "--season", help="指定要回填的赛季年份"
+    ),
+    force: bool = typer.Option(
+        False, "--force", help="重新获取已存在快照的轮次"
+    )
+):
+    """回填每轮积分榜快照"""
+    try:
+        from scripts.backfill_standings_snapshots import main as backfill_main
+
+        args = []
+        if seasons:
+            args.extend(["--seasons"] + [str(s) for s in seasons])
+        if force:
+            args.append("--force")
+
+        backfill_main(args)
+        typer.echo("✅ 积分榜快照回填完成")
+    except Exception as e:
+        typer.echo(f"❌ 回填积分榜快照失败: {e}", err=True)
+        raise typer.Exit(1)
+
+
+@sync_app.command("warm-cache")
+def warm_cache(
+    season: int = typer.Option(..., "--season", help="赛季年份"),
+    race_round: Optional[int] = typer.Option(
+        None, "--round", help="轮次（预热该轮的领奖台）"
+    ),
+    concurrency: Optional[int] = typer.Option(
+        None, "--concurrency", help="并发数"
+    )
+):
+    """预热赛季/轮次的热点接口缓存"""
+    try:
+        from scripts.warm_cache import main as warm_main
+
+        args = ["--season", str(season)]
+        if race_round is not None:
+            args.extend(["--round", str(race_round)])
+        if concurrency:
+            args.extend(["--concurrency", str(concurrency)])
+
+        warm_main(args)
+    except Exception as e:
+        typer.echo(f"❌ 缓存预热失败: {e}", err=True)
+        raise typer.Exit(1)
+
+
 @sync_app.command("post-race")
 def post_race_sync(
     race_id: Optional[int] = typer.Option(
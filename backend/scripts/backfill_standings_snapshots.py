@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+积分榜快照回填脚本
+逐轮获取 Ergast 积分榜，填充每轮结束后的车手/车队积分榜快照
+
+用法: python scripts/backfill_standings_snapshots.py --seasons 2023 2024 2025 [--rounds 1 2 3] [--force]
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import get_db
+from app.services.unified_sync_service import UnifiedSyncService, TARGET_SEASONS
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='积分榜快照回填工具')
+    parser.add_argument(
+        '--seasons',
+        nargs='+',
+        type=int,
+        default=TARGET_SEASONS,
+        help=f'要回填的赛季列表 (默认: {" ".join(str(s) for s in TARGET_SEASONS)})'
+    )
+    parser.add_argument(
+        '--rounds',
+        nargs='+',
+        type=int,
+        default=None,
+        help='只回填指定轮次 (默认: 已有比赛结果的所有轮次)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='重新获取已存在快照的轮次'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    args = parse_arguments(argv)
+    logger.info(f"🚀 开始回填积分榜快照，赛季: {args.seasons}")
+
+    db = next(get_db())
+    try:
+        sync_service = UnifiedSyncService(db)
+        for season_year in args.seasons:
+            sync_service.backfill_standings_snapshots(season_year, rounds=args.rounds, force=args.force)
+        logger.info("✅ 积分榜快照回填完成！")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+缓存编码性能基准
+用数据库中真实的积分榜、积分走势和比赛列表响应，对比各编码器/压缩算法组合的
+缓存值大小和编码/解码耗时，并校验解码后按返回值类型还原的结果与原响应一致
+
+用法: python scripts/benchmark_cache_codecs.py [--year 2025] [--repeat 200]
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.v1.endpoints import races, standings
+from app.core.cache_codecs import CODECS, COMPRESSORS, CacheSerializer
+from app.core.database import SessionLocal
+from app.schemas.base import ApiResponse, PageResponse
+from app.schemas.race import RaceResponse
+from app.schemas.standings import (
+    DriverStandingResponse, ConstructorStandingResponse, StandingProgressionResponse,
+)
+
+
+def load_responses(year: int) -> List[Dict[str, Any]]:
+    """直接调用端点的原函数（绕过缓存）获取真实响应"""
+    cases = [
+        ("车手积分榜", standings.get_driver_standings,
+         dict(season_id=None, year=year), ApiResponse[List[DriverStandingResponse]]),
+        ("车队积分榜", standings.get_constructor_standings,
+         dict(season_id=None, year=year), ApiResponse[List[ConstructorStandingResponse]]),
+        ("车手积分走势", standings.get_driver_standings_progression,
+         dict(season_id=None, year=year, driver_id=None), ApiResponse[StandingProgressionResponse]),
+        ("赛季比赛列表", races.get_races,
+         dict(season=year, page=1, size=30, cursor=None, include_total=False, fields=None),
+         PageResponse[List[RaceResponse]]),
+    ]
+
+    db = SessionLocal()
+    try:
+        responses = []
+        for name, endpoint, params, model in cases:
+            result = endpoint.__wrapped__(db=db, **params)
+            if not result.data:
+                print(f"⚠️ {name} 没有数据，跳过")
+                continue
+            responses.append({"name": name, "value": jsonable_encoder(result), "model": model})
+        return responses
+    finally:
+        db.close()
+
+
+def timeit(func: Callable, repeat: int) -> float:
+    """返回多次运行耗时的中位数（微秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存编码性能基准")
+    parser.add_argument("--year", type=int, default=2025, help="使用的赛季年份")
+    parser.add_argument("--repeat", type=int, default=200, help="重复次数")
+    args = parser.parse_args()
+
+    responses = load_responses(args.year)
+    if not responses:
+        print(f"❌ 数据库中没有 {args.year} 赛季的数据，请先同步数据")
+        sys.exit(1)
+
+    combos = [
+        (codec, compressor)
+        for codec in CODECS.values() if codec.available
+        for compressor in COMPRESSORS.values() if compressor.available
+    ]
+    skipped = [name for name, item in {**CODECS, **COMPRESSORS}.items() if not item.available]
+    if skipped:
+        print(f"ℹ️ 未安装，跳过: {', '.join(skipped)}")
+
+    failures = 0
+    for response in responses:
+        adapter = TypeAdapter(response["model"])
+        value = response["value"]
+        # 按返回值类型序列化后的结果，即接口实际输出的 JSON
+        expected = adapter.dump_python(adapter.validate_python(value), mode="json")
+        print(f"\n📊 {response['name']}")
+        print(f"  {'编码':<8} {'压缩':<6} {'字节数':>8} {'编码 µs':>10} {'解码+还原 µs':>14}")
+
+        for codec, compressor in combos:
+            # 阈值为 0，所有响应都会压缩
+            serializer = CacheSerializer(codec.name, compressor.name, threshold=0)
+            payload = serializer.dumps(value, 0.0)
+
+            decoded, _ = serializer.loads(payload)
+            restored = adapter.validate_python(decoded)
+            if decoded != value or adapter.dump_python(restored, mode="json") != expected:
+                print(f"  ❌ {codec.name}/{compressor.name} 往返后与原响应不一致")
+                failures += 1
+                continue
+
+            encode_us = timeit(lambda: serializer.dumps(value, 0.0), args.repeat)
+            decode_us = timeit(lambda: adapter.validate_python(serializer.loads(payload)[0]), args.repeat)
+            print(
+                f"  {codec.name:<8} {compressor.name:<6} {len(payload):>8} "
+                f"{encode_us:>10.1f} {decode_us:>14.1f}"
+            )
+
+    if failures:
+        print(f"\n❌ {failures} 个组合往返校验失败")
+        sys.exit(1)
+    print("\n✅ 所有组合往返后均还原为相同的类型化响应")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+结果转换性能基准
+对比逐行 safe_* 转换与向量化列映射转换一个完整赛季比赛结果的耗时，
+并校验两种方式输出的记录完全一致
+
+用法: python scripts/benchmark_result_transform.py [--rounds 24] [--repeat 20]
+"""
+
+import sys
+import glob
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+import pandas as pd
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.result_transformer import transform, RESULT_COLUMNS
+
+DATA_DIR = project_root / "fastF1_data"
+TIMEDELTA_COLUMNS = ["totalRaceTime", "fastestLapTime"]
+
+
+def load_season(rounds: int) -> pd.DataFrame:
+    """用 fastF1_data 中的样例数据拼出一个完整赛季的比赛结果"""
+    files = sorted(glob.glob(str(DATA_DIR / "2025_race_results_content_*.csv")))
+    if not files:
+        raise FileNotFoundError(f"{DATA_DIR} 中没有比赛结果样例数据")
+
+    samples = [pd.read_csv(f) for f in files]
+    frames = []
+    for round_number in range(1, rounds + 1):
+        df = samples[(round_number - 1) % len(samples)].copy()
+        df["round"] = round_number
+        frames.append(df)
+
+    season_df = pd.concat(frames, ignore_index=True)
+    # 与 Ergast 接口返回的类型保持一致
+    for column in TIMEDELTA_COLUMNS:
+        season_df[column] = pd.to_timedelta(season_df[column], errors="coerce")
+    return season_df
+
+
+def legacy_transform(df: pd.DataFrame):
+    """原逐行转换实现"""
+    records = []
+    for _, row in df.iterrows():
+        def safe_int(value):
+            try: return int(value)
+            except (ValueError, TypeError): return None
+
+        def safe_float(value):
+            try: return float(value)
+            except (ValueError, TypeError): return None
+
+        def safe_str(value):
+            return str(value) if pd.notna(value) else None
+
+        records.append(dict(
+            number=safe_int(row.get('number')), position=safe_int(row.get('position')),
+            position_text=safe_str(row.get('positionText')), points=safe_float(row.get('points')),
+            grid=safe_int(row.get('grid')), laps=safe_int(row.get('laps')),
+            status=safe_str(row.get('status')),
+            total_race_time_millis=safe_int(row.get('totalRaceTimeMillis')),
+            total_race_time=safe_str(row.get('totalRaceTime')),
+            fastest_lap_rank=safe_int(row.get('fastestLapRank')),
+            fastest_lap_number=safe_int(row.get('fastestLapNumber')),
+            fastest_lap_time=safe_str(row.get('fastestLapTime'))
+        ))
+    return records
+
+
+def timeit(func, repeat: int) -> float:
+    """返回多次运行耗时的中位数（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="结果转换性能基准")
+    parser.add_argument("--rounds", type=int, default=24, help="赛季轮次数")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数")
+    args = parser.parse_args()
+
+    season_df = load_season(args.rounds)
+    print(f"📊 样例赛季: {args.rounds} 轮, {len(season_df)} 条记录")
+
+    legacy = legacy_transform(season_df)
+    vectorized = transform(season_df, RESULT_COLUMNS)
+
+    # 逐行实现对 NaN 的整数转换会得到 None（int(nan) 抛出 ValueError），两者应完全一致
+    mismatches = [i for i, (a, b) in enumerate(zip(legacy, vectorized)) if a != b]
+    if mismatches or len(legacy) != len(vectorized):
+        i = mismatches[0] if mismatches else 0
+        print(f"❌ 输出不一致 ({len(mismatches)} 条)，示例:\n  逐行: {legacy[i]}\n  向量化: {vectorized[i]}")
+        sys.exit(1)
+    print("✅ 两种实现输出一致")
+
+    legacy_ms = timeit(lambda: legacy_transform(season_df), max(1, args.repeat // 4))
+    vectorized_ms = timeit(lambda: transform(season_df, RESULT_COLUMNS), args.repeat)
+
+    print(f"⏱️ 逐行转换:   {legacy_ms:8.2f} ms")
+    print(f"⚡ 向量化转换: {vectorized_ms:8.2f} ms")
+    print(f"🚀 加速比: {legacy_ms / vectorized_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
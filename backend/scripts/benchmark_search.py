@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+车手/车队搜索基准测试
+对比原来的 ilike('%q%') 查询和进程内搜索索引的耗时，并检查重音、拼写错误的查询能否找到目标：
+- 索引查询只访问内存（和 Redis 中的数据版本），p99 应低于 5 ms
+- 重音（Perez -> Pérez）、大小写和拼写错误（verstapen）都能命中
+
+需要可用的 PostgreSQL 和 Redis（读取 .env 配置）
+
+用法: python scripts/benchmark_search.py [--repeat 200]
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import SessionLocal
+from app.models import Constructor, Driver
+from app.api.v1.endpoints.drivers import DRIVER_SEARCH
+from app.api.v1.endpoints.constructors import CONSTRUCTOR_SEARCH
+
+# 输入联想的典型查询
+TYPEAHEAD_QUERIES = ["v", "ver", "ham", "lec", "nor", "pia", "sai", "alo", "hul", "per"]
+
+# (查询, 预期命中的 driver_id)：重音、大小写和拼写错误
+DRIVER_CASES = [
+    ("Hulkenberg", "hulkenberg"),
+    ("hülk", "hulkenberg"),
+    ("PEREZ", "perez"),
+    ("verstapen", "max_verstappen"),
+    ("lecler", "leclerc"),
+    ("hamiltn", "hamilton"),
+    ("max verst", "max_verstappen"),
+]
+
+CONSTRUCTOR_CASES = [
+    ("ferr", "ferrari"),
+    ("mclaern", "mclaren"),
+    ("red bul", "red_bull"),
+]
+
+# p99 上限（毫秒）
+P99_LIMIT_MS = 5.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(func: Callable, queries: List[str], repeat: int) -> List[float]:
+    """每个查询执行 repeat 次，返回每次的耗时（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            func(q)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> float:
+    p99 = percentile(timings, 99)
+    print(f"  {name:<18} p50 {statistics.median(timings):>7.3f} ms   p99 {p99:>7.3f} ms")
+    return p99
+
+
+def check_cases(index, db, model, cases, id_field: str) -> int:
+    """返回未命中的查询数量（预期结果需要排在前 3 位）"""
+    failures = 0
+    for query, expected in cases:
+        results = [item[id_field] for item in index.search(db, query, 10)]
+        if expected in results[:3]:
+            print(f"  ✅ {query!r} -> {results[:3]}")
+        elif db.get(model, expected) is None:
+            print(f"  ⚠️ {query!r}: 数据库中没有 {expected}，跳过")
+        else:
+            failures += 1
+            print(f"  ❌ {query!r} -> {results[:3]}，预期 {expected}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="车手/车队搜索基准测试")
+    parser.add_argument("--repeat", type=int, default=200, help="每个查询的重复次数")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if not db.query(Driver).first():
+            print("❌ 数据库中没有车手数据，请先同步数据")
+            sys.exit(1)
+
+        def ilike_drivers(q: str):
+            return db.query(Driver).filter(
+                (Driver.forename.ilike(f"%{q}%")) |
+                (Driver.surname.ilike(f"%{q}%")) |
+                (Driver.code.ilike(f"%{q}%"))
+            ).limit(10).all()
+
+        def ilike_constructors(q: str):
+            return db.query(Constructor).filter(Constructor.name.ilike(f"%{q}%")).limit(10).all()
+
+        # 首次查询构建索引
+        DRIVER_SEARCH.search(db, "a")
+        CONSTRUCTOR_SEARCH.search(db, "a")
+
+        print(f"🔎 输入联想查询，每个查询 {args.repeat} 次")
+        report("车手 ilike", measure(ilike_drivers, TYPEAHEAD_QUERIES, args.repeat))
+        driver_p99 = report("车手 索引", measure(lambda q: DRIVER_SEARCH.search(db, q), TYPEAHEAD_QUERIES, args.repeat))
+        report("车队 ilike", measure(ilike_constructors, TYPEAHEAD_QUERIES, args.repeat))
+        constructor_p99 = report(
+            "车队 索引", measure(lambda q: CONSTRUCTOR_SEARCH.search(db, q), TYPEAHEAD_QUERIES, args.repeat)
+        )
+
+        print("🔤 重音、大小写和拼写错误")
+        failures = check_cases(DRIVER_SEARCH, db, Driver, DRIVER_CASES, "driver_id")
+        failures += check_cases(CONSTRUCTOR_SEARCH, db, Constructor, CONSTRUCTOR_CASES, "constructor_id")
+    finally:
+        db.close()
+
+    if failures or max(driver_p99, constructor_p99) > P99_LIMIT_MS:
+        print(f"❌ 搜索未达标（未命中 {failures} 个查询，p99 上限 {P99_LIMIT_MS} ms）")
+        sys.exit(1)
+    print(f"🎉 搜索 p99 低于 {P99_LIMIT_MS} ms，所有查询均命中")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.database import SessionLocal
 from app.models import Driver, Constructor, Season, DriverSeason
+from app.core.cache import invalidate_cache_tags, season_tag
+from app.core.data_version import bump_data_version
+from app.services.standings_read_model import refresh_driver_standings_read
 
 def correct_driver_teams_for_2025():
     """
@@ -83,8 +86,11 @@ def correct_driver_teams_for_2025():
                 )
                 db.add(new_entry)
         
-        # 5. 提交更改到数据库
+        # 5. 重建积分榜读模型（官方指定车队已变化）并提交更改到数据库
+        refresh_driver_standings_read(db, season.id)
         db.commit()
+        invalidate_cache_tags(season_tag(season.year))
+        bump_data_version(season.year)
         print("\n数据修正完成！")
     finally:
         db.close()
@@ -29,7 +29,7 @@ def sync_to_database(db_url, db_name):
         # 重新创建数据库会话
         from app.core.database import SessionLocal
         db = SessionLocal()
-        sync_service = UnifiedSyncService(db=db, cache_dir="cache")
+        sync_service = UnifiedSyncService(db=db)
         
         season_to_sync = 2025
         success_count = 0
@@ -49,7 +49,7 @@ async def main(year_to_sync: int):
         db = next(get_db())
         
         # 创建统一同步服务
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
         # 初始化基础数据
         logger.info("📊 开始同步基础数据...")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+读接口并发压测
+先逐个请求测出单请求耗时，再以指定并发数压测，同时持续请求 /health 探测事件循环是否被阻塞：
+- 端点在事件循环中同步查询数据库时，并发请求被串行执行，p50 接近 单请求耗时 × 并发数
+- 查询放到线程池后，并发请求可以同时等待数据库，延迟远低于完全串行时的估计值
+带缓存的接口命中进程内缓存后不访问数据库，因此只压测不缓存的接口
+
+默认在进程内通过 ASGI 调用应用（需要可用的 PostgreSQL 和 Redis），
+也可以用 --base-url 压测已启动的服务（如 uvicorn --workers 1）
+
+用法: python scripts/load_test_endpoints.py [--year 2025] [--concurrency 20] [--requests 200]
+      python scripts/load_test_endpoints.py --base-url http://localhost:8000
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Driver, Race, Season
+
+# p50 超过完全串行估计值的该比例时视为请求被串行执行
+SERIALIZED_RATIO = 0.6
+
+# /health 探测的 p99 超过该值（毫秒）视为事件循环被阻塞
+HEALTH_P99_LIMIT_MS = 50
+
+
+def build_paths(year: int) -> List[str]:
+    """压测的接口：不缓存的详情、搜索和列表接口"""
+    db = SessionLocal()
+    try:
+        race = db.query(Race).join(Season).filter(Season.year == year).order_by(Race.round_number).first()
+        driver = db.query(Driver).first()
+    finally:
+        db.close()
+
+    if not race or not driver:
+        raise RuntimeError(f"数据库中没有 {year} 赛季的数据，请先同步数据")
+
+    api = settings.api_v1_str
+    return [
+        f"{api}/races/{race.id}",
+        f"{api}/drivers/{driver.driver_id}",
+        f"{api}/drivers/search?q={driver.surname[:3]}",
+        f"{api}/drivers/?page=1&size=50",
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.mean(latencies),
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+    }
+
+
+async def timed_get(client: httpx.AsyncClient, path: str) -> float:
+    """发送请求并返回耗时（毫秒），非 200 响应直接报错"""
+    start = time.perf_counter()
+    response = await client.get(path)
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} 返回 {response.status_code}: {response.text[:200]}")
+    return elapsed
+
+
+async def run_load(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> Dict[str, float]:
+    """以固定并发数发送 total 个请求，同时探测 /health"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(path)
+    latencies: List[float] = []
+    health: List[float] = []
+    done = asyncio.Event()
+
+    async def worker():
+        while not queue.empty():
+            latencies.append(await timed_get(client, queue.get_nowait()))
+
+    async def probe():
+        while not done.is_set():
+            health.append(await timed_get(client, "/health"))
+            await asyncio.sleep(0.01)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    stats = summarize(latencies)
+    stats["rps"] = total / wall
+    stats["health_p99"] = percentile(health, 99) if health else 0.0
+    return stats
+
+
+async def main_async(args) -> bool:
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        from app.main import app
+        transport, base_url = httpx.ASGITransport(app=app), "http://localhost"
+
+    passed = True
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        paths = build_paths(args.year)
+        # 预热：建立连接池、填充缓存
+        for path in paths:
+            await timed_get(client, path)
+
+        print(f"🏎️ 并发 {args.concurrency}，每个接口 {args.requests} 个请求")
+        print(f"{'接口':<48} {'单请求':>8} {'p50':>8} {'p99':>8} {'串行估计':>8} {'rps':>8} {'health p99':>11}")
+        for path in paths:
+            baseline = summarize([await timed_get(client, path) for _ in range(args.baseline)])
+            stats = await run_load(client, path, args.concurrency, args.requests)
+            # 完全串行时每个请求都要等前面排队的请求执行完
+            serialized = baseline["mean"] * args.concurrency
+            blocked = (
+                stats["p50"] > serialized * SERIALIZED_RATIO
+                or stats["health_p99"] > HEALTH_P99_LIMIT_MS
+            )
+            passed = passed and not blocked
+            mark = "❌" if blocked else "✅"
+            print(
+                f"{mark} {path:<46} {baseline['mean']:>7.1f}ms {stats['p50']:>7.1f}ms {stats['p99']:>7.1f}ms "
+                f"{serialized:>7.1f}ms {stats['rps']:>8.0f} {stats['health_p99']:>9.1f}ms"
+            )
+    return passed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="读接口并发压测")
+    parser.add_argument("--year", type=int, default=2025, help="压测使用的赛季年份")
+    parser.add_argument("--concurrency", type=int, default=20, help="并发请求数")
+    parser.add_argument("--requests", type=int, default=200, help="每个接口的请求总数")
+    parser.add_argument("--baseline", type=int, default=20, help="测量单请求耗时的顺序请求数")
+    parser.add_argument("--base-url", help="压测已启动的服务，默认在进程内调用应用")
+    args = parser.parse_args(argv)
+
+    if not asyncio.run(main_async(args)):
+        print("❌ 并发请求被串行执行，事件循环被阻塞")
+        sys.exit(1)
+    print("🎉 并发请求没有被串行执行，事件循环未被阻塞")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+同步计划脚本（dry-run）
+只读取数据库和本地响应缓存，输出需要写入的赛季/轮次/表、
+预计的 Ergast 请求页数和在当前限流预算下的预计耗时，不发起任何 API 请求
+
+用法: python scripts/plan_sync.py [--seasons 2024 2025] [--workers 4] [--json]
+"""
+
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import get_db
+from app.services.ergast_response_cache import ErgastResponseCache
+from app.services.sync_planner import SyncPlanner
+from app.services.unified_sync_service import TARGET_SEASONS
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='F1 数据同步计划')
+    parser.add_argument(
+        '--seasons',
+        nargs='+',
+        type=int,
+        default=TARGET_SEASONS,
+        help=f'要同步的赛季列表 (默认: {" ".join(str(s) for s in TARGET_SEASONS)})'
+    )
+    parser.add_argument('--workers', type=int, default=None, help='获取线程数 (默认读取配置)')
+    parser.add_argument('--json', action='store_true', help='以 JSON 格式输出')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    args = parse_arguments(argv)
+
+    db = next(get_db())
+    try:
+        # 直接使用计划器，避免初始化同步服务时启用 FastF1
+        plan = SyncPlanner(db, ErgastResponseCache()).plan(args.seasons, args.workers)
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(plan.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(plan.format())
+    return plan
+
+
+if __name__ == "__main__":
+    main()
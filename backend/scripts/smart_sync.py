@@ -51,7 +51,7 @@ def sync_to_database(db_url, db_name, season_year=2025, data_types=None):
         # 重新创建数据库会话
         from app.core.database import SessionLocal
         db = SessionLocal()
-        sync_service = UnifiedSyncService(db=db, cache_dir="cache")
+        sync_service = UnifiedSyncService(db=db)
         
         success_count = 0
         total_count = len(data_types)
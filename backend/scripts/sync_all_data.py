@@ -55,7 +55,7 @@ def main():
         db = next(get_db())
         
         # 创建统一同步服务
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
         # 同步连续三年的所有数据
         logger.info(f"🎯 同步目标赛季: {target_seasons}")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+批量读接口集成测试
+以比赛详情页为例（比赛、领奖台、车手积分榜、车队积分榜、赛道），断言：
+- 批量请求中每一项的状态码和响应数据与单独请求一致
+- 失败的子请求（不存在的比赛）只影响该项
+- 携带 etag 的子请求在数据未变化时返回 304
+并对比逐个请求和一次批量请求的耗时
+
+需要可用的 PostgreSQL 和 Redis（读取 .env 配置）
+
+用法: python scripts/test_batch_endpoint.py [--year 2025] [--repeat 20]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Race, Season
+
+# 每次请求都会变化的字段，比较前去除
+VOLATILE_FIELDS = ("timestamp",)
+
+
+def build_requests(year: int) -> List[Dict[str, Any]]:
+    """比赛详情页需要的子请求"""
+    db = SessionLocal()
+    try:
+        race = db.query(Race).join(Season).filter(Season.year == year).order_by(Race.round_number).first()
+    finally:
+        db.close()
+
+    if not race:
+        raise RuntimeError(f"数据库中没有 {year} 赛季的数据，请先同步数据")
+
+    api = settings.api_v1_str
+    return [
+        {"id": "race", "path": f"{api}/races/{race.id}"},
+        {"id": "podium", "path": f"{api}/races/{race.id}/podium"},
+        {"id": "driver_standings", "path": f"{api}/standings/drivers", "params": {"year": year}},
+        {"id": "constructor_standings", "path": f"{api}/standings/constructors", "params": {"year": year}},
+        {"id": "circuit", "path": f"{api}/circuits/{race.circuit_id}"},
+    ]
+
+
+def strip_volatile(body: Any) -> Any:
+    if isinstance(body, dict):
+        return {k: strip_volatile(v) for k, v in body.items() if k not in VOLATILE_FIELDS}
+    return body
+
+
+async def fetch_each(client: httpx.AsyncClient, requests: List[Dict[str, Any]]) -> Dict[str, httpx.Response]:
+    """页面当前的加载方式：逐个请求"""
+    return {item["id"]: await client.get(item["path"], params=item.get("params")) for item in requests}
+
+
+async def fetch_batch(client: httpx.AsyncClient, requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    response = await client.post(f"{settings.api_v1_str}/batch/", json={"requests": requests})
+    if response.status_code != 200:
+        raise RuntimeError(f"批量请求返回 {response.status_code}: {response.text[:200]}")
+    return {item["id"]: item for item in response.json()["data"]}
+
+
+async def check(client: httpx.AsyncClient, requests: List[Dict[str, Any]]) -> List[str]:
+    errors = []
+    single = await fetch_each(client, requests)
+    batched = await fetch_batch(client, requests)
+    for item in requests:
+        expected, actual = single[item["id"]], batched[item["id"]]
+        if actual["status"] != expected.status_code:
+            errors.append(f"{item['id']}: 状态码 {actual['status']}，单独请求为 {expected.status_code}")
+        elif strip_volatile(actual["body"]) != strip_volatile(expected.json()):
+            errors.append(f"{item['id']}: 响应数据与单独请求不一致")
+        else:
+            print(f"  ✅ {item['id']}: {actual['status']}")
+
+    # 失败的子请求只影响该项
+    missing = requests + [{"id": "missing", "path": f"{settings.api_v1_str}/races/0"}]
+    batched = await fetch_batch(client, missing)
+    if batched["missing"]["status"] != 404:
+        errors.append(f"不存在的比赛返回 {batched['missing']['status']}，预期 404")
+    if any(batched[item["id"]]["status"] != 200 for item in requests):
+        errors.append("一个子请求失败影响了其他子请求")
+
+    # 条件请求：带上 etag 的子请求返回 304
+    with_etag = [dict(item, etag=batched[item["id"]]["etag"]) for item in requests if batched[item["id"]]["etag"]]
+    if with_etag:
+        revalidated = await fetch_batch(client, with_etag)
+        not_modified = [key for key, item in revalidated.items() if item["status"] == 304]
+        print(f"  ✅ 携带 etag 的 {len(with_etag)} 个子请求中 {len(not_modified)} 个返回 304")
+        if len(not_modified) != len(with_etag):
+            errors.append("携带 etag 的子请求没有返回 304")
+    return errors
+
+
+async def main_async(args) -> bool:
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        from app.main import app
+        transport, base_url = httpx.ASGITransport(app=app), "http://localhost"
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        requests = build_requests(args.year)
+        print(f"🧪 比赛详情页的 {len(requests)} 个请求")
+        errors = await check(client, requests)
+        for error in errors:
+            print(f"  ❌ {error}")
+
+        each, batch = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await fetch_each(client, requests)
+            each.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            await fetch_batch(client, requests)
+            batch.append((time.perf_counter() - start) * 1000)
+        print(f"⏱️ 逐个请求 p50 {statistics.median(each):.1f} ms，批量请求 p50 {statistics.median(batch):.1f} ms")
+        return not errors
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="批量读接口集成测试")
+    parser.add_argument("--year", type=int, default=2025, help="测试使用的赛季年份")
+    parser.add_argument("--repeat", type=int, default=20, help="计时的重复次数")
+    parser.add_argument("--base-url", help="测试已启动的服务，默认在进程内调用应用")
+    args = parser.parse_args(argv)
+
+    if not asyncio.run(main_async(args)):
+        print("❌ 批量请求与单独请求的结果不一致")
+        sys.exit(1)
+    print("🎉 批量请求的每一项与单独请求一致")
+
+
+if __name__ == "__main__":
+    main()
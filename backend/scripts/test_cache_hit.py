@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+端点缓存命中集成测试
+对每个缓存端点发起三次相同请求，断言：
+- 第一次未命中缓存，执行了数据库查询并写入 Redis 和进程内缓存
+- 第二次由进程内缓存返回，没有执行任何 SQL，响应与第一次完全一致
+- 清空进程内缓存后第三次由 Redis 返回，同样没有执行 SQL
+需要可用的 PostgreSQL 和 Redis（读取 .env 配置）
+
+用法: python scripts/test_cache_hit.py [--year 2025]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.core.cache import cache_key_builder
+from app.core.local_cache import local_cache
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, async_engine
+from app.core.redis import get_redis_client
+from app.models import Driver, Constructor, Season
+
+
+class QueryCounter:
+    """统计同步和异步引擎上执行的 SQL 语句数"""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+
+def build_cases(year: int) -> List[Dict[str, Any]]:
+    """需要测试的端点：(路径, 查询参数, 缓存前缀, 参与构建缓存键的参数)"""
+    db = SessionLocal()
+    try:
+        season = db.query(Season).filter(Season.year == year).first()
+        driver = db.query(Driver).first()
+        constructor = db.query(Constructor).first()
+    finally:
+        db.close()
+
+    if not season or not driver or not constructor:
+        raise RuntimeError(f"数据库中没有 {year} 赛季的数据，请先同步数据")
+
+    return [
+        {
+            "path": "/api/v1/standings/drivers",
+            "query": {"year": year},
+            "prefix": "driver_standings",
+            "key_params": {"season_id": None, "year": year},
+        },
+        {
+            "path": "/api/v1/standings/constructors",
+            "query": {"year": year},
+            "prefix": "constructor_standings",
+            "key_params": {"season_id": None, "year": year},
+        },
+        {
+            "path": f"/api/v1/standings/drivers/{driver.driver_id}/history",
+            "query": {},
+            "prefix": "driver_standings_history",
+            "key_params": {"driver_id": driver.driver_id, "season": None, "limit": 20, "offset": 0},
+        },
+        {
+            "path": f"/api/v1/standings/constructors/{constructor.constructor_id}/history",
+            "query": {},
+            "prefix": "constructor_standings_history",
+            "key_params": {"constructor_id": constructor.constructor_id, "season": None, "limit": 20, "offset": 0},
+        },
+    ]
+
+
+def check_case(client: TestClient, counter: QueryCounter, case: Dict[str, Any]) -> Optional[str]:
+    """执行一个端点的测试，失败时返回错误信息"""
+    redis_client = get_redis_client()
+    cache_key = cache_key_builder(case["prefix"], case["key_params"])
+    redis_client.delete(cache_key)
+    local_cache.delete([cache_key])
+
+    counter.reset()
+    first = client.get(case["path"], params=case["query"])
+    first_queries = counter.count
+    if first.status_code != 200:
+        return f"第一次请求失败: {first.status_code} {first.text[:200]}"
+    if first_queries == 0:
+        return "第一次请求没有执行数据库查询，缓存未被清除？"
+    if not redis_client.exists(cache_key):
+        return f"第一次请求后 Redis 中没有缓存键 {cache_key}"
+
+    # 第二次：进程内缓存；第三次：清空进程内缓存后由 Redis 返回
+    for attempt, tier in ((2, "进程内缓存"), (3, "Redis")):
+        if tier == "Redis":
+            local_cache.delete([cache_key])
+        hits_before = local_cache.hits
+        counter.reset()
+        response = client.get(case["path"], params=case["query"])
+        if response.status_code != 200:
+            return f"第{attempt}次请求失败: {response.status_code} {response.text[:200]}"
+        if counter.count != 0:
+            return f"第{attempt}次请求执行了 {counter.count} 条 SQL，未命中{tier}"
+        if settings.local_cache_enabled and (local_cache.hits > hits_before) != (tier == "进程内缓存"):
+            return f"第{attempt}次请求不是由{tier}返回的"
+        if response.json() != first.json():
+            return f"{tier}命中的响应与第一次不一致"
+
+    print(f"  ✅ {case['path']}: 未命中 {first_queries} 条 SQL -> 命中 0 条 SQL ({cache_key})")
+    return None
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="端点缓存命中集成测试")
+    parser.add_argument("--year", type=int, default=2025, help="测试使用的赛季年份")
+    args = parser.parse_args(argv)
+
+    try:
+        get_redis_client().ping()
+    except Exception as e:
+        print(f"❌ 无法连接 Redis ({settings.redis_url}): {e}")
+        sys.exit(1)
+
+    counter = QueryCounter()
+
+    print(f"🧪 测试缓存命中 ({args.year} 赛季)")
+    failures = []
+    # 所有请求在同一个事件循环中执行（异步引擎的连接绑定在创建它的事件循环上）
+    with TestClient(app, base_url="http://localhost") as client:
+        for case in build_cases(args.year):
+            error = check_case(client, counter, case)
+            if error:
+                print(f"  ❌ {case['path']}: {error}")
+                failures.append(case["path"])
+
+    if failures:
+        print(f"❌ {len(failures)} 个端点未通过")
+        sys.exit(1)
+    print("🎉 所有缓存端点的重复请求均由缓存返回")
+
+
+if __name__ == "__main__":
+    main()
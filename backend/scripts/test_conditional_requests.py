@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+HTTP 条件请求集成测试
+对每个读接口断言：
+- 200 响应带有 ETag 和 Last-Modified
+- 携带 If-None-Match / If-Modified-Since 再次请求返回 304，且没有执行 SQL、没有访问缓存
+- 更新该请求所属范围的数据版本后，旧 ETag 不再有效，返回 200 和新的 ETag
+- 按赛季查询的接口在只更新参考数据版本（赛道、车手、车队写入）后同样返回新的 ETag，
+  其他赛季的版本更新后仍返回 304
+需要可用的 PostgreSQL 和 Redis（读取 .env 配置）
+
+用法: python scripts/test_conditional_requests.py [--year 2025]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.core.data_version import bump_data_version
+from app.core.database import SessionLocal
+from app.core.local_cache import local_cache
+from app.core.redis import get_redis_client
+from app.models import Race, Season
+from test_cache_hit import QueryCounter
+
+
+def build_cases(year: int) -> List[Dict[str, Any]]:
+    """需要测试的接口：(路径, 查询参数, 更新版本时传入的赛季，为空时更新参考数据版本)"""
+    db = SessionLocal()
+    try:
+        race = db.query(Race).join(Season).filter(Season.year == year).order_by(Race.round_number).first()
+    finally:
+        db.close()
+
+    if not race:
+        raise RuntimeError(f"数据库中没有 {year} 赛季的数据，请先同步数据")
+
+    api = settings.api_v1_str
+    return [
+        {"path": f"{api}/standings/drivers", "query": {"year": year}, "seasons": (year,)},
+        {"path": f"{api}/standings/constructors", "query": {"year": year}, "seasons": (year,)},
+        {"path": f"{api}/races/", "query": {"season": year}, "seasons": (year,)},
+        {"path": f"{api}/races/{race.id}", "query": {}, "seasons": ()},
+        {"path": f"{api}/circuits/", "query": {}, "seasons": ()},
+    ]
+
+
+def check_case(client: TestClient, counter: QueryCounter, case: Dict[str, Any]) -> Optional[str]:
+    """执行一个接口的测试，失败时返回错误信息"""
+    first = client.get(case["path"], params=case["query"])
+    if first.status_code != 200:
+        return f"第一次请求失败: {first.status_code} {first.text[:200]}"
+    etag, last_modified = first.headers.get("etag"), first.headers.get("last-modified")
+    if not etag or not last_modified:
+        return "响应没有 ETag 或 Last-Modified"
+
+    for header, value in (("If-None-Match", etag), ("If-Modified-Since", last_modified)):
+        counter.reset()
+        cache_stats = (local_cache.hits, local_cache.misses)
+        response = client.get(case["path"], params=case["query"], headers={header: value})
+        if response.status_code != 304:
+            return f"携带 {header} 的请求返回 {response.status_code}，预期 304"
+        if response.content:
+            return "304 响应带有响应体"
+        if counter.count != 0:
+            return f"携带 {header} 的请求执行了 {counter.count} 条 SQL"
+        if (local_cache.hits, local_cache.misses) != cache_stats:
+            return f"携带 {header} 的请求访问了缓存"
+
+    bump_data_version(*case["seasons"], reference=not case["seasons"])
+    response = client.get(case["path"], params=case["query"], headers={"If-None-Match": etag})
+    if response.status_code != 200:
+        return f"数据版本更新后仍返回 {response.status_code}"
+    if response.headers.get("etag") == etag:
+        return "数据版本更新后 ETag 没有变化"
+
+    if case["seasons"]:
+        season_etag = response.headers.get("etag")
+        # 其他赛季的写入不影响该赛季的 ETag
+        bump_data_version(*(year - 1 for year in case["seasons"]))
+        response = client.get(case["path"], params=case["query"], headers={"If-None-Match": season_etag})
+        if response.status_code != 304:
+            return f"其他赛季的版本更新后返回 {response.status_code}，预期 304"
+
+        # 只更新参考数据版本，响应中的赛道、车手、车队名称可能已经变化
+        bump_data_version(reference=True)
+        response = client.get(case["path"], params=case["query"], headers={"If-None-Match": season_etag})
+        if response.status_code != 200 or response.headers.get("etag") == season_etag:
+            return f"参考数据版本更新后仍返回 {response.status_code}，ETag 没有变化"
+
+    print(f"  ✅ {case['path']}: {etag} -> 304，版本更新后 {response.headers['etag']}")
+    return None
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="HTTP 条件请求集成测试")
+    parser.add_argument("--year", type=int, default=2025, help="测试使用的赛季年份")
+    args = parser.parse_args(argv)
+
+    if not settings.conditional_requests_enabled:
+        print("❌ 条件请求未启用（CONDITIONAL_REQUESTS_ENABLED=false）")
+        sys.exit(1)
+    try:
+        get_redis_client().ping()
+    except Exception as e:
+        print(f"❌ 无法连接 Redis ({settings.redis_url}): {e}")
+        sys.exit(1)
+
+    counter = QueryCounter()
+
+    print(f"🧪 测试条件请求 ({args.year} 赛季)")
+    failures = []
+    with TestClient(app, base_url="http://localhost") as client:
+        for case in build_cases(args.year):
+            error = check_case(client, counter, case)
+            if error:
+                print(f"  ❌ {case['path']}: {error}")
+                failures.append(case["path"])
+
+    if failures:
+        print(f"❌ {len(failures)} 个接口未通过")
+        sys.exit(1)
+    print("🎉 所有接口的条件请求均在访问数据库和缓存之前返回 304")
+
+
+if __name__ == "__main__":
+    main()
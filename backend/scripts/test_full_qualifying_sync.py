@@ -30,7 +30,7 @@ def test_full_qualifying_sync():
     logger.info(f"🧪 开始测试 {season_year} 赛季完整的排位赛同步...")
     
     db = next(get_db())
-    sync_service = UnifiedSyncService(db, cache_dir="./cache")
+    sync_service = UnifiedSyncService(db)
     
     try:
         # 调用核心同步函数
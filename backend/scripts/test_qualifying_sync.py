@@ -13,6 +13,7 @@ sys.path.insert(0, str(project_root))
 
 from app.core.database import get_db
 from app.services.unified_sync_service import UnifiedSyncService
+from app.services.sync_identity_map import constructor_id_from_row
 from app.models.qualifying_result import QualifyingResult
 from app.models.race import Race
 from app.models.season import Season
@@ -30,7 +31,7 @@ def test_qualifying_sync_partial():
     logger.info("🧪 开始测试部分赛季（前10轮）的排位赛同步...")
     
     db = next(get_db())
-    sync_service = UnifiedSyncService(db, cache_dir="./cache")
+    sync_service = UnifiedSyncService(db)
     season_year = 2025
     
     try:
@@ -76,16 +77,19 @@ def test_qualifying_sync_partial():
                 logger.warning(f"  - ⚠️ 第 {round_num} 轮没有排位赛数据")
                 continue
             
+            # 缺失的车手和车队一次性批量创建
+            identity_map = sync_service.identity_map
+            identity_map.ensure_entities(qualifying_df, season.id)
             for _, row in qualifying_df.iterrows():
-                driver = sync_service._get_or_create_driver_from_result(row)
-                constructor = sync_service._get_or_create_constructor_from_result(row)
-                if not driver or not constructor:
+                driver_id = row.get('driverId')
+                constructor_id = constructor_id_from_row(row)
+                if not identity_map.has_driver(driver_id) or not identity_map.has_constructor(constructor_id):
                     continue
 
                 qualifying_result = QualifyingResult(
                     race_id=race.id,
-                    driver_id=driver.driver_id,
-                    constructor_id=constructor.constructor_id,
+                    driver_id=driver_id,
+                    constructor_id=constructor_id,
                     number=row.get('number'),
                     position=row.get('position'),
                     q1_time=str(row.get('q1', '')),
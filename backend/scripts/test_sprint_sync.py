@@ -32,7 +32,7 @@ def test_sprint_sync():
         db = next(get_db())
         
         # 创建统一同步服务
-        sync_service = UnifiedSyncService(db, cache_dir="./cache")
+        sync_service = UnifiedSyncService(db)
         
         # 测试冲刺赛结果同步
         logger.info("🔄 测试冲刺赛结果同步...")
@@ -16,7 +16,7 @@ def test_sync_standings():
     logging.info("🚀 开始测试积分榜同步...")
     
     db = SessionLocal()
-    sync_service = UnifiedSyncService(db=db, cache_dir="cache")
+    sync_service = UnifiedSyncService(db=db)
     
     season_to_sync = 2025
     
@@ -91,19 +91,19 @@ def validate_service_config():
             return False
         
         # 检查频率限制配置
-        expected_delays = {
-            'basic': 0.5,
-            'results': 1.0,
-            'standings': 1.5,
-            'session': 2.0
+        from app.core.config import settings
+        bucket_limits = {bucket.name: bucket.capacity for bucket in sync_service.rate_limiter.buckets}
+        expected_limits = {
+            'burst': settings.ergast_burst_limit,
+            'hourly': settings.ergast_hourly_limit
         }
         
-        for delay_type, expected_delay in expected_delays.items():
-            actual_delay = sync_service.delays.get(delay_type)
-            if actual_delay == expected_delay:
-                logger.info(f"✅ {delay_type}延迟配置正确: {actual_delay}s")
+        for bucket_name, expected_limit in expected_limits.items():
+            actual_limit = bucket_limits.get(bucket_name)
+            if actual_limit == expected_limit:
+                logger.info(f"✅ {bucket_name}限流配置正确: {actual_limit}")
             else:
-                logger.error(f"❌ {delay_type}延迟配置错误: {actual_delay}s (应该是{expected_delay}s)")
+                logger.error(f"❌ {bucket_name}限流配置错误: {actual_limit} (应该是{expected_limit})")
                 return False
         
         # 检查数据提供者
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+缓存预热脚本
+计算并写入赛季积分榜、比赛列表、即将到来的比赛和指定轮次领奖台的接口缓存，并重新生成赛季数据包
+
+用法: python scripts/warm_cache.py --season 2025 [--round 5] [--concurrency 4]
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import get_db
+from app.services.cache_warmer import CacheWarmer
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='接口缓存预热工具')
+    parser.add_argument('--season', type=int, required=True, help='赛季年份')
+    parser.add_argument('--round', type=int, default=None, help='轮次（预热该轮的领奖台）')
+    parser.add_argument('--concurrency', type=int, default=None, help='并发数 (默认: 配置中的 CACHE_WARM_CONCURRENCY)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    args = parse_arguments(argv)
+
+    db = next(get_db())
+    try:
+        report = CacheWarmer(db, concurrency=args.concurrency).warm(args.season, args.round)
+        for result in report.results:
+            mark = "✅" if result.success else "❌"
+            logger.info(f"{mark} {result.name}: {result.seconds * 1000:.0f} ms {result.error or ''}")
+        logger.info(f"⏱️ 预热总耗时 {report.seconds:.2f} 秒")
+        if not report.success:
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()